@@ -0,0 +1,113 @@
+"""
+Categorization throughput benchmark.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_categorization --sizes 1000,10000,100000
+    python -m benchmarks.bench_categorization --sizes 1000000 --output results.json
+    python -m benchmarks.bench_categorization --compare baseline.json --output current.json
+"""
+import argparse
+import json
+import platform
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.corpus import generate_corpus
+from services.categorization_service import CategorizationService
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+def _percentile(sorted_values: List[int], percentile: float) -> int:
+    index = min(len(sorted_values) - 1, int(round(percentile / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def benchmark_function(fn: Callable[[str, str], object], corpus: List[Tuple[str, str]]) -> Dict[str, float]:
+    """Time fn once per message; returns throughput and latency percentiles"""
+    latencies = []
+    clock = time.perf_counter_ns
+    started = clock()
+    for sender, content in corpus:
+        t0 = clock()
+        fn(content, sender)
+        latencies.append(clock() - t0)
+    elapsed_ns = clock() - started
+
+    latencies.sort()
+    return {
+        "messages": len(corpus),
+        "seconds": elapsed_ns / 1e9,
+        "messages_per_sec": len(corpus) / (elapsed_ns / 1e9) if elapsed_ns else 0.0,
+        "p50_us": _percentile(latencies, 50) / 1000,
+        "p99_us": _percentile(latencies, 99) / 1000,
+        "max_us": latencies[-1] / 1000,
+    }
+
+def run_benchmarks(sizes: List[int], seed: int) -> Dict:
+    service = CategorizationService()
+    functions = {
+        "categorize_message": lambda content, sender: service.categorize_message(content, sender),
+        "get_mentioned_projects": lambda content, sender: service.get_mentioned_projects(content),
+        "get_category_explanation": lambda content, sender: service.get_category_explanation(content, sender),
+    }
+
+    results = []
+    for size in sizes:
+        corpus = list(generate_corpus(size, seed))
+        average_length = sum(len(content) for _, content in corpus) / size
+        for name, fn in functions.items():
+            stats = benchmark_function(fn, corpus)
+            stats.update({"function": name, "size": size, "avg_message_chars": round(average_length, 1)})
+            results.append(stats)
+            print(
+                f"{name:<26} n={size:>9,}  {stats['messages_per_sec']:>12,.0f} msg/s  "
+                f"p99={stats['p99_us']:>8.1f}us"
+            )
+
+    return {
+        "benchmark": "categorization",
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "rule_count": len(service.urgent_keywords) + len(service.high_priority_keywords)
+                      + len(service.archive_keywords) + len(service.audited_projects),
+        "results": results,
+    }
+
+def compare(baseline: Dict, current: Dict):
+    """Print throughput change per (function, size) against a previous run"""
+    previous = {(r["function"], r["size"]): r for r in baseline.get("results", [])}
+    print("\nChange vs baseline (messages/sec, p99):")
+    for result in current["results"]:
+        key = (result["function"], result["size"])
+        if key not in previous:
+            continue
+        old = previous[key]
+        throughput = (result["messages_per_sec"] / old["messages_per_sec"] - 1) * 100
+        p99 = (result["p99_us"] / old["p99_us"] - 1) * 100 if old["p99_us"] else 0.0
+        print(f"{key[0]:<26} n={key[1]:>9,}  {throughput:+7.1f}%  p99 {p99:+7.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CategorizationService throughput")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="Comma-separated corpus sizes")
+    parser.add_argument("--seed", type=int, default=42, help="Corpus generator seed")
+    parser.add_argument("--output", default="categorization_benchmark.json", help="Where to write JSON results")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    report = run_benchmarks(sizes, args.seed)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+if __name__ == "__main__":
+    main()
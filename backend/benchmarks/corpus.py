@@ -0,0 +1,61 @@
+import random
+from typing import Iterator, List, Tuple
+
+from config.config import (
+    AUDITED_PROJECTS,
+    WEB3_URGENT_KEYWORDS,
+    WEB3_HIGH_PRIORITY_KEYWORDS,
+    WEB3_ARCHIVE_KEYWORDS,
+    IMPORTANT_WEB3_SENDERS
+)
+
+# Everyday words that carry no categorization signal
+FILLER_WORDS = [
+    "we", "are", "looking", "for", "the", "team", "our", "new", "contract", "users",
+    "please", "review", "this", "week", "before", "mainnet", "with", "pool", "vault",
+    "wallet", "bridge", "chain", "liquidity", "staking", "rewards", "oracle", "fees",
+    "can", "you", "share", "details", "about", "your", "timeline", "scope", "lines",
+    "of", "code", "repo", "link", "on", "github", "cheers", "gm", "ser", "fren",
+]
+
+SENDER_NAMES = ["alice", "bob", "charlie", "diana", "eve", "frank", "grace", "heidi"]
+
+# Relative frequency of each kind of signal word in generated messages
+SIGNAL_WEIGHTS = [
+    (WEB3_URGENT_KEYWORDS, 2),
+    (WEB3_HIGH_PRIORITY_KEYWORDS, 4),
+    (WEB3_ARCHIVE_KEYWORDS, 2),
+    ([project for projects in AUDITED_PROJECTS.values() for project in projects], 3),
+]
+
+def _signal_pool() -> Tuple[List[List[str]], List[int]]:
+    pools = [terms for terms, _ in SIGNAL_WEIGHTS]
+    weights = [weight for _, weight in SIGNAL_WEIGHTS]
+    return pools, weights
+
+def generate_message(rng: random.Random, min_words: int = 8, max_words: int = 60) -> Tuple[str, str]:
+    """
+    Generate one (sender, content) pair. Lengths follow Telegram/Twitter
+    messages: mostly short, occasionally long, with 0-3 signal terms mixed in.
+    """
+    pools, weights = _signal_pool()
+    length = min(max_words, max(min_words, int(rng.lognormvariate(3.0, 0.5))))
+    words = [rng.choice(FILLER_WORDS) for _ in range(length)]
+
+    for _ in range(rng.choice([0, 0, 1, 1, 1, 2, 3])):
+        pool = rng.choices(pools, weights)[0]
+        words.insert(rng.randrange(len(words) + 1), rng.choice(pool))
+
+    content = " ".join(words)
+    content = content[0].upper() + content[1:]
+
+    sender = rng.choice(SENDER_NAMES)
+    if rng.random() < 0.2:
+        sender = f"{sender}_{rng.choice(IMPORTANT_WEB3_SENDERS)}"
+    return sender, content
+
+def generate_corpus(size: int, seed: int = 42) -> Iterator[Tuple[str, str]]:
+    """Yield a deterministic synthetic corpus of (sender, content) pairs"""
+    rng = random.Random(seed)
+    for _ in range(size):
+        yield generate_message(rng)
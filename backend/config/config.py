@@ -7,10 +7,69 @@ load_dotenv()
 USE_MOCK_DATA = os.getenv("USE_MOCK_DATA", "True").lower() == "true"
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "your_telegram_bot_token_here")
 TWITTER_BEARER_TOKEN = os.getenv("TWITTER_BEARER_TOKEN", "your_twitter_bearer_token_here")
+TWITTER_USER_ID = os.getenv("TWITTER_USER_ID")  # Account whose mentions are fetched
+# Keep-alive connections per shared API client, and request timeout in seconds
+API_CLIENT_POOL_SIZE = int(os.getenv("API_CLIENT_POOL_SIZE", 10))
+API_CLIENT_TIMEOUT = float(os.getenv("API_CLIENT_TIMEOUT", 10))
+# Rate limiting: throttled requests are retried up to RATE_LIMIT_MAX_RETRIES times
+# with exponential backoff between RATE_LIMIT_BACKOFF_BASE and RATE_LIMIT_BACKOFF_MAX
+# seconds; requests that would wait longer than RATE_LIMIT_MAX_WAIT seconds fail fast
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", 3))
+RATE_LIMIT_BACKOFF_BASE = float(os.getenv("RATE_LIMIT_BACKOFF_BASE", 1))
+RATE_LIMIT_BACKOFF_MAX = float(os.getenv("RATE_LIMIT_BACKOFF_MAX", 60))
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", 30))
 
 # Database Configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./comms_center.db")
 
+# Categorization Configuration
+# Batches at least this large are categorized in a process pool. The evidence
+# backfill and recategorization jobs score messages in batches of this size;
+# streaming ingest batches (INGEST_PIPELINE_BATCH_SIZE) stay below it on purpose
+CATEGORIZATION_POOL_THRESHOLD = int(os.getenv("CATEGORIZATION_POOL_THRESHOLD", 5000))
+CATEGORIZATION_WORKERS = int(os.getenv("CATEGORIZATION_WORKERS", os.cpu_count() or 1))
+
+# Incremental Fetching Configuration
+# Most result pages one incremental fetch requests before it stops for this refresh
+FETCH_MAX_PAGES = int(os.getenv("FETCH_MAX_PAGES", 10))
+
+# Feed Fetching Configuration
+# Accounts fetched at once, and how long one account may take per page before it is skipped
+FEED_FETCH_CONCURRENCY = int(os.getenv("FEED_FETCH_CONCURRENCY", 8))
+FEED_FETCH_TIMEOUT = float(os.getenv("FEED_FETCH_TIMEOUT", 10))
+# Seconds /api/project-feeds serves a cached feed before rereading it in the background
+FEED_CACHE_TTL = float(os.getenv("FEED_CACHE_TTL", 300))
+# Newest stored tweets returned per account by /api/project-feeds
+FEED_ITEMS_PER_ACCOUNT = int(os.getenv("FEED_ITEMS_PER_ACCOUNT", 10))
+
+# Ingestion Scheduler Configuration
+# Seconds between background polls per source (0 disables polling that source),
+# randomized by +/- INGEST_JITTER of the interval
+INGEST_SCHEDULER_ENABLED = os.getenv("INGEST_SCHEDULER_ENABLED", "True").lower() == "true"
+INGEST_TELEGRAM_INTERVAL = float(os.getenv("INGEST_TELEGRAM_INTERVAL", 60))
+INGEST_TWITTER_INTERVAL = float(os.getenv("INGEST_TWITTER_INTERVAL", 300))
+INGEST_FEEDS_INTERVAL = float(os.getenv("INGEST_FEEDS_INTERVAL", 900))
+INGEST_JITTER = float(os.getenv("INGEST_JITTER", 0.1))
+# Finished ingest jobs kept for /api/jobs/{id}; older ones are pruned
+INGEST_JOB_HISTORY = int(os.getenv("INGEST_JOB_HISTORY", 500))
+# Ingest pipeline: fetch streams run at once, items per categorize/write batch,
+# batches categorized at once, and batches queued between stages
+INGEST_FETCH_CONCURRENCY = int(os.getenv("INGEST_FETCH_CONCURRENCY", 8))
+INGEST_PIPELINE_BATCH_SIZE = int(os.getenv("INGEST_PIPELINE_BATCH_SIZE", 500))
+INGEST_CATEGORIZE_WORKERS = int(os.getenv("INGEST_CATEGORIZE_WORKERS", 2))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", 4))
+
+# Message List Configuration
+# Characters of content returned per message by /api/messages?view=preview
+MESSAGE_PREVIEW_CHARS = int(os.getenv("MESSAGE_PREVIEW_CHARS", 160))
+# Largest page /api/messages returns for one request
+MESSAGES_MAX_PAGE_SIZE = int(os.getenv("MESSAGES_MAX_PAGE_SIZE", 500))
+
+# Retention Configuration
+# Messages older than this many days, or categorized as archive, move to the cold tier
+RETENTION_MAX_AGE_DAYS = int(os.getenv("RETENTION_MAX_AGE_DAYS", 30))
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", 500))
+
 # Server Configuration
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", 8000))
@@ -1,24 +1,40 @@
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
+from datetime import timedelta
+
+from storage_profiles import create_profiled_async_engine, create_profiled_engine, get_storage_profile
 
 load_dotenv()
 
 # Database URL from environment or default to SQLite
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./comms_center.db")
 
+# Engine tuning profile: compat, balanced or throughput (see storage_profiles.py)
+STORAGE_PROFILE = get_storage_profile(os.getenv("STORAGE_PROFILE"))
+
 # Create SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-)
+engine = create_profiled_engine(DATABASE_URL, STORAGE_PROFILE)
 
-# Create SessionLocal class
+# Create SessionLocal class (sync sessions for scripts, migrations and background jobs)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def to_async_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto its async driver: aiosqlite or asyncpg"""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+# Async engine and sessions used by the API request handlers
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(DATABASE_URL))
+async_engine = create_profiled_async_engine(ASYNC_DATABASE_URL, STORAGE_PROFILE)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # Create Base class
 Base = declarative_base()
 
@@ -30,10 +46,18 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def init_db():
     """Initialize database tables"""
-    from models import Message, MessageCategory, MessageSource  # Import here to avoid circular imports
-    Base.metadata.create_all(bind=engine)
+    from models import Message, MessageCategory, MessageSource, utc_now  # Import here to avoid circular imports
+    from services.categorization_service import CategorizationService, RULE_MANUAL
+    from services.ingest_service import index_stored_messages
+    from migrations import run_migrations
+    run_migrations(engine)
     
     # Add sample data if database is empty
     db = SessionLocal()
@@ -41,56 +65,57 @@ def init_db():
         # Check if we already have messages
         existing_messages = db.query(Message).count()
         if existing_messages == 0:
-            # Add sample messages
+            # Add sample messages, timestamped in UTC like ingested ones
+            now = utc_now()
             sample_messages = [
                 Message(
                     sender="crypto_builder_123",
                     content="Looking for a smart contract audit for our new DeFi protocol. Heard great things about Pashov Audit Group from Uniswap team!",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.HIGH_PRIORITY,
-                    timestamp=datetime.now() - timedelta(hours=2)
+                    timestamp=now - timedelta(hours=2)
                 ),
                 Message(
                     sender="web3_developer",
                     content="Need urgent audit for LayerZero integration. Can Pashov Audit Group help?",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.URGENT,
-                    timestamp=datetime.now() - timedelta(hours=1)
+                    timestamp=now - timedelta(hours=1)
                 ),
                 Message(
                     sender="defi_founder",
                     content="Building something similar to Aave. Would love to get audited by the same team!",
                     source=MessageSource.TWITTER,
                     category=MessageCategory.ROUTINE,
-                    timestamp=datetime.now() - timedelta(minutes=30)
+                    timestamp=now - timedelta(minutes=30)
                 ),
                 Message(
                     sender="nft_creator",
                     content="Working on a Blueberry Protocol inspired NFT project. Need security audit recommendations.",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.HIGH_PRIORITY,
-                    timestamp=datetime.now() - timedelta(minutes=15)
+                    timestamp=now - timedelta(minutes=15)
                 ),
                 Message(
                     sender="arbitrum_dev",
                     content="Excited to build on Arbitrum! Looking for audit partners who understand the ecosystem.",
                     source=MessageSource.TWITTER,
                     category=MessageCategory.ROUTINE,
-                    timestamp=datetime.now() - timedelta(minutes=5)
+                    timestamp=now - timedelta(minutes=5)
                 ),
                 Message(
                     sender="sushi_fan",
                     content="Love what Sushi has built! Want to create something similar. Need audit help.",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.HIGH_PRIORITY,
-                    timestamp=datetime.now() - timedelta(minutes=2)
+                    timestamp=now - timedelta(minutes=2)
                 ),
                 Message(
                     sender="ethena_builder",
                     content="Inspired by Ethena's innovation. Building stablecoin protocol. Audit recommendations?",
                     source=MessageSource.TWITTER,
                     category=MessageCategory.URGENT,
-                    timestamp=datetime.now()
+                    timestamp=now
                 ),
                 # Additional Telegram messages with urgent notifications
                 Message(
@@ -98,123 +123,133 @@ def init_db():
                     content="URGENT: Smart contract vulnerability detected in production! Need immediate security review. Users at risk!",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.URGENT,
-                    timestamp=datetime.now() - timedelta(minutes=10)
+                    timestamp=now - timedelta(minutes=10)
                 ),
                 Message(
                     sender="DeFi_Security_Team",
                     content="🚨 EMERGENCY: Flash loan attack detected on our protocol! Need Pashov Audit Group assistance immediately!",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.URGENT,
-                    timestamp=datetime.now() - timedelta(minutes=8)
+                    timestamp=now - timedelta(minutes=8)
                 ),
                 Message(
                     sender="Protocol_Manager",
                     content="URGENT: Users reporting failed transactions. Smart contract may have critical bug. Need audit team on call!",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.URGENT,
-                    timestamp=datetime.now() - timedelta(minutes=6)
+                    timestamp=now - timedelta(minutes=6)
                 ),
                 Message(
                     sender="LayerZero_Dev",
                     content="Need urgent cross-chain bridge audit. Found potential reentrancy vulnerability. Can Pashov team help?",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.URGENT,
-                    timestamp=datetime.now() - timedelta(minutes=4)
+                    timestamp=now - timedelta(minutes=4)
                 ),
                 Message(
                     sender="Stablecoin_Team",
                     content="🚨 CRITICAL: Our stablecoin is depegging! Need immediate audit of liquidation mechanism!",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.URGENT,
-                    timestamp=datetime.now() - timedelta(minutes=3)
+                    timestamp=now - timedelta(minutes=3)
                 ),
                 Message(
                     sender="Yield_Farmer",
                     content="High priority: Yield farming protocol showing unusual APY. Need security audit before launch.",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.HIGH_PRIORITY,
-                    timestamp=datetime.now() - timedelta(minutes=12)
+                    timestamp=now - timedelta(minutes=12)
                 ),
                 Message(
                     sender="NFT_Marketplace",
                     content="Building NFT marketplace similar to OpenSea. Need comprehensive security audit. High priority.",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.HIGH_PRIORITY,
-                    timestamp=datetime.now() - timedelta(minutes=18)
+                    timestamp=now - timedelta(minutes=18)
                 ),
                 Message(
                     sender="DAO_Governance",
                     content="Governance token launch in 24 hours. Need urgent audit of voting mechanism and tokenomics.",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.HIGH_PRIORITY,
-                    timestamp=datetime.now() - timedelta(minutes=25)
+                    timestamp=now - timedelta(minutes=25)
                 ),
                 Message(
                     sender="Cross_Chain_Dev",
                     content="Building bridge between Ethereum and Arbitrum. Need audit of cross-chain message passing.",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.HIGH_PRIORITY,
-                    timestamp=datetime.now() - timedelta(minutes=35)
+                    timestamp=now - timedelta(minutes=35)
                 ),
                 Message(
                     sender="Lending_Protocol",
                     content="DeFi lending protocol ready for audit. Similar to Aave but with new features. High priority.",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.HIGH_PRIORITY,
-                    timestamp=datetime.now() - timedelta(minutes=45)
+                    timestamp=now - timedelta(minutes=45)
                 ),
                 Message(
                     sender="DEX_Developer",
                     content="Building DEX with concentrated liquidity like Uniswap V4. Need audit before mainnet launch.",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.HIGH_PRIORITY,
-                    timestamp=datetime.now() - timedelta(minutes=55)
+                    timestamp=now - timedelta(minutes=55)
                 ),
                 Message(
                     sender="Staking_Protocol",
                     content="Liquid staking protocol for ETH. Need audit of staking mechanism and reward distribution.",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.ROUTINE,
-                    timestamp=datetime.now() - timedelta(hours=1, minutes=10)
+                    timestamp=now - timedelta(hours=1, minutes=10)
                 ),
                 Message(
                     sender="Insurance_DeFi",
                     content="DeFi insurance protocol. Need audit of claim processing and risk assessment algorithms.",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.ROUTINE,
-                    timestamp=datetime.now() - timedelta(hours=1, minutes=25)
+                    timestamp=now - timedelta(hours=1, minutes=25)
                 ),
                 Message(
                     sender="Gaming_NFT",
                     content="NFT gaming platform. Need audit of in-game token economics and NFT marketplace.",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.ROUTINE,
-                    timestamp=datetime.now() - timedelta(hours=1, minutes=40)
+                    timestamp=now - timedelta(hours=1, minutes=40)
                 ),
                 Message(
                     sender="Prediction_Market",
                     content="Decentralized prediction market. Need audit of oracle integration and market resolution.",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.ROUTINE,
-                    timestamp=datetime.now() - timedelta(hours=1, minutes=55)
+                    timestamp=now - timedelta(hours=1, minutes=55)
                 ),
                 Message(
                     sender="Social_DeFi",
                     content="Social trading platform. Need audit of copy trading mechanism and risk management.",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.ROUTINE,
-                    timestamp=datetime.now() - timedelta(hours=2, minutes=10)
+                    timestamp=now - timedelta(hours=2, minutes=10)
                 ),
                 Message(
                     sender="Archive_Project",
                     content="Old project from 2023. Just checking if you're still available for audits.",
                     source=MessageSource.TELEGRAM,
                     category=MessageCategory.ARCHIVE,
-                    timestamp=datetime.now() - timedelta(days=30)
+                    timestamp=now - timedelta(days=30)
                 )
             ]
             
+            # Record categorization evidence; hand-picked categories count as manual
+            categorization_service = CategorizationService()
+            for message in sample_messages:
+                result = categorization_service.analyze_message(message.content, message.sender)
+                message.matched_keywords = result.matched_keywords
+                message.matched_projects = result.matched_projects
+                message.category_rule = result.rule if result.category == message.category else RULE_MANUAL
+            
             db.add_all(sample_messages)
+            db.flush()
+            index_stored_messages(db, sample_messages)
             db.commit()
             print("Sample data added to database")
     except Exception as e:
@@ -1,25 +1,46 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional, Union
 import os
 import logging
+from datetime import timedelta
 from dotenv import load_dotenv
 
-from database import get_db, init_db
-from models import Message, MessageCategory, MessageSource
-from schemas import MessageResponse, MessageUpdate, TemplateResponse
+from database import get_async_db, init_db, AsyncSessionLocal, SessionLocal
+from models import FEED_SOURCES, Message, MessageCategory, MessageSource, MessageProject, RecategorizationJob, ArchivedMessage, IngestJob, utc_now
+from schemas import (
+    MessageResponse, MessagePreview, MessageUpdate, TemplateResponse, CategoryExplanationResponse,
+    KeywordUpdate, RecategorizationJobResponse, IngestJobResponse
+)
 from services.telegram_service import TelegramService
 from services.twitter_service import TwitterService
-from services.categorization_service import CategorizationService
-from services.twitter_feed_service import fetch_audited_project_feeds, fetch_pashov_audit_group_feed, get_project_feed_summary
-from config.config import ALLOWED_ORIGINS, AUDITED_PROJECTS, PROJECT_FEEDS, PASHOV_AUDIT_GROUP
+from services.categorization_service import CategorizationService, RULE_MANUAL
+from services.search_service import apply_text_search
+from services.pagination import InvalidCursor, apply_keyset, merge_newest_first, split_page
+from services.retention_service import archived_messages_query
+from services.message_preview import preview_columns, preview_mappings
+from services.recategorization_service import (
+    create_recategorization_job, fail_interrupted_recategorization_jobs, run_recategorization_job
+)
+from services.ingest_scheduler import MESSAGE_SOURCES, SOURCE_FEEDS, IngestScheduler, create_ingest_job, fail_unfinished_jobs
+from services.stats_service import (
+    BUCKETS, activity_timeseries, count_recent_messages, parse_window, read_counters, record_category_change
+)
+from services.twitter_feed_service import all_feed_accounts
+from services.feed_cache import FeedCache
+from services.api_clients import start_api_clients, close_api_clients
+from config.config import (
+    ALLOWED_ORIGINS, INGEST_SCHEDULER_ENABLED, AUDITED_PROJECTS, MESSAGES_MAX_PAGE_SIZE, PROJECT_FEEDS, PASHOV_AUDIT_GROUP
+)
 
 # Load environment variables
 load_dotenv()
 
 # Configure logging
+os.makedirs('logs', exist_ok=True)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -43,19 +64,42 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Initialize services
 telegram_service = TelegramService()
 twitter_service = TwitterService()
 categorization_service = CategorizationService()
+feed_cache = FeedCache()
+ingest_scheduler = IngestScheduler(telegram_service, twitter_service, categorization_service, feed_cache=feed_cache)
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on startup"""
     logger.info("Starting Comms Command Center API")
-    init_db()
+    # Migrations and seeding use the sync engine
+    await run_in_threadpool(init_db)
     logger.info("Database initialized successfully")
+    # Only one worker process is supported: every unfinished job is taken to
+    # be left over from the previous process, and this process runs the scheduler
+    async with AsyncSessionLocal() as db:
+        interrupted = await db.run_sync(fail_unfinished_jobs)
+    if interrupted:
+        logger.warning(f"Marked {interrupted} ingest jobs interrupted by a restart as failed")
+    async with AsyncSessionLocal() as db:
+        interrupted = await db.run_sync(fail_interrupted_recategorization_jobs)
+    if interrupted:
+        logger.warning(f"Marked {interrupted} recategorization jobs interrupted by a restart as failed")
+    await start_api_clients()
+    if INGEST_SCHEDULER_ENABLED:
+        ingest_scheduler.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background ingestion and close the shared API clients"""
+    await ingest_scheduler.stop()
+    await close_api_clients()
 
 @app.get("/")
 async def root():
@@ -63,54 +107,132 @@ async def root():
     logger.info("Health check endpoint called")
     return {"message": "Comms Command Center API is running", "status": "healthy"}
 
-@app.get("/api/messages", response_model=List[MessageResponse])
+@app.get("/api/messages", response_model=Union[List[MessageResponse], List[MessagePreview]])
 async def get_messages(
+    response: Response,
     category: Optional[MessageCategory] = None,
     source: Optional[MessageSource] = None,
     project: Optional[str] = None,
-    limit: int = 50,
-    db: Session = Depends(get_db)
+    q: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=MESSAGES_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_archived: bool = False,
+    view: Literal["full", "preview"] = "full",
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get messages with optional filtering"""
-    logger.info(f"Fetching messages with filters: category={category}, source={source}, project={project}, limit={limit}")
+    """
+    Get messages with optional filtering and ranked full-text search.
+    Without q, results are paged newest first: pass the X-Next-Cursor response
+    header back as cursor to get the next page. include_archived also returns
+    messages retention has moved to the cold tier.
+    view=preview returns list columns only, with content_preview in place of
+    content; fetch the full message from /api/messages/{id}.
+    """
+    logger.info(f"Fetching messages with filters: category={category}, source={source}, project={project}, q={q}, limit={limit}, cursor={cursor}, include_archived={include_archived}, view={view}")
+    
+    preview = view == "preview"
+    
+    async def fetch(statement):
+        # Previews are plain rows: no ORM objects are built for them
+        if preview:
+            return (await db.execute(statement)).all()
+        return (await db.scalars(statement)).all()
     
     try:
-        query = db.query(Message)
+        query = select(*preview_columns(Message)) if preview else select(Message)
+        archived_columns = preview_columns(ArchivedMessage) if preview else None
+        dialect = db.bind.dialect.name
         
         if category:
-            query = query.filter(Message.category == category)
+            query = query.where(Message.category == category)
         if source:
-            query = query.filter(Message.source == source)
+            query = query.where(Message.source == source)
+        else:
+            query = query.where(Message.source.notin_(FEED_SOURCES))
+        audited_project = None
+        project_phrase = None
         if project:
             # Filter messages that mention the specified project
-            query = query.filter(Message.content.ilike(f"%{project}%"))
+            audited_project = next(
+                (name for name in categorization_service.audited_projects if name.lower() == project.lower()),
+                None
+            )
+            if audited_project:
+                query = query.where(Message.id.in_(
+                    select(MessageProject.message_id).where(MessageProject.project == audited_project)
+                ))
+            else:
+                # Other projects are matched as a phrase in the content, in the same search as q
+                project_phrase = project
+        
+        rank = None
+        if q or project_phrase:
+            query, rank = apply_text_search(dialect, query, q, content_phrase=project_phrase)
         
-        messages = query.order_by(Message.timestamp.desc()).limit(limit).all()
+        if rank is not None:
+            # Relevance order has no stable key to page on
+            if cursor:
+                raise HTTPException(status_code=400, detail="cursor cannot be combined with q")
+            messages = list(await fetch(query.order_by(rank, Message.timestamp.desc()).limit(limit)))
+            if include_archived and len(messages) < limit:
+                # Cold tier matches are unranked: append them newest first
+                archived_query = archived_messages_query(category, source, audited_project, project, q, archived_columns)
+                messages += await fetch(
+                    apply_keyset(archived_query, None, ArchivedMessage).limit(limit - len(messages))
+                )
+        else:
+            rows = await fetch(apply_keyset(query, cursor).limit(limit + 1))
+            if include_archived:
+                archived_query = archived_messages_query(category, source, audited_project, project, None, archived_columns)
+                rows = merge_newest_first(rows, await fetch(
+                    apply_keyset(archived_query, cursor, ArchivedMessage).limit(limit + 1)
+                ))
+            messages, next_cursor = split_page(rows, limit)
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
         logger.info(f"Retrieved {len(messages)} messages from database")
         
+        if preview:
+            return preview_mappings(messages)
         return messages
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching messages: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch messages: {str(e)}")
 
+@app.get("/api/messages/{message_id}", response_model=MessageResponse)
+async def get_message(message_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get one message with its full content, from either tier"""
+    message = await db.get(Message, message_id) or await db.get(ArchivedMessage, message_id)
+    if not message:
+        logger.warning(f"Message {message_id} not found")
+        raise HTTPException(status_code=404, detail="Message not found")
+    return message
+
 @app.post("/api/messages/{message_id}/category")
 async def update_message_category(
     message_id: int,
     category_update: MessageUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update message category"""
     logger.info(f"Updating message {message_id} category to {category_update.category}")
     
     try:
-        message = db.query(Message).filter(Message.id == message_id).first()
+        message = await db.get(Message, message_id)
         if not message:
             logger.warning(f"Message {message_id} not found")
             raise HTTPException(status_code=404, detail="Message not found")
         
+        old_category = message.category
         message.category = category_update.category
-        db.commit()
-        db.refresh(message)
+        message.category_rule = RULE_MANUAL
+        await db.run_sync(record_category_change, message, old_category)
+        await db.commit()
+        await db.refresh(message)
         
         logger.info(f"Successfully updated message {message_id} category")
         return {"message": "Category updated successfully", "data": message}
@@ -120,6 +242,82 @@ async def update_message_category(
         logger.error(f"Error updating message category: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to update category: {str(e)}")
 
+@app.get("/api/messages/{message_id}/explanation", response_model=CategoryExplanationResponse)
+async def get_message_explanation(message_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Explain a message's category from the evidence stored at ingest"""
+    message = await db.get(Message, message_id)
+    if not message:
+        logger.warning(f"Message {message_id} not found")
+        raise HTTPException(status_code=404, detail="Message not found")
+    
+    if message.category_rule:
+        explanation = categorization_service.explain(
+            message.category_rule,
+            message.matched_keywords,
+            message.matched_projects,
+            message.sender,
+            message.category
+        )
+    else:
+        # Messages stored before evidence was recorded
+        explanation = categorization_service.get_category_explanation(message.content, message.sender)
+    
+    return {
+        "message_id": message.id,
+        "category": message.category,
+        "category_rule": message.category_rule,
+        "explanation": explanation
+    }
+
+def _run_recategorization(job_id: int):
+    """Run a recategorization job with its own session, outside the request"""
+    db = SessionLocal()
+    try:
+        run_recategorization_job(db, job_id, categorization_service)
+    finally:
+        db.close()
+
+@app.post("/api/keywords", response_model=RecategorizationJobResponse)
+async def update_keywords(
+    keyword_update: KeywordUpdate,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update categorization keywords and re-score only the messages they affect"""
+    logger.info(f"Keyword update: {keyword_update.action} {keyword_update.keywords} for {keyword_update.category}")
+    
+    categorization_service.update_keywords(
+        keyword_update.category, keyword_update.keywords, keyword_update.action
+    )
+    job = await db.run_sync(create_recategorization_job, keyword_update.keywords)
+    background_tasks.add_task(_run_recategorization, job.id)
+    return job
+
+@app.get("/api/recategorization-jobs/{job_id}", response_model=RecategorizationJobResponse)
+async def get_recategorization_job(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get progress of a recategorization job"""
+    job = await db.get(RecategorizationJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Recategorization job not found")
+    return job
+
+@app.post("/api/recategorization-jobs/{job_id}/resume", response_model=RecategorizationJobResponse)
+async def resume_recategorization_job(
+    job_id: int,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Resume a failed or interrupted recategorization job from its last checkpoint"""
+    job = await db.get(RecategorizationJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Recategorization job not found")
+    if job.status in ("pending", "running"):
+        raise HTTPException(status_code=409, detail=f"Recategorization job is already {job.status}")
+    if job.status == "failed":
+        # The runner claims the job atomically, so concurrent resumes run it once
+        background_tasks.add_task(_run_recategorization, job.id)
+    return job
+
 @app.get("/api/templates", response_model=List[TemplateResponse])
 async def get_templates():
     """Get Web3-specific reply templates"""
@@ -160,111 +358,76 @@ async def get_audited_projects():
     return {"projects": AUDITED_PROJECTS}
 
 @app.get("/api/analytics")
-async def get_analytics(db: Session = Depends(get_db)):
+async def get_analytics(db: AsyncSession = Depends(get_async_db)):
     """Get Web3-specific analytics"""
-    # Get category counts
-    total_messages = db.query(Message).count()
-    telegram_count = db.query(Message).filter(Message.source == MessageSource.TELEGRAM).count()
-    twitter_count = db.query(Message.source == MessageSource.TWITTER).count()
+    # Category and source counts from the incrementally maintained counters
+    counts = await db.run_sync(read_counters)
     
-    urgent_count = db.query(Message).filter(Message.category == MessageCategory.URGENT).count()
-    high_priority_count = db.query(Message).filter(Message.category == MessageCategory.HIGH_PRIORITY).count()
-    routine_count = db.query(Message).filter(Message.category == MessageCategory.ROUTINE).count()
-    archive_count = db.query(Message).filter(Message.category == MessageCategory.ARCHIVE).count()
+    # Get recent activity (last 24 hours, in whole hours) from the hourly rollups
+    yesterday = utc_now() - timedelta(days=1)
+    recent_messages = await db.run_sync(count_recent_messages, yesterday)
     
-    # Get project mentions
+    # Get project mentions from the mention table built at ingest
+    mention_counts = dict((await db.execute(
+        select(MessageProject.project, func.count(MessageProject.message_id))
+        .join(Message, Message.id == MessageProject.message_id)
+        .where(Message.source.notin_(FEED_SOURCES))
+        .group_by(MessageProject.project)
+    )).all())
     project_counts = {}
     for category, projects in AUDITED_PROJECTS.items():
         for project in projects:
-            count = db.query(Message).filter(Message.content.ilike(f"%{project}%")).count()
-            if count > 0:
-                project_counts[project] = count
-    
-    # Get recent activity (last 24 hours)
-    from datetime import datetime, timedelta
-    yesterday = datetime.now() - timedelta(days=1)
-    recent_messages = db.query(Message).filter(Message.timestamp >= yesterday).count()
+            if mention_counts.get(project):
+                project_counts[project] = mention_counts[project]
     
     return {
         "overview": {
-            "total_messages": total_messages,
-            "telegram_messages": telegram_count,
-            "twitter_messages": twitter_count,
+            "total_messages": counts["total"],
+            "telegram_messages": counts["by_source"][MessageSource.TELEGRAM.value],
+            "twitter_messages": counts["by_source"][MessageSource.TWITTER.value],
             "recent_messages_24h": recent_messages
         },
-        "categories": {
-            "urgent": urgent_count,
-            "high_priority": high_priority_count,
-            "routine": routine_count,
-            "archive": archive_count
-        },
+        "categories": counts["by_category"],
+        "sources": counts["by_source"],
+        "category_by_source": counts["by_source_category"],
         "project_mentions": project_counts,
         "audited_projects": AUDITED_PROJECTS
     }
 
-@app.post("/api/refresh")
-async def refresh_messages(db: Session = Depends(get_db)):
-    """Refresh messages from Telegram and Twitter"""
-    logger.info("Starting message refresh process")
-    
+@app.get("/api/analytics/timeseries")
+async def get_analytics_timeseries(
+    window: str = "24h",
+    bucket: str = "hour",
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Message activity per hour or day over a trailing window such as 24h or 30d"""
     try:
-        # Fetch messages from different sources
-        logger.info("Fetching Telegram messages...")
-        telegram_messages = await telegram_service.fetch_messages()
-        logger.info(f"Retrieved {len(telegram_messages)} Telegram messages")
-        
-        logger.info("Fetching Twitter mentions...")
-        twitter_messages = await twitter_service.fetch_mentions()
-        logger.info(f"Retrieved {len(twitter_messages)} Twitter mentions")
-        
-        # Combine all messages
-        all_messages = telegram_messages + twitter_messages
-        
-        if not all_messages:
-            logger.warning("No messages retrieved from any source")
-            # Add fallback data for better user experience
-            all_messages = [
-                {
-                    "id": "fallback1",
-                    "source": "telegram",
-                    "sender": "@TestUser",
-                    "content": "Fallback message - system is working",
-                    "timestamp": "2025-08-13T10:00:00Z"
-                }
-            ]
-            logger.info("Added fallback message")
-        
-        # Process and store messages
-        for msg_data in all_messages:
-            try:
-                # Categorize message
-                category = categorization_service.categorize_message(msg_data.get("content", ""))
-                
-                # Create message object
-                message = Message(
-                    sender=msg_data.get("sender", "Unknown"),
-                    content=msg_data.get("content", ""),
-                    source=MessageSource(msg_data.get("source", "telegram")),
-                    category=MessageCategory(category),
-                    timestamp=msg_data.get("timestamp", "2025-08-13T10:00:00Z")
-                )
-                
-                db.add(message)
-                logger.debug(f"Added message from {message.sender}: {message.content[:50]}...")
-                
-            except Exception as e:
-                logger.error(f"Error processing message {msg_data}: {str(e)}")
-                continue
-        
-        db.commit()
-        logger.info(f"Successfully refreshed {len(all_messages)} messages")
-        
-        return {"success": True, "message": f"Refreshed {len(all_messages)} messages"}
-        
-    except Exception as e:
-        logger.error(f"Error during message refresh: {str(e)}")
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Failed to refresh messages: {str(e)}")
+        window_delta = parse_window(window)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if bucket not in BUCKETS:
+        raise HTTPException(status_code=400, detail=f"Invalid bucket '{bucket}', expected one of: {', '.join(BUCKETS)}")
+    if window_delta > timedelta(days=366):
+        raise HTTPException(status_code=400, detail="window cannot exceed 366d")
+    
+    points = await db.run_sync(activity_timeseries, window_delta, bucket)
+    return {"window": window, "bucket": bucket, "points": points}
+
+@app.post("/api/refresh", response_model=IngestJobResponse, status_code=202)
+async def refresh_messages(background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db)):
+    """Queue a refresh of Telegram messages and Twitter mentions; poll /api/jobs/{id} for progress"""
+    job = await db.run_sync(create_ingest_job, MESSAGE_SOURCES)
+    logger.info(f"Queued message refresh as ingest job {job.id}")
+    background_tasks.add_task(ingest_scheduler.run_job, job.id)
+    return job
+
+@app.get("/api/jobs/{job_id}", response_model=IngestJobResponse)
+async def get_ingest_job(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get status and progress of an ingest job"""
+    job = await db.get(IngestJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingest job not found")
+    return job
 
 @app.get("/api/project-feeds")
 async def get_project_feeds():
@@ -272,16 +435,8 @@ async def get_project_feeds():
     logger.info("Fetching project feeds")
     
     try:
-        # Fetch audited project feeds
-        project_feeds = await fetch_audited_project_feeds()
-        logger.info(f"Retrieved feeds for {len(project_feeds)} projects")
-        
-        # Fetch Pashov Audit Group feed
-        pashov_feed = await fetch_pashov_audit_group_feed()
-        logger.info(f"Retrieved {len(pashov_feed)} Pashov feed items")
-        
-        # Combine feeds
-        all_feeds = {**project_feeds, "PashovAuditGrp": pashov_feed}
+        # Stored audited project and Pashov Audit Group feeds, through the feed cache
+        all_feeds = await feed_cache.get_feeds(all_feed_accounts())
         
         logger.info(f"Returning feeds for {len(all_feeds)} sources")
         return all_feeds
@@ -300,42 +455,25 @@ async def get_project_feeds():
         logger.info("Returning fallback project feeds")
         return fallback_feeds
 
-@app.post("/api/refresh-feeds")
-async def refresh_project_feeds(db: Session = Depends(get_db)):
-    """Refresh project feeds from Twitter"""
-    logger.info("Starting project feeds refresh")
-    
-    try:
-        # Fetch audited project feeds
-        logger.info("Fetching audited project feeds...")
-        project_feeds = await fetch_audited_project_feeds()
-        logger.info(f"Retrieved feeds for {len(project_feeds)} projects")
-        
-        # Fetch Pashov Audit Group feed
-        logger.info("Fetching Pashov Audit Group feed...")
-        pashov_feed = await fetch_pashov_audit_group_feed()
-        logger.info(f"Retrieved {len(pashov_feed)} Pashov feed items")
-        
-        # Store feeds in database or cache
-        # For now, we'll return them directly
-        all_feeds = {**project_feeds, "PashovAuditGrp": pashov_feed}
-        
-        logger.info(f"Successfully refreshed project feeds")
-        return {"success": True, "message": f"Refreshed feeds for {len(all_feeds)} sources"}
-        
-    except Exception as e:
-        logger.error(f"Error during feeds refresh: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to refresh feeds: {str(e)}")
+@app.post("/api/refresh-feeds", response_model=IngestJobResponse, status_code=202)
+async def refresh_project_feeds(background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db)):
+    """Queue a refresh of the project feeds; poll /api/jobs/{id} for progress"""
+    feed_cache.invalidate()
+    job = await db.run_sync(create_ingest_job, [SOURCE_FEEDS])
+    logger.info(f"Queued project feeds refresh as ingest job {job.id}")
+    background_tasks.add_task(ingest_scheduler.run_job, job.id)
+    return job
 
 @app.get("/api/feed-analytics")
-async def get_feed_analytics(db: Session = Depends(get_db)):
+async def get_feed_analytics(db: AsyncSession = Depends(get_async_db)):
     """Get analytics for project feeds"""
     try:
         # Count tweets by sender
-        from sqlalchemy import func
-        feed_counts = db.query(Message.sender, func.count(Message.id)).filter(
-            Message.source == MessageSource.TWITTER_FEED
-        ).group_by(Message.sender).all()
+        feed_counts = (await db.execute(
+            select(Message.sender, func.count(Message.id))
+            .where(Message.source == MessageSource.TWITTER_FEED)
+            .group_by(Message.sender)
+        )).all()
         
         analytics = {
             "total_feeds": sum(count for _, count in feed_counts),
@@ -349,27 +487,17 @@ async def get_feed_analytics(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error fetching feed analytics: {str(e)}")
 
 @app.get("/api/stats")
-async def get_stats(db: Session = Depends(get_db)):
+async def get_stats(db: AsyncSession = Depends(get_async_db)):
     """Get message statistics"""
-    total_messages = db.query(Message).count()
-    telegram_count = db.query(Message).filter(Message.source == MessageSource.TELEGRAM).count()
-    twitter_count = db.query(Message).filter(Message.source == MessageSource.TWITTER).count()
-    
-    urgent_count = db.query(Message).filter(Message.category == MessageCategory.URGENT).count()
-    high_priority_count = db.query(Message).filter(Message.category == MessageCategory.HIGH_PRIORITY).count()
-    routine_count = db.query(Message).filter(Message.category == MessageCategory.ROUTINE).count()
-    archive_count = db.query(Message).filter(Message.category == MessageCategory.ARCHIVE).count()
+    counts = await db.run_sync(read_counters)
     
     return {
-        "total_messages": total_messages,
-        "telegram_messages": telegram_count,
-        "twitter_messages": twitter_count,
-        "categories": {
-            "urgent": urgent_count,
-            "high_priority": high_priority_count,
-            "routine": routine_count,
-            "archive": archive_count
-        }
+        "total_messages": counts["total"],
+        "unread_messages": counts["unread"],
+        "telegram_messages": counts["by_source"][MessageSource.TELEGRAM.value],
+        "twitter_messages": counts["by_source"][MessageSource.TWITTER.value],
+        "categories": counts["by_category"],
+        "category_by_source": counts["by_source_category"]
     }
 
 if __name__ == "__main__":
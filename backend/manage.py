@@ -0,0 +1,62 @@
+"""
+Maintenance commands. Run from the backend directory:
+
+    python manage.py migrate
+    python manage.py reconcile-counters
+    python manage.py archive [--max-age-days 30] [--batch-size 500] [--no-vacuum]
+"""
+import argparse
+
+from config.config import RETENTION_BATCH_SIZE, RETENTION_MAX_AGE_DAYS
+from database import SessionLocal, engine
+
+def migrate(args):
+    from migrations import run_migrations
+
+    applied = run_migrations(engine)
+    print(f"Applied migrations: {applied}" if applied else "Database is up to date")
+
+def reconcile_counters(args):
+    from services.stats_service import read_counters, reconcile_counters as rebuild
+
+    db = SessionLocal()
+    try:
+        before = read_counters(db)
+        after = rebuild(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Counters rebuilt: {before['total']} -> {after['total']} messages")
+    for source, categories in after["by_source_category"].items():
+        print(f"  {source}: {categories}")
+
+def archive(args):
+    from migrations import run_migrations
+    from services.retention_service import run_retention
+
+    # The cold tier table may not exist yet
+    run_migrations(engine)
+    result = run_retention(engine, args.max_age_days, args.batch_size, vacuum_after=not args.no_vacuum)
+    print(f"Archived {result.archived} messages in {result.batches} batches"
+          + (", vacuumed" if result.vacuumed else ""))
+
+def main():
+    parser = argparse.ArgumentParser(description="Comms Command Center maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("migrate", help="Apply pending schema migrations").set_defaults(func=migrate)
+    subparsers.add_parser(
+        "reconcile-counters", help="Rebuild message_counters from the messages table"
+    ).set_defaults(func=reconcile_counters)
+    archive_parser = subparsers.add_parser(
+        "archive", help="Move old and archive-category messages to the cold tier"
+    )
+    archive_parser.add_argument("--max-age-days", type=int, default=RETENTION_MAX_AGE_DAYS)
+    archive_parser.add_argument("--batch-size", type=int, default=RETENTION_BATCH_SIZE)
+    archive_parser.add_argument("--no-vacuum", action="store_true", help="Skip VACUUM after archiving")
+    archive_parser.set_defaults(func=archive)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Versioned schema migrations, applied in order at startup by init_db
+(or with `python manage.py migrate`).
+
+create_all only creates missing tables, so anything that changes an existing
+table (new columns, new indexes, backfills) is registered here with the
+@migration decorator. Migrations must be safe to run against a database that
+create_all has just created, where the change may already be in place.
+"""
+import logging
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+
+from config.config import CATEGORIZATION_POOL_THRESHOLD
+from database import Base
+from models import FetchCursor, Message, MessageProject, MessageTerm, SchemaMigration
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Session], None]]] = []
+
+def migration(version: int, description: str):
+    """Register a migration function taking a Session; versions must be unique"""
+    def register(fn):
+        if any(existing == version for existing, _, _ in MIGRATIONS):
+            raise ValueError(f"Duplicate migration version {version}")
+        MIGRATIONS.append((version, description, fn))
+        return fn
+    return register
+
+def add_column_if_missing(db: Session, table, column_name: str):
+    """ALTER TABLE ADD COLUMN for a model column the database does not have yet"""
+    connection = db.connection()
+    existing = {column["name"] for column in inspect(connection).get_columns(table.name)}
+    if column_name in existing:
+        return
+    column = table.columns[column_name]
+    column_type = column.type.compile(dialect=connection.dialect)
+    db.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
+def create_index_if_missing(db: Session, table_name: str, index_name: str, columns: List[str]):
+    """
+    Create an index with explicit columns. Migrations spell out their indexes
+    rather than reading __table_args__, so they keep working after the model changes.
+    """
+    db.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({', '.join(columns)})"))
+
+def drop_index_if_exists(db: Session, index_name: str):
+    db.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+
+@migration(1, "Add categorization evidence columns to messages")
+def add_match_evidence(db: Session):
+    from services.categorization_service import CategorizationService, RULE_MANUAL
+
+    for column_name in ("matched_keywords", "matched_projects", "category_rule"):
+        add_column_if_missing(db, Message.__table__, column_name)
+
+    # Backfill evidence; categories that disagree with the rules were set by hand.
+    # Batches are as large as the process-pool threshold, so full ones are scored in the pool
+    categorization_service = CategorizationService()
+    last_id = 0
+    while True:
+        batch = (
+            db.query(Message)
+            .filter(Message.id > last_id, Message.category_rule.is_(None))
+            .order_by(Message.id)
+            .limit(CATEGORIZATION_POOL_THRESHOLD)
+            .all()
+        )
+        if not batch:
+            break
+        results = categorization_service.analyze_batch(
+            [message.content for message in batch], [message.sender for message in batch]
+        )
+        for message, result in zip(batch, results):
+            message.matched_keywords = result.matched_keywords
+            message.matched_projects = result.matched_projects
+            message.category_rule = result.rule if result.category == message.category else RULE_MANUAL
+        db.flush()
+        last_id = batch[-1].id
+        # The whole backfill is one transaction; drop flushed messages so memory stays at one batch
+        db.expunge_all()
+
+@migration(2, "Build the inverted term index for existing messages")
+def build_term_index(db: Session):
+    from services.recategorization_service import rebuild_term_index
+
+    if db.query(MessageTerm).first() is None and db.query(Message).first() is not None:
+        indexed = rebuild_term_index(db, commit=False)
+        logger.info(f"Built term index for {indexed} messages")
+
+@migration(3, "Add composite indexes for filtered inbox queries")
+def add_inbox_indexes(db: Session):
+    create_index_if_missing(db, "messages", "ix_messages_timestamp", ["timestamp"])
+    create_index_if_missing(db, "messages", "ix_messages_category_timestamp", ["category", "timestamp"])
+    create_index_if_missing(db, "messages", "ix_messages_source_timestamp", ["source", "timestamp"])
+
+@migration(4, "Add full-text search index for message content")
+def add_search_index(db: Session):
+    from services.search_service import create_search_index
+
+    create_search_index(db)
+
+@migration(5, "Backfill message_projects from stored project evidence")
+def backfill_project_mentions(db: Session):
+    from services.ingest_service import record_project_mentions
+
+    if db.query(MessageProject).first() is not None:
+        return
+    last_id = 0
+    while True:
+        batch = (
+            db.query(Message)
+            .filter(Message.id > last_id)
+            .order_by(Message.id)
+            .limit(1000)
+            .all()
+        )
+        if not batch:
+            break
+        record_project_mentions(db, batch)
+        db.flush()
+        last_id = batch[-1].id
+
+@migration(6, "Build message_counters for dashboard stats")
+def build_message_counters(db: Session):
+    from services.stats_service import reconcile_counters
+
+    reconcile_counters(db)
+
+@migration(7, "Index (timestamp, id) for keyset pagination")
+def add_keyset_index(db: Session):
+    create_index_if_missing(db, "messages", "ix_messages_timestamp_id", ["timestamp", "id"])
+    # Superseded by the (timestamp, id) index
+    drop_index_if_exists(db, "ix_messages_timestamp")
+
+@migration(8, "Build hourly activity_rollups")
+def build_activity_rollups(db: Session):
+    from services.stats_service import rebuild_rollups
+
+    rebuild_rollups(db)
+
+@migration(9, "Index (source, sender, timestamp) for stored project feeds")
+def add_feed_index(db: Session):
+    create_index_if_missing(
+        db, "messages", "ix_messages_source_sender_timestamp", ["source", "sender", "timestamp"]
+    )
+
+@migration(10, "Leave project feed tweets out of message_counters and activity_rollups")
+def uncount_feed_tweets(db: Session):
+    from services.stats_service import rebuild_rollups, reconcile_counters
+
+    reconcile_counters(db)
+    rebuild_rollups(db)
+
+@migration(11, "Add gap columns to fetch_cursors for truncated listings")
+def add_cursor_gap_columns(db: Session):
+    for column_name in ("until_id", "resume_id"):
+        add_column_if_missing(db, FetchCursor.__table__, column_name)
+
+def run_migrations(engine) -> List[int]:
+    """Create missing tables, then apply pending migrations in version order, each in its own transaction"""
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        applied = {version for (version,) in db.query(SchemaMigration.version)}
+
+    newly_applied = []
+    for version, description, fn in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in applied:
+            continue
+        logger.info(f"Applying migration {version}: {description}")
+        with Session(engine) as db:
+            try:
+                fn(db)
+                db.add(SchemaMigration(version=version, description=description, applied_at=datetime.now()))
+                db.commit()
+            except Exception:
+                db.rollback()
+                logger.error(f"Migration {version} failed")
+                raise
+        newly_applied.append(version)
+    return newly_applied
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Boolean, JSON, ForeignKey, Index
 from sqlalchemy.sql import func
 from database import Base
+from datetime import datetime, timezone
 import enum
 
 class MessageCategory(enum.Enum):
@@ -14,9 +15,26 @@ class MessageSource(enum.Enum):
     TWITTER = "TWITTER"
     TWITTER_FEED = "TWITTER_FEED"
 
-class Message(Base):
-    __tablename__ = "messages"
+# Project feed tweets are stored as messages but are not inbox traffic: they are
+# listed only when asked for by source and are left out of the counters and rollups
+FEED_SOURCES = (MessageSource.TWITTER_FEED,)
+
+def as_utc(timestamp: datetime) -> datetime:
+    """A timestamp as stored on messages: naive UTC. Aware values are converted; naive ones are taken as UTC."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+def utc_isoformat(timestamp: datetime) -> str:
+    """ISO 8601 with an explicit +00:00 offset, so clients do not read stored timestamps as local time"""
+    return as_utc(timestamp).replace(tzinfo=timezone.utc).isoformat()
+
+def utc_now() -> datetime:
+    """Current time as naive UTC, the basis of message timestamps and the windows compared with them"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
 
+class MessageColumns:
+    """Columns shared by the hot messages table and the archived_messages cold tier"""
     id = Column(Integer, primary_key=True, index=True)
     external_id = Column(String, unique=True, index=True)  # ID from Telegram/Twitter
     source = Column(Enum(MessageSource), nullable=False)
@@ -25,5 +43,132 @@ class Message(Base):
     category = Column(Enum(MessageCategory), default=MessageCategory.ROUTINE)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
     is_read = Column(Boolean, default=False)
+    # Match evidence recorded when the message is categorized
+    matched_keywords = Column(JSON(none_as_null=True))  # {category: [keywords]}
+    matched_projects = Column(JSON(none_as_null=True))  # [audited project names]
+    category_rule = Column(String)  # Rule that decided the category
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class Message(MessageColumns, Base):
+    __tablename__ = "messages"
+    __table_args__ = (
+        # Inbox listing: optional category/source filter, newest first, keyset on (timestamp, id)
+        Index("ix_messages_timestamp_id", "timestamp", "id"),
+        Index("ix_messages_category_timestamp", "category", "timestamp"),
+        Index("ix_messages_source_timestamp", "source", "timestamp"),
+        # Stored project feeds: latest tweets per account
+        Index("ix_messages_source_sender_timestamp", "source", "sender", "timestamp"),
+    )
+
+class ArchivedMessage(MessageColumns, Base):
+    """Cold tier: old and archive-category messages moved out of messages by retention"""
+    __tablename__ = "archived_messages"
+    __table_args__ = (
+        Index("ix_archived_messages_timestamp_id", "timestamp", "id"),
+    )
+
+    # Rows keep the id they had in messages
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class IndexTerm(Base):
+    """Vocabulary of lowercased word tokens seen in message content"""
+    __tablename__ = "index_terms"
+
+    id = Column(Integer, primary_key=True)
+    term = Column(String, unique=True, index=True, nullable=False)
+
+class MessageTerm(Base):
+    """Inverted index posting: a message contains a vocabulary term"""
+    __tablename__ = "message_terms"
+    __table_args__ = (
+        Index("ix_message_terms_message_id", "message_id"),
+    )
+
+    term_id = Column(Integer, ForeignKey("index_terms.id", ondelete="CASCADE"), primary_key=True)
+    message_id = Column(Integer, ForeignKey("messages.id", ondelete="CASCADE"), primary_key=True)
+
+class MessageProject(Base):
+    """Audited project mentioned by a message, extracted at ingest"""
+    __tablename__ = "message_projects"
+    __table_args__ = (
+        Index("ix_message_projects_message_id", "message_id"),
+    )
+
+    project = Column(String, primary_key=True)
+    message_id = Column(Integer, ForeignKey("messages.id", ondelete="CASCADE"), primary_key=True)
+
+class RecategorizationJob(Base):
+    """Resumable re-scoring of the messages affected by a keyword rule change"""
+    __tablename__ = "recategorization_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    terms = Column(JSON, nullable=False)  # Keywords added or removed
+    status = Column(String, nullable=False, default="pending")  # pending, running, completed, failed
+    total = Column(Integer, default=0)  # Candidate messages found through the term index
+    processed = Column(Integer, default=0)
+    changed = Column(Integer, default=0)
+    last_message_id = Column(Integer, default=0)  # Checkpoint: candidates are processed in id order
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class IngestJob(Base):
+    """One ingestion run, scheduled or requested through a refresh endpoint"""
+    __tablename__ = "ingest_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sources = Column(JSON, nullable=False)  # telegram, twitter, project_feeds
+    trigger = Column(String, nullable=False, default="manual")  # manual or scheduled
+    status = Column(String, nullable=False, default="pending")  # pending, running, completed, failed
+    fetched = Column(Integer, default=0)
+    inserted = Column(Integer, default=0)
+    skipped = Column(Integer, default=0)
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+
+class MessageCounter(Base):
+    """Running message count per (source, category, is_read), kept in step with writes"""
+    __tablename__ = "message_counters"
+
+    source = Column(Enum(MessageSource), primary_key=True)
+    category = Column(Enum(MessageCategory), primary_key=True)
+    is_read = Column(Boolean, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class ActivityRollup(Base):
+    """
+    Messages per hour by (source, category, project), kept in step with writes.
+    project is "" for the row counting every message; a message mentioning
+    audited projects also counts once under each of them.
+    """
+    __tablename__ = "activity_rollups"
+
+    bucket_start = Column(DateTime, primary_key=True)  # Timestamp truncated to the hour
+    source = Column(Enum(MessageSource), primary_key=True)
+    category = Column(Enum(MessageCategory), primary_key=True)
+    project = Column(String, primary_key=True, default="")
+    count = Column(Integer, nullable=False, default=0)
+
+class FetchCursor(Base):
+    """High-water mark of an incremental fetch: the newest item id seen per source and account"""
+    __tablename__ = "fetch_cursors"
+
+    source = Column(String, primary_key=True)  # e.g. telegram_updates, twitter_mentions, twitter_feed
+    account = Column(String, primary_key=True, default="")  # "" for single-account sources
+    last_id = Column(String, nullable=False)  # Twitter since_id or last Telegram update_id
+    # Set while a truncated listing's gap is fetched: its until_id, and the newest id already seen
+    until_id = Column(String)
+    resume_id = Column(String)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class SchemaMigration(Base):
+    """Schema migrations that have been applied to this database"""
+    __tablename__ = "schema_migrations"
+
+    version = Column(Integer, primary_key=True)
+    description = Column(String, nullable=False)
+    applied_at = Column(DateTime(timezone=True), nullable=False)
@@ -1,7 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, field_serializer
+from typing import Dict, List, Literal, Optional
 from datetime import datetime
-from models import MessageCategory, MessageSource
+from models import MessageCategory, MessageSource, utc_isoformat
 
 class MessageBase(BaseModel):
     source: MessageSource
@@ -16,13 +16,64 @@ class MessageResponse(MessageBase):
     is_read: bool
     created_at: datetime
     updated_at: Optional[datetime] = None
+    matched_keywords: Optional[Dict[str, List[str]]] = None
+    matched_projects: Optional[List[str]] = None
+    category_rule: Optional[str] = None
+    archived_at: Optional[datetime] = None  # Set for messages in the cold tier
+
+    @field_serializer("timestamp")
+    def serialize_timestamp(self, timestamp: datetime) -> str:
+        return utc_isoformat(timestamp)
 
     class Config:
         from_attributes = True
 
+class MessagePreview(BaseModel):
+    """List columns of a message, with a truncated content_preview in place of content"""
+    id: int
+    source: MessageSource
+    sender: str
+    category: MessageCategory = MessageCategory.ROUTINE
+    timestamp: datetime
+    is_read: bool
+    matched_projects: Optional[List[str]] = None
+    category_rule: Optional[str] = None
+    content_preview: str
+    content_truncated: bool
+    archived_at: Optional[datetime] = None  # Set for messages in the cold tier
+
+    @field_serializer("timestamp")
+    def serialize_timestamp(self, timestamp: datetime) -> str:
+        return utc_isoformat(timestamp)
+
 class MessageUpdate(BaseModel):
     category: MessageCategory
 
+class KeywordUpdate(BaseModel):
+    category: MessageCategory
+    keywords: List[str]
+    action: Literal["add", "remove"] = "add"
+
+class RecategorizationJobResponse(BaseModel):
+    id: int
+    terms: List[str]
+    status: str
+    total: int
+    processed: int
+    changed: int
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class CategoryExplanationResponse(BaseModel):
+    message_id: int
+    category: MessageCategory
+    category_rule: Optional[str] = None
+    explanation: str
+
 class TemplateResponse(BaseModel):
     id: int
     name: str
@@ -33,3 +84,19 @@ class StatsResponse(BaseModel):
     telegram_messages: int
     twitter_messages: int
     categories: dict
+
+class IngestJobResponse(BaseModel):
+    id: int
+    sources: List[str]
+    trigger: str
+    status: str
+    fetched: int
+    inserted: int
+    skipped: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
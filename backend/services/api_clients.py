@@ -0,0 +1,193 @@
+"""
+Long-lived Twitter and Telegram API clients, shared by twitter_feed_service,
+TwitterService and TelegramService so fetches reuse keep-alive connections
+instead of paying for a new TCP/TLS handshake every time.
+
+The app opens them in its startup hook and closes them on shutdown. Calls
+through them go through twitter_limiter / telegram_limiter (see rate_limiter).
+"""
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+try:
+    import tweepy
+    import requests
+    from requests.adapters import HTTPAdapter
+    TWITTER_AVAILABLE = True
+except ImportError:
+    TWITTER_AVAILABLE = False
+
+try:
+    from telegram import Bot
+    from telegram.error import BadRequest, NetworkError, RetryAfter
+    from telegram.request import HTTPXRequest
+    TELEGRAM_AVAILABLE = True
+except ImportError:
+    TELEGRAM_AVAILABLE = False
+
+from config.config import (
+    TWITTER_BEARER_TOKEN, TELEGRAM_BOT_TOKEN, API_CLIENT_POOL_SIZE, API_CLIENT_TIMEOUT, FETCH_MAX_PAGES
+)
+from services.rate_limiter import PRIORITY_NORMAL, RateLimiter, Throttle, capture_rate_limit_headers
+
+logger = logging.getLogger(__name__)
+
+# Documented per-app limits as (requests, window seconds), keyed by tweepy.Client
+# method; the x-rate-limit-* headers of each response take over from there
+TWITTER_RATE_LIMITS = {
+    "get_users_mentions": (450, 15 * 60),
+    "get_users_tweets": (1500, 15 * 60),
+}
+TWITTER_DEFAULT_RATE_LIMIT = (300, 15 * 60)
+
+# Bot API: about 30 requests per second per bot, keyed by Bot method
+TELEGRAM_RATE_LIMITS = {
+    "get_updates": (30, 1),
+    "send_message": (30, 1),
+}
+TELEGRAM_DEFAULT_RATE_LIMIT = (30, 1)
+
+def _twitter_throttle(error: Exception) -> Optional[Throttle]:
+    """429s wait for the window reset; server and connection errors back off"""
+    if not TWITTER_AVAILABLE:
+        return None
+    if isinstance(error, tweepy.TooManyRequests):
+        headers = error.response.headers
+        reset = headers.get("x-rate-limit-reset")
+        retry_after = max(0.0, float(reset) - time.time()) if reset else None
+        return Throttle(retry_after=retry_after, headers=headers)
+    if isinstance(error, (tweepy.TwitterServerError, requests.ConnectionError, requests.Timeout)):
+        return Throttle()
+    return None
+
+def _telegram_throttle(error: Exception) -> Optional[Throttle]:
+    """Flood control waits for retry_after; network errors and timeouts back off"""
+    if not TELEGRAM_AVAILABLE:
+        return None
+    if isinstance(error, RetryAfter):
+        retry_after = error.retry_after
+        if hasattr(retry_after, "total_seconds"):  # a timedelta in newer python-telegram-bot releases
+            retry_after = retry_after.total_seconds()
+        return Throttle(retry_after=float(retry_after))
+    if isinstance(error, NetworkError) and not isinstance(error, BadRequest):
+        return Throttle()
+    return None
+
+twitter_limiter = RateLimiter(
+    "twitter", TWITTER_RATE_LIMITS, TWITTER_DEFAULT_RATE_LIMIT, _twitter_throttle, concurrency=API_CLIENT_POOL_SIZE
+)
+telegram_limiter = RateLimiter(
+    "telegram", TELEGRAM_RATE_LIMITS, TELEGRAM_DEFAULT_RATE_LIMIT, _telegram_throttle, concurrency=API_CLIENT_POOL_SIZE
+)
+
+_twitter_client = None
+_telegram_bot = None
+
+def _configured(token: Optional[str]) -> bool:
+    return bool(token) and not token.startswith("your_")
+
+if TWITTER_AVAILABLE:
+    class _TimeoutAdapter(HTTPAdapter):
+        """HTTPAdapter that applies a default timeout; tweepy sends its requests without one"""
+
+        def __init__(self, timeout: float, **kwargs):
+            self.timeout = timeout
+            super().__init__(**kwargs)
+
+        def send(self, request, timeout=None, **kwargs):
+            return super().send(request, timeout=self.timeout if timeout is None else timeout, **kwargs)
+
+def _build_twitter_client():
+    client = tweepy.Client(bearer_token=TWITTER_BEARER_TOKEN)
+    # tweepy's requests session keeps up to 10 connections per host by
+    # default; size it for the concurrent feed fan-out, and stop a hung
+    # request from holding a worker thread forever
+    client.session.mount("https://", _TimeoutAdapter(
+        API_CLIENT_TIMEOUT, pool_connections=1, pool_maxsize=API_CLIENT_POOL_SIZE
+    ))
+    # tweepy's Response drops the HTTP headers; read the rate limit ones here
+    client.session.hooks["response"].append(capture_rate_limit_headers)
+    return client
+
+def get_twitter_client():
+    """The shared tweepy.Client, or None when Twitter is unavailable or not configured"""
+    global _twitter_client
+    if _twitter_client is None and TWITTER_AVAILABLE and _configured(TWITTER_BEARER_TOKEN):
+        # No network is involved, so scripts that skip the startup hook get one on first use
+        _twitter_client = _build_twitter_client()
+    return _twitter_client
+
+def get_telegram_bot():
+    """The shared telegram Bot opened at startup, or None"""
+    return _telegram_bot
+
+async def start_api_clients():
+    """Open the shared clients. Called from the app's startup hook."""
+    global _telegram_bot
+    get_twitter_client()
+
+    if _telegram_bot is None and TELEGRAM_AVAILABLE and _configured(TELEGRAM_BOT_TOKEN):
+        def request():
+            return HTTPXRequest(
+                connection_pool_size=API_CLIENT_POOL_SIZE,
+                connect_timeout=API_CLIENT_TIMEOUT,
+                read_timeout=API_CLIENT_TIMEOUT
+            )
+        requests = [request(), request()]
+        bot = Bot(TELEGRAM_BOT_TOKEN, request=requests[0], get_updates_request=requests[1])
+        try:
+            # Also verifies the token with getMe
+            await bot.initialize()
+            _telegram_bot = bot
+        except Exception as e:
+            logger.error(f"Failed to initialize Telegram bot client: {e}")
+            for pending in requests:
+                await pending.shutdown()
+
+async def close_api_clients():
+    """Close the shared clients and their connection pools. Called on shutdown."""
+    global _twitter_client, _telegram_bot
+    if _twitter_client is not None:
+        _twitter_client.session.close()
+        _twitter_client = None
+    if _telegram_bot is not None:
+        await _telegram_bot.shutdown()
+        _telegram_bot = None
+
+class ListingTruncated(Exception):
+    """
+    A since_id listing stopped at max_pages with older results left unread.
+    Raised after the last page read; the pages already yielded stand.
+    """
+
+async def iter_tweet_pages(
+    method,
+    max_pages: int = FETCH_MAX_PAGES,
+    priority: int = PRIORITY_NORMAL,
+    **params
+) -> AsyncIterator[Tuple[List, Dict]]:
+    """
+    Call a paginated tweepy.Client method (get_users_mentions,
+    get_users_tweets, ...) page by page until no next_token is left or
+    max_pages pages were read, yielding each page's tweets and expanded
+    users by id. Each synchronous call runs in a worker thread and is rate
+    limited as the method's endpoint family, at the given priority.
+
+    Results come newest first, so a since_id listing cut short by max_pages
+    leaves a gap just above since_id: it ends with ListingTruncated.
+    """
+    pagination_token = None
+    for _ in range(max_pages):
+        if pagination_token:
+            params["pagination_token"] = pagination_token
+        response = await twitter_limiter.call(
+            method.__name__, lambda: asyncio.to_thread(method, **params), priority
+        )
+        yield response.data or [], {user.id: user for user in (response.includes or {}).get("users", [])}
+        pagination_token = (response.meta or {}).get("next_token")
+        if not pagination_token:
+            return
+    if params.get("since_id"):
+        raise ListingTruncated(f"{method.__name__} stopped after {max_pages} pages")
@@ -1,118 +1,238 @@
 import re
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
 from models import MessageCategory
+from services.keyword_matcher import KeywordMatcher
 from config.config import (
     AUDITED_PROJECTS, 
     WEB3_URGENT_KEYWORDS, 
     WEB3_HIGH_PRIORITY_KEYWORDS, 
     WEB3_ARCHIVE_KEYWORDS,
-    IMPORTANT_WEB3_SENDERS
+    IMPORTANT_WEB3_SENDERS,
+    CATEGORIZATION_POOL_THRESHOLD,
+    CATEGORIZATION_WORKERS
 )
 
+# Tags used by the multi-pattern matcher; keyword tags reuse the category values
+URGENT_TAG = MessageCategory.URGENT.value
+HIGH_PRIORITY_TAG = MessageCategory.HIGH_PRIORITY.value
+ARCHIVE_TAG = MessageCategory.ARCHIVE.value
+PROJECT_TAG = "project"
+SENDER_TAG = "sender"
+KEYWORD_TAGS = (URGENT_TAG, ARCHIVE_TAG, HIGH_PRIORITY_TAG)
+
+# Rules that can decide a message's category, stored as Message.category_rule
+RULE_URGENT_KEYWORDS = "urgent_keywords"
+RULE_ARCHIVE_KEYWORDS = "archive_keywords"
+RULE_AUDITED_PROJECTS = "audited_projects"
+RULE_HIGH_PRIORITY_KEYWORDS = "high_priority_keywords"
+RULE_IMPORTANT_SENDER = "important_sender"
+RULE_DEFAULT = "default"
+RULE_MANUAL = "manual"
+
+@dataclass
+class CategorizationResult:
+    """Category of a message together with the evidence that produced it"""
+    category: MessageCategory
+    rule: str
+    matched_keywords: Dict[str, List[str]] = field(default_factory=dict)
+    matched_projects: List[str] = field(default_factory=list)
+
+    def as_columns(self) -> Dict[str, Any]:
+        """Values for the Message columns that persist this result"""
+        return {
+            "category": self.category,
+            "category_rule": self.rule,
+            "matched_keywords": self.matched_keywords,
+            "matched_projects": self.matched_projects,
+        }
+
 class CategorizationService:
     def __init__(self):
-        # Use Web3-specific keywords from config
-        self.urgent_keywords = WEB3_URGENT_KEYWORDS
-        self.high_priority_keywords = WEB3_HIGH_PRIORITY_KEYWORDS
-        self.archive_keywords = WEB3_ARCHIVE_KEYWORDS
-        self.important_senders = IMPORTANT_WEB3_SENDERS
+        # Use Web3-specific keywords from config (copied so updates stay per-instance)
+        self.urgent_keywords = list(WEB3_URGENT_KEYWORDS)
+        self.high_priority_keywords = list(WEB3_HIGH_PRIORITY_KEYWORDS)
+        self.archive_keywords = list(WEB3_ARCHIVE_KEYWORDS)
+        self.important_senders = list(IMPORTANT_WEB3_SENDERS)
         
         # Flatten audited projects for easier checking
         self.audited_projects = []
         for category, projects in AUDITED_PROJECTS.items():
             self.audited_projects.extend(projects)
 
+        self._build_matchers()
+
+    def _build_matchers(self):
+        """Compile keyword, project and sender terms into single-pass matchers"""
+        self._content_matcher = KeywordMatcher(
+            [(URGENT_TAG, kw) for kw in self.urgent_keywords] +
+            [(ARCHIVE_TAG, kw) for kw in self.archive_keywords] +
+            [(HIGH_PRIORITY_TAG, kw) for kw in self.high_priority_keywords] +
+            [(PROJECT_TAG, project) for project in self.audited_projects]
+        )
+        self._sender_matcher = KeywordMatcher(
+            [(SENDER_TAG, term) for term in self.important_senders]
+        )
+
+    def match_terms(self, content: str, sender: str = "") -> Dict[str, List[str]]:
+        """
+        Find every keyword, audited project and important sender term in one pass
+        Returns: dict of tag (urgent, archive, high_priority, project, sender) -> matched terms
+        """
+        hits = self._content_matcher.match(content)
+        if sender:
+            hits.update(self._sender_matcher.match(sender))
+        return hits
+
     def categorize_message(self, content: str, sender: str = "") -> MessageCategory:
         """
         Categorize a message based on its content and sender with Web3-specific logic
         Returns: MessageCategory (URGENT, HIGH_PRIORITY, ROUTINE, or ARCHIVE)
         """
-        content_lower = content.lower()
-        sender_lower = sender.lower()
+        hits = self.match_terms(content, sender)
         
         # Check for urgent keywords first (highest priority)
-        if self._contains_urgent_keywords(content_lower):
+        if URGENT_TAG in hits:
             return MessageCategory.URGENT
         
         # Check for archive keywords
-        if self._contains_archive_keywords(content_lower):
+        if ARCHIVE_TAG in hits:
             return MessageCategory.ARCHIVE
         
         # Check for high priority keywords, important senders, or audited project mentions
-        if (self._contains_high_priority_keywords(content_lower) or 
-            self._is_important_sender(sender_lower) or
-            self._mentions_audited_project(content_lower)):
+        if HIGH_PRIORITY_TAG in hits or SENDER_TAG in hits or PROJECT_TAG in hits:
             return MessageCategory.HIGH_PRIORITY
         
         # Default to routine
         return MessageCategory.ROUTINE
 
-    def _contains_urgent_keywords(self, content: str) -> bool:
-        """Check if content contains urgent keywords"""
-        for keyword in self.urgent_keywords:
-            if keyword in content:
-                return True
-        return False
-
-    def _contains_high_priority_keywords(self, content: str) -> bool:
-        """Check if content contains high priority keywords"""
-        for keyword in self.high_priority_keywords:
-            if keyword in content:
-                return True
-        return False
-
-    def _contains_archive_keywords(self, content: str) -> bool:
-        """Check if content contains archive keywords"""
-        for keyword in self.archive_keywords:
-            if keyword in content:
-                return True
-        return False
-
-    def _is_important_sender(self, sender: str) -> bool:
-        """Check if sender is considered important"""
-        for important_term in self.important_senders:
-            if important_term in sender:
-                return True
-        return False
-
-    def _mentions_audited_project(self, content: str) -> bool:
-        """Check if content mentions any audited project"""
-        for project in self.audited_projects:
-            if project.lower() in content:
-                return True
-        return False
+    def categorize_batch(
+        self,
+        contents: List[str],
+        senders: Optional[List[str]] = None,
+        workers: Optional[int] = None,
+        pool_threshold: Optional[int] = None
+    ) -> List[MessageCategory]:
+        """
+        Categorize many messages at once, in the same order as the input.
+        Batches of at least pool_threshold messages are split into chunks and
+        spread across a process pool; smaller batches are handled in-process.
+        """
+        results = self.analyze_batch(contents, senders, workers, pool_threshold)
+        return [result.category for result in results]
+
+    def analyze_batch(
+        self,
+        contents: List[str],
+        senders: Optional[List[str]] = None,
+        workers: Optional[int] = None,
+        pool_threshold: Optional[int] = None
+    ) -> List[CategorizationResult]:
+        """Batch version of analyze_message, with the same pooling as categorize_batch"""
+        if senders is None:
+            senders = [""] * len(contents)
+        if len(senders) != len(contents):
+            raise ValueError("contents and senders must have the same length")
+
+        workers = workers or CATEGORIZATION_WORKERS
+        if pool_threshold is None:
+            pool_threshold = CATEGORIZATION_POOL_THRESHOLD
+
+        if workers <= 1 or len(contents) < pool_threshold:
+            return [
+                self.analyze_message(content or "", sender or "")
+                for content, sender in zip(contents, senders)
+            ]
+
+        # Several chunks per worker keeps the pool busy when chunks finish unevenly
+        pairs = list(zip(contents, senders))
+        chunk_size = max(1, -(-len(pairs) // (workers * 4)))
+        chunks = [pairs[i:i + chunk_size] for i in range(0, len(pairs), chunk_size)]
+
+        results = []
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self._rules(),)
+        ) as executor:
+            for chunk_results in executor.map(_analyze_chunk, chunks):
+                results.extend(chunk_results)
+        return results
+
+    def _rules(self) -> Dict[str, List[str]]:
+        """Snapshot of the current rules, used to rebuild the service in worker processes"""
+        return {
+            "urgent_keywords": list(self.urgent_keywords),
+            "high_priority_keywords": list(self.high_priority_keywords),
+            "archive_keywords": list(self.archive_keywords),
+            "important_senders": list(self.important_senders),
+            "audited_projects": list(self.audited_projects),
+        }
 
     def get_mentioned_projects(self, content: str) -> List[str]:
         """Get list of audited projects mentioned in the content"""
-        mentioned = []
-        for project in self.audited_projects:
-            if project.lower() in content.lower():
-                mentioned.append(project)
-        return mentioned
+        return self._content_matcher.match(content).get(PROJECT_TAG, [])
+
+    def analyze_message(self, content: str, sender: str = "") -> CategorizationResult:
+        """
+        Categorize a message and keep the evidence: matched keywords by category,
+        mentioned audited projects and the rule that decided the category
+        """
+        hits = self.match_terms(content, sender)
+        keywords = {tag: hits[tag] for tag in KEYWORD_TAGS if tag in hits}
+        projects = hits.get(PROJECT_TAG, [])
+
+        # Same precedence as get_category_explanation
+        if URGENT_TAG in hits:
+            category, rule = MessageCategory.URGENT, RULE_URGENT_KEYWORDS
+        elif ARCHIVE_TAG in hits:
+            category, rule = MessageCategory.ARCHIVE, RULE_ARCHIVE_KEYWORDS
+        elif PROJECT_TAG in hits:
+            category, rule = MessageCategory.HIGH_PRIORITY, RULE_AUDITED_PROJECTS
+        elif HIGH_PRIORITY_TAG in hits:
+            category, rule = MessageCategory.HIGH_PRIORITY, RULE_HIGH_PRIORITY_KEYWORDS
+        elif SENDER_TAG in hits:
+            category, rule = MessageCategory.HIGH_PRIORITY, RULE_IMPORTANT_SENDER
+        else:
+            category, rule = MessageCategory.ROUTINE, RULE_DEFAULT
+
+        return CategorizationResult(category, rule, keywords, projects)
 
     def get_category_explanation(self, content: str, sender: str = "") -> str:
         """Get explanation for why a message was categorized as it was"""
-        content_lower = content.lower()
-        sender_lower = sender.lower()
-        
-        if self._contains_urgent_keywords(content_lower):
-            found_keywords = [kw for kw in self.urgent_keywords if kw in content_lower]
-            return f"Marked as URGENT due to keywords: {', '.join(found_keywords)}"
+        result = self.analyze_message(content, sender)
+        return self.explain(result.rule, result.matched_keywords, result.matched_projects, sender, result.category)
+
+    def explain(
+        self,
+        rule: str,
+        matched_keywords: Dict[str, List[str]],
+        matched_projects: List[str],
+        sender: str = "",
+        category: Optional[MessageCategory] = None
+    ) -> str:
+        """Build the explanation text from stored evidence, without rescanning the content"""
+        matched_keywords = matched_keywords or {}
+        matched_projects = matched_projects or []
+
+        if rule == RULE_URGENT_KEYWORDS:
+            return f"Marked as URGENT due to keywords: {', '.join(matched_keywords.get(URGENT_TAG, []))}"
         
-        if self._contains_archive_keywords(content_lower):
-            found_keywords = [kw for kw in self.archive_keywords if kw in content_lower]
-            return f"Marked as ARCHIVE due to keywords: {', '.join(found_keywords)}"
+        if rule == RULE_ARCHIVE_KEYWORDS:
+            return f"Marked as ARCHIVE due to keywords: {', '.join(matched_keywords.get(ARCHIVE_TAG, []))}"
         
-        if self._mentions_audited_project(content_lower):
-            mentioned_projects = self.get_mentioned_projects(content_lower)
-            return f"Marked as HIGH PRIORITY due to audited project mentions: {', '.join(mentioned_projects)}"
+        if rule == RULE_AUDITED_PROJECTS:
+            return f"Marked as HIGH PRIORITY due to audited project mentions: {', '.join(matched_projects)}"
         
-        if self._contains_high_priority_keywords(content_lower):
-            found_keywords = [kw for kw in self.high_priority_keywords if kw in content_lower]
-            return f"Marked as HIGH PRIORITY due to keywords: {', '.join(found_keywords)}"
+        if rule == RULE_HIGH_PRIORITY_KEYWORDS:
+            return f"Marked as HIGH PRIORITY due to keywords: {', '.join(matched_keywords.get(HIGH_PRIORITY_TAG, []))}"
         
-        if self._is_important_sender(sender_lower):
+        if rule == RULE_IMPORTANT_SENDER:
             return f"Marked as HIGH PRIORITY due to important sender: {sender}"
+
+        if rule == RULE_MANUAL and category is not None:
+            return f"Marked as {category.value.replace('_', ' ').upper()} manually"
         
         return "Marked as ROUTINE - no specific keywords or sender indicators found"
 
@@ -132,3 +252,25 @@ class CategorizationService:
                 self.high_priority_keywords = [kw for kw in self.high_priority_keywords if kw not in keywords]
             elif category == MessageCategory.ARCHIVE:
                 self.archive_keywords = [kw for kw in self.archive_keywords if kw not in keywords]
+
+        # Recompile so the matchers reflect the new rules
+        self._build_matchers()
+
+
+# Per-process service used by categorize_batch workers
+_worker_service: Optional[CategorizationService] = None
+
+def _init_worker(rules: Dict[str, List[str]]):
+    """Build the worker's service from the parent's rules, including runtime keyword updates"""
+    global _worker_service
+    _worker_service = CategorizationService()
+    for name, terms in rules.items():
+        setattr(_worker_service, name, terms)
+    _worker_service._build_matchers()
+
+def _analyze_chunk(pairs: List[tuple]) -> List[CategorizationResult]:
+    """Analyze a chunk of (content, sender) pairs inside a worker process"""
+    return [
+        _worker_service.analyze_message(content or "", sender or "")
+        for content, sender in pairs
+    ]
@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from models import FetchCursor
+
+# Cursor sources
+TELEGRAM_UPDATES = "telegram_updates"
+TWITTER_MENTIONS = "twitter_mentions"
+TWITTER_FEED = "twitter_feed"
+
+CursorKey = Tuple[str, str]
+
+@dataclass
+class FetchWindow:
+    """Ids the next fetch asks for: newer than since_id and, while a gap is being filled, older than until_id"""
+    since_id: Optional[str] = None
+    until_id: Optional[str] = None
+
+def read_fetch_windows(db: Session) -> Dict[CursorKey, FetchWindow]:
+    """The next fetch window of every cursor, keyed by (source, account)"""
+    return {
+        (cursor.source, cursor.account): FetchWindow(cursor.last_id, cursor.until_id)
+        for cursor in db.query(FetchCursor)
+    }
+
+def _numeric_ids(ids: Iterable[Optional[str]]):
+    return [int(item_id) for item_id in ids if str(item_id or "").isdigit()]
+
+def highest_id(items: Iterable[Dict[str, Any]], previous: Optional[str] = None) -> Optional[str]:
+    """
+    Newest platform id among fetched items and the previous mark. Telegram
+    update ids and Twitter snowflake ids both grow over time; items with
+    non-numeric ids (mock data) never move the mark.
+    """
+    ids = _numeric_ids([*(item.get("id") for item in items), previous])
+    return str(max(ids)) if ids else None
+
+def lowest_id(items: Iterable[Dict[str, Any]], previous: Optional[str] = None) -> Optional[str]:
+    """Oldest platform id among fetched items and the previous mark, like highest_id"""
+    ids = _numeric_ids([*(item.get("id") for item in items), previous])
+    return str(min(ids)) if ids else None
+
+def move_cursor(
+    db: Session,
+    source: str,
+    account: str,
+    newest_id: Optional[str],
+    oldest_id: Optional[str] = None,
+    truncated: bool = False
+):
+    """
+    Record a fetch that returned ids from oldest_id to newest_id, in the
+    caller's transaction. A truncated fetch (a newest-first listing cut
+    short, see ListingTruncated) left a gap between the cursor and oldest_id:
+    the cursor stays put and the next fetch asks for the gap with until_id.
+    The newest id seen meanwhile is kept in resume_id and becomes the cursor
+    once a fetch completes.
+    """
+    cursor = db.get(FetchCursor, (source, account))
+    if truncated and cursor is not None:
+        if oldest_id is not None:
+            cursor.until_id = oldest_id
+            cursor.resume_id = highest_id([{"id": newest_id}], cursor.resume_id)
+            db.flush()
+        return
+
+    ids = _numeric_ids([newest_id, cursor.resume_id if cursor else None, cursor.last_id if cursor else None])
+    if not ids:
+        return
+    last_id = str(max(ids))
+    if cursor is None:
+        db.add(FetchCursor(source=source, account=account, last_id=last_id))
+    else:
+        cursor.last_id = last_id
+        cursor.until_id = cursor.resume_id = None
+    db.flush()
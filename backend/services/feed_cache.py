@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Set, Tuple
+
+from config.config import FEED_CACHE_TTL
+from services.feed_store import load_stored_feeds
+
+logger = logging.getLogger(__name__)
+
+FeedFetcher = Callable[[Dict[str, str]], Awaitable[Dict[str, List[dict]]]]
+
+class FeedCache:
+    """
+    Project feeds cached per Twitter account for `ttl` seconds, loaded from
+    the stored TWITTER_FEED messages by default.
+
+    A feed older than the TTL is still served while one background load
+    replaces it (stale-while-revalidate); only an account with no cached feed
+    makes the caller wait. Accounts that need a load at the same moment are
+    loaded together, and concurrent callers asking for an account already
+    being loaded wait on that load instead of starting another one. Feed
+    ingestion invalidates the cache, so new tweets show up straight away.
+    """
+
+    def __init__(self, fetch: FeedFetcher = load_stored_feeds, ttl: float = FEED_CACHE_TTL):
+        self._fetch = fetch
+        self.ttl = ttl
+        # twitter_id -> (monotonic time fetched, feed)
+        self._entries: Dict[str, Tuple[float, List[dict]]] = {}
+        # twitter_id -> future resolved by the fetch in flight for it
+        self._pending: Dict[str, asyncio.Future] = {}
+        # Bumped by invalidate() so fetches started earlier do not repopulate
+        self._generation = 0
+        self._tasks: Set[asyncio.Task] = set()
+
+    def invalidate(self):
+        """Drop every cached feed; the next request fetches fresh ones"""
+        self._entries.clear()
+        self._pending.clear()
+        self._generation += 1
+        logger.info("Feed cache invalidated")
+
+    async def get_feeds(self, accounts: Dict[str, str]) -> Dict[str, List[dict]]:
+        """Feeds of {name: twitter_id} accounts, served from the cache where possible"""
+        now = time.monotonic()
+        expired = {
+            twitter_id for twitter_id in set(accounts.values())
+            if twitter_id not in self._pending and (
+                twitter_id not in self._entries or now - self._entries[twitter_id][0] >= self.ttl
+            )
+        }
+        if expired:
+            self._start_fetch(sorted(expired))
+
+        feeds = {
+            twitter_id: self._entries[twitter_id][1]
+            for twitter_id in set(accounts.values()) if twitter_id in self._entries
+        }
+        missing = {
+            twitter_id: self._pending[twitter_id]
+            for twitter_id in set(accounts.values()) if twitter_id not in feeds
+        }
+        # Shielded so a cancelled request does not cancel a fetch others wait on
+        fetched = await asyncio.gather(*(asyncio.shield(future) for future in missing.values()))
+        feeds.update(zip(missing, fetched))
+        return {name: feeds[twitter_id] for name, twitter_id in accounts.items()}
+
+    def _start_fetch(self, twitter_ids: List[str]):
+        loop = asyncio.get_running_loop()
+        futures = {twitter_id: loop.create_future() for twitter_id in twitter_ids}
+        for future in futures.values():
+            # Nobody awaits a background refresh of a stale feed; mark its error as seen
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._pending.update(futures)
+        task = asyncio.create_task(self._fetch_into_cache(futures, self._generation))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _fetch_into_cache(self, futures: Dict[str, asyncio.Future], generation: int):
+        try:
+            feeds = await self._fetch({twitter_id: twitter_id for twitter_id in futures})
+        except Exception as e:
+            logger.error(f"Feed cache refresh failed for {', '.join(futures)}: {str(e)}")
+            for future in futures.values():
+                future.set_exception(e)
+        else:
+            now = time.monotonic()
+            for twitter_id, future in futures.items():
+                feed = feeds.get(twitter_id, [])
+                previous = self._entries.get(twitter_id)
+                if not feed and previous:
+                    # Keep serving the last feed rather than an empty result
+                    feed = previous[1]
+                if generation == self._generation:
+                    self._entries[twitter_id] = (now, feed)
+                future.set_result(feed)
+        finally:
+            for twitter_id, future in futures.items():
+                if self._pending.get(twitter_id) is future:
+                    del self._pending[twitter_id]
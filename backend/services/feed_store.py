@@ -0,0 +1,46 @@
+from typing import Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from config.config import FEED_ITEMS_PER_ACCOUNT
+from database import AsyncSessionLocal
+from models import Message, MessageSource, utc_isoformat
+
+def feed_item(message: Message) -> dict:
+    """A stored feed tweet in the shape the live feed fetch returns"""
+    return {
+        "id": message.id,
+        "source": message.source.value,
+        "sender": message.sender,
+        "content": message.content,
+        "timestamp": utc_isoformat(message.timestamp),
+        "category": message.category.value if message.category else None,
+    }
+
+def stored_feeds(
+    db: Session,
+    accounts: Dict[str, str],
+    per_account: int = FEED_ITEMS_PER_ACCOUNT
+) -> Dict[str, List[dict]]:
+    """
+    Newest stored TWITTER_FEED messages of {name: twitter_id} accounts,
+    newest first. Each account is one range scan of the
+    (source, sender, timestamp) index.
+    """
+    return {
+        name: [
+            feed_item(message) for message in db.scalars(
+                select(Message)
+                .where(Message.source == MessageSource.TWITTER_FEED, Message.sender == twitter_id)
+                .order_by(Message.timestamp.desc())
+                .limit(per_account)
+            )
+        ]
+        for name, twitter_id in accounts.items()
+    }
+
+async def load_stored_feeds(accounts: Dict[str, str]) -> Dict[str, List[dict]]:
+    """stored_feeds with a session of its own, for the feed cache"""
+    async with AsyncSessionLocal() as db:
+        return await db.run_sync(stored_feeds, accounts)
@@ -0,0 +1,218 @@
+"""
+Streaming ingestion in four stages connected by bounded queues:
+
+    fetch -> normalize -> categorize -> write
+
+Fetch runs up to fetch_concurrency producers (one per source or feed
+account) and queues their pages as they arrive. Normalize tags each item
+with its source and rechunks the stream into numbered batches. Categorize
+workers run analyze_batch on batches in the threadpool, and a single writer
+stores them in order, one transaction per batch, since SQLite has one
+writer anyway. A batch is only created when fewer than queue_size +
+categorize_workers batches are in flight, so a slow stage stalls the stages
+before it instead of letting fetched items pile up in memory.
+
+A producer's cursor moves in the transaction of the batch that ends its
+stream, once every item it yielded is stored. Twitter pages newest first,
+so a stream cut short must not advance the mark past the pages it missed:
+a failed producer keeps its cursor and is fetched again next time, and one
+that hit the page cap (ListingTruncated) records the gap it left instead.
+A producer with a page_timeout fails the same way when its next page takes
+longer than that, so one hung account cannot stall the whole run.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import AsyncIterator, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from config.config import (
+    INGEST_CATEGORIZE_WORKERS, INGEST_FETCH_CONCURRENCY, INGEST_PIPELINE_BATCH_SIZE, INGEST_QUEUE_SIZE
+)
+from models import IngestJob, MessageSource
+from services.categorization_service import CategorizationResult, CategorizationService
+from services.api_clients import ListingTruncated
+from services.cursor_service import CursorKey, highest_id, lowest_id, move_cursor
+from services.ingest_service import ingest_messages
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Producer:
+    """
+    One fetch stream: its pages, the source its items are tagged with, the
+    cursor it advances, and how many seconds it may take per page (None for no limit)
+    """
+    name: str
+    source: MessageSource
+    pages: AsyncIterator[List[dict]]
+    cursor: Optional[CursorKey] = None
+    page_timeout: Optional[float] = None
+
+@dataclass
+class _Page:
+    producer: Producer
+    items: List[dict]
+
+@dataclass
+class _End:
+    """A producer's stream is over: the ids it covered, and whether it failed or was truncated"""
+    producer: Producer
+    last_id: Optional[str]
+    oldest_id: Optional[str] = None
+    error: Optional[Exception] = None
+    truncated: bool = False
+
+@dataclass
+class Batch:
+    """Items stored in one transaction, with the cursors that move with them"""
+    sequence: int
+    items: List[dict]
+    cursors: List[_End] = field(default_factory=list)
+    results: Optional[List[CategorizationResult]] = None
+
+@dataclass
+class PipelineResult:
+    """Fetch errors per producer name; the items fetched before an error are still stored"""
+    fetched: int = 0
+    errors: List[Tuple[str, Exception]] = field(default_factory=list)
+
+async def _drain(queue: asyncio.Queue) -> AsyncIterator:
+    """Items put on the queue until the closing None"""
+    while (item := await queue.get()) is not None:
+        yield item
+
+async def normalize(events: AsyncIterator, batch_size: int) -> AsyncIterator[Batch]:
+    """
+    Tag fetched items with their producer's source and regroup them into
+    batches of batch_size. The buffer is flushed when a producer ends, so
+    its cursor travels with the batch holding its last items.
+    """
+    sequence = 0
+    buffer: List[dict] = []
+    async for event in events:
+        if isinstance(event, _Page):
+            buffer.extend({"source": event.producer.source.value, **item} for item in event.items)
+            while len(buffer) >= batch_size:
+                yield Batch(sequence, buffer[:batch_size])
+                sequence += 1
+                buffer = buffer[batch_size:]
+        elif event.error is None and event.producer.cursor is not None and event.last_id is not None:
+            yield Batch(sequence, buffer, [event])
+            sequence += 1
+            buffer = []
+    if buffer:
+        yield Batch(sequence, buffer)
+
+async def run_pipeline(
+    db,
+    job: IngestJob,
+    producers: List[Producer],
+    categorization_service: CategorizationService,
+    batch_size: int = INGEST_PIPELINE_BATCH_SIZE,
+    fetch_concurrency: int = INGEST_FETCH_CONCURRENCY,
+    categorize_workers: int = INGEST_CATEGORIZE_WORKERS,
+    queue_size: int = INGEST_QUEUE_SIZE
+) -> PipelineResult:
+    """
+    Stream the producers' items into the database, committing the job's
+    fetched/inserted/skipped counters with every batch. Fetch errors are
+    collected in the result; categorize and write errors abort the run.
+    """
+    batch_size = max(1, batch_size)
+    categorize_workers = max(1, categorize_workers)
+    fetch_slots = asyncio.Semaphore(max(1, fetch_concurrency))
+    in_flight = asyncio.Semaphore(max(1, queue_size) + categorize_workers)
+    pages: asyncio.Queue = asyncio.Queue(max(1, queue_size))
+    batches: asyncio.Queue = asyncio.Queue(max(1, queue_size))
+    categorized: asyncio.Queue = asyncio.Queue(max(1, queue_size))
+    result = PipelineResult()
+
+    async def fetch(producer: Producer):
+        end = _End(producer, None)
+        async with fetch_slots:
+            try:
+                while True:
+                    try:
+                        async with asyncio.timeout(producer.page_timeout):
+                            page = await anext(producer.pages, None)
+                    except TimeoutError:
+                        raise TimeoutError(f"No page within {producer.page_timeout}s")
+                    if page is None:
+                        break
+                    end.last_id = highest_id(page, end.last_id)
+                    end.oldest_id = lowest_id(page, end.oldest_id)
+                    await pages.put(_Page(producer, page))
+            except ListingTruncated as e:
+                logger.warning(f"Fetching {producer.name} stopped early: {str(e)}")
+                end.truncated = True
+            except Exception as e:
+                end.error = e
+                logger.error(f"Fetching {producer.name} failed: {str(e)}")
+                result.errors.append((producer.name, e))
+        await pages.put(end)
+
+    async def fetch_all():
+        async with asyncio.TaskGroup() as group:
+            for producer in producers:
+                group.create_task(fetch(producer))
+        await pages.put(None)
+
+    async def batch_all():
+        async for batch in normalize(_drain(pages), batch_size):
+            await in_flight.acquire()
+            await batches.put(batch)
+        for _ in range(categorize_workers):
+            await batches.put(None)
+
+    async def categorize():
+        async for batch in _drain(batches):
+            batch.results = await run_in_threadpool(
+                categorization_service.analyze_batch,
+                [item.get("content", "") for item in batch.items],
+                [item.get("sender", "") for item in batch.items]
+            )
+            await categorized.put(batch)
+        await categorized.put(None)
+
+    async def write():
+        # Workers finish out of order; batches are stored by sequence so cursors never run ahead
+        pending, next_sequence, finished = {}, 0, 0
+        while finished < categorize_workers:
+            batch = await categorized.get()
+            if batch is None:
+                finished += 1
+                continue
+            pending[batch.sequence] = batch
+            while next_sequence in pending:
+                batch = pending.pop(next_sequence)
+                await _write_batch(db, job, batch)
+                result.fetched += len(batch.items)
+                next_sequence += 1
+                in_flight.release()
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            group.create_task(fetch_all())
+            group.create_task(batch_all())
+            for _ in range(categorize_workers):
+                group.create_task(categorize())
+            group.create_task(write())
+    except ExceptionGroup as group_error:
+        # The first stage error aborted the run; any others are logged rather than lost
+        for error in group_error.exceptions[1:]:
+            logger.error(f"Ingest pipeline stage also failed: {error!r}")
+        raise group_error.exceptions[0]
+    return result
+
+async def _write_batch(db, job: IngestJob, batch: Batch):
+    """Store one categorized batch and the cursors it completes in one transaction"""
+    if batch.items:
+        outcome = await db.run_sync(ingest_messages, batch.items, batch.results)
+        job.inserted += outcome.inserted
+        job.skipped += outcome.skipped
+    for end in batch.cursors:
+        await db.run_sync(move_cursor, *end.producer.cursor, end.last_id, end.oldest_id, end.truncated)
+    job.fetched += len(batch.items)
+    await db.commit()
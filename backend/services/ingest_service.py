@@ -0,0 +1,158 @@
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from models import ArchivedMessage, Message, MessageProject, MessageSource, as_utc, utc_now
+from services.categorization_service import CategorizationResult
+from services.recategorization_service import index_message_terms
+from services.stats_service import record_new_messages
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT statement; keeps bound parameters well under SQLite's limit
+INGEST_BATCH_SIZE = 500
+
+@dataclass
+class IngestResult:
+    """Outcome of a bulk ingest"""
+    inserted: int = 0
+    skipped: int = 0
+    failed: int = 0
+    messages: List[Message] = field(default_factory=list)
+
+def parse_timestamp(value):
+    """
+    Accept datetimes or ISO 8601 strings (including a trailing Z) from the
+    services, returned as naive UTC like every stored timestamp
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return as_utc(value) if value else value
+
+def external_id_for(source: MessageSource, item_id: Optional[Any]) -> Optional[str]:
+    """Namespace platform ids by source, since Telegram and Twitter ids can collide"""
+    if item_id is None or item_id == "":
+        return None
+    return f"{source.value}:{item_id}"
+
+def normalize_message(msg_data: Dict[str, Any], result: CategorizationResult) -> Dict[str, Any]:
+    """Turn a fetched item and its categorization into a messages row"""
+    source = MessageSource(str(msg_data.get("source", "telegram")).upper())
+    return {
+        "external_id": external_id_for(source, msg_data.get("id")),
+        "source": source,
+        "sender": msg_data.get("sender", "Unknown"),
+        "content": msg_data.get("content", ""),
+        "timestamp": parse_timestamp(msg_data.get("timestamp")) or utc_now(),
+        "is_read": False,
+        **result.as_columns(),
+    }
+
+def record_project_mentions(db: Session, messages: List[Message]):
+    """
+    Write the audited projects each message mentions to message_projects.
+    Mentions come from the matched_projects evidence recorded by
+    CategorizationService.analyze_message, the same matcher that backs
+    get_mentioned_projects.
+    """
+    db.bulk_insert_mappings(MessageProject, [
+        {"project": project, "message_id": message.id}
+        for message in messages
+        if message.id
+        for project in set(message.matched_projects or [])
+    ])
+
+def index_stored_messages(db: Session, messages: List[Message]):
+    """
+    Maintain the tables derived from newly stored, already-flushed messages:
+    term index, project mentions and dashboard counters. The caller owns the
+    transaction, so these commit together with the messages.
+    """
+    index_message_terms(db, messages)
+    record_project_mentions(db, messages)
+    record_new_messages(db, messages)
+
+def _insert_ignoring_duplicates(db: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """One INSERT ... ON CONFLICT (external_id) DO NOTHING; returns ids of the inserted rows"""
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        statement = (
+            insert(Message)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[Message.external_id])
+            .returning(Message.id)
+        )
+        return [message_id for (message_id,) in db.execute(statement)]
+
+    # Other backends: check for existing external ids first
+    external_ids = [row["external_id"] for row in rows if row["external_id"]]
+    existing = {
+        external_id for (external_id,) in
+        db.query(Message.external_id).filter(Message.external_id.in_(external_ids))
+    } if external_ids else set()
+    messages = [Message(**row) for row in rows if row["external_id"] not in existing]
+    db.add_all(messages)
+    db.flush()
+    return [message.id for message in messages]
+
+def _without_archived(db: Session, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop rows already moved to the cold tier by retention, so they are not stored twice"""
+    external_ids = [row["external_id"] for row in rows if row["external_id"]]
+    if not external_ids:
+        return rows
+    archived = set(
+        external_id for (external_id,) in
+        db.query(ArchivedMessage.external_id).filter(ArchivedMessage.external_id.in_(external_ids))
+    )
+    return [row for row in rows if row["external_id"] not in archived] if archived else rows
+
+def ingest_messages(
+    db: Session,
+    items: List[Dict[str, Any]],
+    results: List[CategorizationResult],
+    batch_size: int = INGEST_BATCH_SIZE
+) -> IngestResult:
+    """
+    Idempotently store fetched items with their categorization. Items whose
+    (source, id) is already stored, in either tier, are skipped, so re-fetching
+    the same items never duplicates them. Derived tables are updated for new
+    rows only.
+    The caller owns the transaction.
+    """
+    outcome = IngestResult()
+    rows = []
+    seen_external_ids = set()
+    for msg_data, result in zip(items, results):
+        try:
+            row = normalize_message(msg_data, result)
+        except Exception as e:
+            logger.error(f"Error processing message {msg_data}: {str(e)}")
+            outcome.failed += 1
+            continue
+        if row["external_id"] and row["external_id"] in seen_external_ids:
+            outcome.skipped += 1
+            continue
+        seen_external_ids.add(row["external_id"])
+        rows.append(row)
+
+    for start in range(0, len(rows), batch_size):
+        batch = _without_archived(db, rows[start:start + batch_size])
+        outcome.skipped += min(batch_size, len(rows) - start) - len(batch)
+        if not batch:
+            continue
+        inserted_ids = _insert_ignoring_duplicates(db, batch)
+        outcome.inserted += len(inserted_ids)
+        outcome.skipped += len(batch) - len(inserted_ids)
+        if inserted_ids:
+            messages = db.query(Message).filter(Message.id.in_(inserted_ids)).order_by(Message.id).all()
+            index_stored_messages(db, messages)
+            outcome.messages.extend(messages)
+
+    logger.info(f"Ingested {outcome.inserted} messages, skipped {outcome.skipped} already stored, {outcome.failed} failed")
+    return outcome
@@ -0,0 +1,100 @@
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a set of tagged terms.
+
+    All terms are compiled once, so a single linear pass over the text reports
+    every term occurring in it, regardless of how many terms were registered.
+    Matching is case-insensitive substring matching, the same semantics as
+    ``term.lower() in text.lower()``.
+
+    Uses the pyahocorasick C extension when it is installed and a pure-Python
+    automaton otherwise.
+    """
+
+    def __init__(self, tagged_terms: Iterable[Tuple[str, str]] = ()):
+        # Registered terms as (tag, original term), indexed by registration order
+        self._terms: List[Tuple[str, str]] = []
+        # Lowercased term -> indexes of the registered terms it stands for
+        patterns: Dict[str, List[int]] = {}
+        for tag, term in tagged_terms:
+            if not term:
+                continue
+            patterns.setdefault(term.lower(), []).append(len(self._terms))
+            self._terms.append((tag, term))
+
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for pattern, indexes in patterns.items():
+                self._automaton.add_word(pattern, tuple(indexes))
+            if patterns:
+                self._automaton.make_automaton()
+            else:
+                self._automaton = None
+        else:
+            self._build(patterns)
+
+    def _build(self, patterns: Dict[str, List[int]]):
+        """Build the pure-Python automaton as a full transition table"""
+        goto: List[Dict[str, int]] = [{}]
+        output: List[List[int]] = [[]]
+        for pattern, indexes in patterns.items():
+            node = 0
+            for char in pattern:
+                next_node = goto[node].get(char)
+                if next_node is None:
+                    next_node = len(goto)
+                    goto.append({})
+                    output.append([])
+                    goto[node][char] = next_node
+                node = next_node
+            output[node].extend(indexes)
+
+        # Breadth-first: failure links, merged outputs, and transitions that
+        # inherit the failure state's so matching never has to backtrack
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [None] * (len(goto) - 1)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            delta[node] = {**delta[fail[node]], **goto[node]}
+            for char, child in goto[node].items():
+                queue.append(child)
+                fail[child] = delta[fail[node]].get(char, 0) if node else 0
+                output[child] = output[child] + output[fail[child]]
+
+        self._delta = delta
+        self._output = output
+
+    def match(self, text: str) -> Dict[str, List[str]]:
+        """
+        Find every registered term occurring in the text in one pass.
+        Returns: dict of tag -> matched terms, in registration order and without duplicates
+        """
+        found = set()
+        if AHOCORASICK_AVAILABLE:
+            if self._automaton is not None:
+                for _, indexes in self._automaton.iter(text.lower()):
+                    found.update(indexes)
+        else:
+            delta, output = self._delta, self._output
+            node = 0
+            for char in text.lower():
+                node = delta[node].get(char, 0)
+                if output[node]:
+                    found.update(output[node])
+
+        hits: Dict[str, List[str]] = {}
+        for index in sorted(found):
+            tag, term = self._terms[index]
+            hits.setdefault(tag, []).append(term)
+        return hits
@@ -0,0 +1,32 @@
+from typing import Any, List, Mapping
+
+from sqlalchemy import func
+
+from config.config import MESSAGE_PREVIEW_CHARS
+from models import ArchivedMessage
+
+def preview_columns(model, length: int = MESSAGE_PREVIEW_CHARS) -> List:
+    """
+    Columns for the list view of Message or ArchivedMessage: everything the
+    inbox shows, with content cut to its first length characters in SQL so
+    the full body never leaves the database.
+    """
+    columns = [
+        model.id,
+        model.source,
+        model.sender,
+        model.category,
+        model.timestamp,
+        model.is_read,
+        model.matched_projects,
+        model.category_rule,
+        func.substr(model.content, 1, length).label("content_preview"),
+        (func.length(model.content) > length).label("content_truncated"),
+    ]
+    if model is ArchivedMessage:
+        columns.append(model.archived_at)
+    return columns
+
+def preview_mappings(rows) -> List[Mapping[str, Any]]:
+    """Preview rows keyed by column name, for the MessagePreview response model"""
+    return [row._mapping for row in rows]
@@ -0,0 +1,58 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Select, and_, or_
+
+from models import Message
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+def encode_cursor(message: Message) -> str:
+    """Opaque cursor pointing just after the given message in (timestamp, id) order"""
+    payload = json.dumps({"t": message.timestamp.isoformat(), "i": message.id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), int(payload["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+def apply_keyset(statement: Select, cursor: Optional[str], model=Message) -> Select:
+    """
+    Order newest first by (timestamp, id) and start after the cursor, so each
+    page is an index range scan however deep the client has paged. model is
+    Message or ArchivedMessage, which share the ordering columns.
+    """
+    if cursor:
+        timestamp, message_id = decode_cursor(cursor)
+        statement = statement.where(or_(
+            model.timestamp < timestamp,
+            and_(model.timestamp == timestamp, model.id < message_id)
+        ))
+    return statement.order_by(model.timestamp.desc(), model.id.desc())
+
+def merge_newest_first(*pages: List[Message]) -> List[Message]:
+    """Merge pages fetched from several tiers back into (timestamp, id) order"""
+    return sorted(
+        (row for page in pages for row in page),
+        key=lambda row: (row.timestamp, row.id),
+        reverse=True
+    )
+
+def split_page(rows: List[Message], limit: int) -> Tuple[List[Message], Optional[str]]:
+    """
+    Trim rows fetched with limit + 1 to one page; the next cursor is None on
+    the last page, and there is no page at all for a limit below 1
+    """
+    if limit <= 0:
+        return [], None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
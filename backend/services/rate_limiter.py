@@ -0,0 +1,230 @@
+"""
+Client-side rate limiting for the Twitter and Telegram APIs.
+
+Every API call goes through a RateLimiter, one per API. Each endpoint family
+(a tweepy.Client method, a Bot API method) has a token bucket sized to the
+platform's documented limit, corrected by the x-rate-limit-* headers the
+API returns. Requests wait in one queue per API, ordered by priority, for a
+token of their family and one of the API's in-flight slots, so mentions go
+out before project feeds when the two compete.
+
+Rate-limit responses and transient errors block the family for the
+Retry-After/reset time, or for an exponential backoff that resets after a
+success, and the request is retried. A family that will stay blocked for
+longer than max_wait fails fast with RateLimitExceeded instead of spending
+quota on requests that cannot succeed.
+"""
+import asyncio
+import contextvars
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+from config.config import (
+    RATE_LIMIT_BACKOFF_BASE, RATE_LIMIT_BACKOFF_MAX, RATE_LIMIT_MAX_RETRIES, RATE_LIMIT_MAX_WAIT
+)
+
+logger = logging.getLogger(__name__)
+
+# Lower values are served first
+PRIORITY_HIGH = 0  # mentions and direct messages
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2  # project feeds
+
+# Headers of the HTTP responses seen by the current call, filled in by capture_rate_limit_headers.
+# asyncio.to_thread copies the context, so the hook sees the dict of the call that started the thread.
+_response_headers: contextvars.ContextVar[Optional[Dict[str, str]]] = contextvars.ContextVar(
+    "response_headers", default=None
+)
+
+def capture_rate_limit_headers(response, *args, **kwargs):
+    """requests response hook recording x-rate-limit-* headers for the running RateLimiter.call"""
+    headers = _response_headers.get()
+    if headers is not None:
+        headers.update(
+            (name.lower(), value) for name, value in response.headers.items()
+            if name.lower().startswith("x-rate-limit-")
+        )
+
+class RateLimitExceeded(Exception):
+    """The endpoint family is blocked for longer than the limiter is willing to wait"""
+
+    def __init__(self, api: str, family: str, retry_after: float):
+        super().__init__(f"{api} {family} rate limited for another {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+@dataclass
+class Throttle:
+    """A failure worth retrying: retry_after seconds if the API said so, else adaptive backoff"""
+    retry_after: Optional[float] = None
+    headers: Optional[Mapping[str, str]] = None
+
+class EndpointFamily:
+    """Token bucket plus the server-reported window and backoff state of one endpoint family"""
+
+    def __init__(self, name: str, capacity: int, period: float):
+        self.name = name
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        # From x-rate-limit-remaining / x-rate-limit-reset (reset is epoch seconds)
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.blocked_until = 0.0
+        self.backoff = 0.0
+
+    def delay(self, now: float, wall: float) -> float:
+        """Seconds until a request of this family may be sent"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        wait = max(0.0, self.blocked_until - now)
+        if self.reset_at is not None:
+            if wall >= self.reset_at:
+                # New window
+                self.remaining = self.reset_at = None
+            elif self.remaining is not None and self.remaining <= 0:
+                wait = max(wait, self.reset_at - wall)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+
+    def take(self):
+        self.tokens -= 1
+        if self.remaining is not None:
+            self.remaining -= 1
+
+    def observe(self, headers: Mapping[str, str]):
+        """Trust the server's count of what is left in the current window"""
+        try:
+            if "x-rate-limit-remaining" in headers:
+                self.remaining = int(headers["x-rate-limit-remaining"])
+                self.tokens = min(self.tokens, self.remaining)
+            if "x-rate-limit-reset" in headers:
+                self.reset_at = float(headers["x-rate-limit-reset"])
+        except ValueError:
+            logger.warning(f"Ignoring malformed rate limit headers for {self.name}: {dict(headers)}")
+
+    def succeeded(self):
+        self.backoff = 0.0
+
+    def failed(self, retry_after: Optional[float], now: float) -> float:
+        """Block the family after a throttled request; returns how long"""
+        if retry_after is None:
+            self.backoff = min(RATE_LIMIT_BACKOFF_MAX, max(RATE_LIMIT_BACKOFF_BASE, self.backoff * 2))
+            retry_after = self.backoff
+        self.blocked_until = max(self.blocked_until, now + retry_after)
+        return retry_after
+
+class RateLimiter:
+    """Prioritized, token-bucketed access to one API"""
+
+    def __init__(
+        self,
+        api: str,
+        limits: Dict[str, Tuple[int, float]],
+        default_limit: Tuple[int, float],
+        classify: Callable[[Exception], Optional[Throttle]],
+        concurrency: int,
+        max_wait: float = RATE_LIMIT_MAX_WAIT,
+        max_retries: int = RATE_LIMIT_MAX_RETRIES
+    ):
+        self.api = api
+        self.limits = limits
+        self.default_limit = default_limit
+        self.classify = classify
+        self.concurrency = max(1, concurrency)
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.families: Dict[str, EndpointFamily] = {}
+        self._waiters: List[Tuple[int, int, str, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._active = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def family(self, name: str) -> EndpointFamily:
+        if name not in self.families:
+            self.families[name] = EndpointFamily(name, *self.limits.get(name, self.default_limit))
+        return self.families[name]
+
+    async def acquire(self, family: str, priority: int = PRIORITY_NORMAL):
+        """Wait for a token of the family and an in-flight slot; pair with release()"""
+        wait = self.family(family).delay(time.monotonic(), time.time())
+        if wait > self.max_wait:
+            raise RateLimitExceeded(self.api, family, wait)
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((priority, next(self._sequence), family, future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just before the cancellation arrived
+                self.release()
+            raise
+
+    def release(self):
+        self._active -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """Grant waiting requests in priority order; wake up again when the next token is due"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now, wall = time.monotonic(), time.time()
+        next_wait = None
+        waiting = []
+        for entry in sorted(self._waiters):
+            _, _, family, future = entry
+            if future.done():
+                continue
+            wait = self.family(family).delay(now, wall)
+            if wait <= 0 and self._active < self.concurrency:
+                self.family(family).take()
+                self._active += 1
+                future.set_result(None)
+                continue
+            if wait > 0:
+                next_wait = wait if next_wait is None else min(next_wait, wait)
+            waiting.append(entry)
+        self._waiters = waiting
+        if waiting and next_wait is not None:
+            self._timer = asyncio.get_running_loop().call_later(next_wait, self._dispatch)
+
+    async def call(
+        self,
+        family: str,
+        request: Callable[[], Awaitable[Any]],
+        priority: int = PRIORITY_NORMAL
+    ) -> Any:
+        """Run request() under the family's limits, retrying throttled attempts"""
+        endpoint = self.family(family)
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(family, priority)
+            headers: Dict[str, str] = {}
+            token = _response_headers.set(headers)
+            try:
+                result = await request()
+            except Exception as e:
+                throttle = self.classify(e)
+                if throttle is None:
+                    raise
+                endpoint.observe(throttle.headers or headers)
+                retry_after = endpoint.failed(throttle.retry_after, time.monotonic())
+                logger.warning(
+                    f"{self.api} {family} throttled ({type(e).__name__}), "
+                    f"attempt {attempt + 1}/{self.max_retries + 1}, retrying in {retry_after:.1f}s"
+                )
+                if attempt == self.max_retries:
+                    raise
+                continue
+            finally:
+                _response_headers.reset(token)
+                self.release()
+            endpoint.observe(headers)
+            endpoint.succeeded()
+            return result
@@ -0,0 +1,236 @@
+import re
+import logging
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from config.config import CATEGORIZATION_POOL_THRESHOLD
+from models import Message, IndexTerm, MessageTerm, RecategorizationJob
+from services.categorization_service import CategorizationService, RULE_MANUAL
+from services.search_service import escape_like
+from services.stats_service import record_category_change
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Job statuses run_recategorization_job picks up
+RUNNABLE_STATUSES = ("pending", "failed")
+
+# SQLite limits the number of bound parameters per statement
+IN_CLAUSE_CHUNK = 500
+
+def tokenize(content: str) -> Set[str]:
+    """Lowercased word tokens of a message, as stored in the term index"""
+    return set(TOKEN_PATTERN.findall((content or "").lower()))
+
+def _chunks(items: List, size: int) -> Iterable[List]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def index_message_terms(db: Session, messages: List[Message]):
+    """
+    Add postings for already-flushed messages to the inverted term index.
+    The caller owns the transaction.
+    """
+    message_tokens = {message.id: tokenize(message.content) for message in messages if message.id}
+    vocabulary = sorted(set().union(*message_tokens.values())) if message_tokens else []
+    if not vocabulary:
+        return
+
+    term_ids = {}
+    for chunk in _chunks(vocabulary, IN_CLAUSE_CHUNK):
+        term_ids.update(
+            (term, term_id)
+            for term_id, term in db.query(IndexTerm.id, IndexTerm.term).filter(IndexTerm.term.in_(chunk))
+        )
+
+    new_terms = [IndexTerm(term=term) for term in vocabulary if term not in term_ids]
+    if new_terms:
+        db.add_all(new_terms)
+        db.flush()
+        term_ids.update((term.term, term.id) for term in new_terms)
+
+    db.bulk_insert_mappings(MessageTerm, [
+        {"term_id": term_ids[token], "message_id": message_id}
+        for message_id, tokens in message_tokens.items()
+        for token in tokens
+    ])
+
+def rebuild_term_index(db: Session, batch_size: int = 1000, commit: bool = True) -> int:
+    """
+    Rebuild the term index for every stored message; returns the number of
+    messages indexed. Each batch is committed unless commit is False, in
+    which case the caller owns the transaction and batches are only flushed.
+    """
+    db.query(MessageTerm).delete(synchronize_session=False)
+    indexed = 0
+    last_id = 0
+    while True:
+        batch = (
+            db.query(Message)
+            .filter(Message.id > last_id)
+            .order_by(Message.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        index_message_terms(db, batch)
+        if commit:
+            db.commit()
+        else:
+            db.flush()
+            # Indexed messages are not needed again; keep the open transaction's session small
+            for message in batch:
+                db.expunge(message)
+        indexed += len(batch)
+        last_id = batch[-1].id
+    return indexed
+
+def _piece_filter(piece: str, position: int, count: int):
+    """
+    Vocabulary condition for the position-th of count word pieces of a keyword.
+
+    A keyword matches as a substring, so a lone piece can sit anywhere inside
+    a token and needs a '%piece%' scan of the whole vocabulary. In a keyword
+    of several pieces the inner ones are whole tokens and the last one starts
+    a token, so those lookups can use the index_terms index. The first one
+    only ends a token and is not looked up (None).
+    """
+    if count == 1:
+        return IndexTerm.term.like(f"%{escape_like(piece)}%", escape="\\")
+    if position == 0:
+        return None
+    if position < count - 1:
+        return IndexTerm.term == piece
+    return IndexTerm.term.like(f"{escape_like(piece)}%", escape="\\")
+
+def find_candidate_message_ids(db: Session, terms: List[str]) -> Optional[List[int]]:
+    """
+    Ids of messages that may contain any of the given keywords, sorted ascending.
+
+    Keywords match as substrings, so every word piece of a keyword lies inside
+    some token of a matching message. Pieces are looked up against the term
+    vocabulary (small compared to the message table) as _piece_filter
+    describes, and the postings of all pieces of a keyword are intersected.
+    Single-word keywords, the common case, still scan the vocabulary once each.
+    The result is a superset of the exact matches; returns None when a keyword
+    has no word characters and the index cannot narrow the search.
+    """
+    candidates: Set[int] = set()
+    for term in terms:
+        pieces = TOKEN_PATTERN.findall(term.lower())
+        if not pieces:
+            return None
+
+        term_candidates: Optional[Set[int]] = None
+        for position, piece in enumerate(pieces):
+            condition = _piece_filter(piece, position, len(pieces))
+            if condition is None:
+                continue
+            term_ids = [term_id for (term_id,) in db.query(IndexTerm.id).filter(condition)]
+            piece_candidates: Set[int] = set()
+            for chunk in _chunks(term_ids, IN_CLAUSE_CHUNK):
+                piece_candidates.update(
+                    message_id for (message_id,) in
+                    db.query(MessageTerm.message_id).filter(MessageTerm.term_id.in_(chunk)).distinct()
+                )
+            term_candidates = piece_candidates if term_candidates is None else term_candidates & piece_candidates
+            if not term_candidates:
+                break
+        candidates |= term_candidates or set()
+    return sorted(candidates)
+
+def create_recategorization_job(db: Session, terms: List[str]) -> RecategorizationJob:
+    """Record a pending job for the keywords that were added or removed"""
+    job = RecategorizationJob(terms=sorted(set(terms)), status="pending")
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def fail_interrupted_recategorization_jobs(db: Session) -> int:
+    """
+    Mark jobs a previous process left running as failed, so they can be
+    resumed from their checkpoint; returns the number marked
+    """
+    result = db.execute(
+        update(RecategorizationJob)
+        .where(RecategorizationJob.status == "running")
+        .values(status="failed", error="Interrupted by a server restart")
+    )
+    db.commit()
+    return result.rowcount
+
+def run_recategorization_job(
+    db: Session,
+    job_id: int,
+    categorization_service: CategorizationService,
+    chunk_size: int = CATEGORIZATION_POOL_THRESHOLD
+) -> RecategorizationJob:
+    """
+    Re-score the messages affected by a job's keywords in chunks through
+    analyze_batch (chunks default to the process-pool threshold, so full
+    chunks are scored in the pool), committing a checkpoint after each chunk so a failed or interrupted job resumes where
+    it stopped. Only a pending or failed job is run: it is claimed with a
+    conditional UPDATE, so a second runner for the same job does nothing.
+    Manually categorized messages keep their category.
+    """
+    job = db.query(RecategorizationJob).filter(RecategorizationJob.id == job_id).first()
+    if job is None:
+        raise ValueError(f"Recategorization job {job_id} not found")
+    previous_status = job.status
+    if previous_status not in RUNNABLE_STATUSES:
+        return job
+    claimed = db.execute(
+        update(RecategorizationJob)
+        .where(RecategorizationJob.id == job_id, RecategorizationJob.status == previous_status)
+        .values(status="running")
+    ).rowcount
+    db.commit()
+    db.refresh(job)
+    if not claimed:
+        return job
+
+    try:
+        candidate_ids = find_candidate_message_ids(db, job.terms)
+        if candidate_ids is None:
+            candidate_ids = [message_id for (message_id,) in db.query(Message.id).order_by(Message.id)]
+        if previous_status == "pending":
+            job.total = len(candidate_ids)
+        job.error = None
+        db.commit()
+
+        remaining = [message_id for message_id in candidate_ids if message_id > (job.last_message_id or 0)]
+        for chunk in _chunks(remaining, chunk_size):
+            messages = [
+                message for message in db.query(Message).filter(Message.id.in_(chunk))
+                if message.category_rule != RULE_MANUAL
+            ]
+            results = categorization_service.analyze_batch(
+                [message.content for message in messages], [message.sender for message in messages]
+            )
+            for message, result in zip(messages, results):
+                old_category = message.category
+                for column, value in result.as_columns().items():
+                    setattr(message, column, value)
+                if result.category != old_category:
+                    job.changed += 1
+                    record_category_change(db, message, old_category)
+
+            job.processed += len(chunk)
+            job.last_message_id = chunk[-1]
+            db.commit()
+            logger.info(f"Recategorization job {job.id}: {job.processed}/{job.total} messages processed")
+
+        job.status = "completed"
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        job.status = "failed"
+        job.error = str(e)
+        db.commit()
+        logger.error(f"Recategorization job {job_id} failed: {str(e)}")
+    return job
@@ -0,0 +1,160 @@
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import String, cast, delete, func, insert, or_, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from config.config import RETENTION_BATCH_SIZE, RETENTION_MAX_AGE_DAYS
+from models import (
+    FEED_SOURCES, ArchivedMessage, Message, MessageCategory, MessageCounter, MessageProject, MessageTerm, utc_now
+)
+from services.search_service import escape_like
+from services.stats_service import adjust_counters
+
+logger = logging.getLogger(__name__)
+
+# Columns copied from messages into archived_messages
+ARCHIVED_COLUMNS = [column.name for column in Message.__table__.columns]
+
+@dataclass
+class RetentionResult:
+    """Outcome of a retention run"""
+    archived: int = 0
+    batches: int = 0
+    vacuumed: bool = False
+
+def retention_condition(cutoff: datetime):
+    """Messages that belong in the cold tier: older than cutoff, or archive category"""
+    return or_(Message.timestamp < cutoff, Message.category == MessageCategory.ARCHIVE)
+
+def _archive_batch(db: Session, message_ids: List[int]):
+    """
+    Copy one batch into archived_messages and remove it, with its postings,
+    project mentions and counter contributions, from the hot tier.
+    The caller owns the transaction.
+    """
+    db.execute(
+        insert(ArchivedMessage).from_select(
+            ARCHIVED_COLUMNS,
+            select(*[Message.__table__.c[name] for name in ARCHIVED_COLUMNS]).where(Message.id.in_(message_ids))
+        )
+    )
+
+    removed = db.execute(
+        select(Message.source, Message.category, Message.is_read, func.count(Message.id))
+        .where(Message.id.in_(message_ids), Message.source.notin_(FEED_SOURCES))
+        .group_by(Message.source, Message.category, Message.is_read)
+    )
+    deltas = Counter()
+    for source, category, is_read, count in removed:
+        deltas[(source, category or MessageCategory.ROUTINE, bool(is_read))] -= count
+    adjust_counters(db, deltas)
+
+    db.execute(delete(MessageTerm).where(MessageTerm.message_id.in_(message_ids)))
+    db.execute(delete(MessageProject).where(MessageProject.message_id.in_(message_ids)))
+    db.execute(delete(Message).where(Message.id.in_(message_ids)))
+
+def archive_messages(
+    db: Session,
+    max_age_days: int = RETENTION_MAX_AGE_DAYS,
+    batch_size: int = RETENTION_BATCH_SIZE,
+    now: Optional[datetime] = None
+) -> RetentionResult:
+    """
+    Move messages older than max_age_days, or categorized as archive, into
+    archived_messages in id-ordered batches, committing after each batch so
+    readers and refreshes are only blocked for one batch at a time.
+    """
+    cutoff = (now or utc_now()) - timedelta(days=max_age_days)
+    result = RetentionResult()
+
+    # SQLite hands out max(rowid) + 1 as the next id, so deleting the newest
+    # row would let a new message reuse an id already in the cold tier
+    newest_id = db.scalar(select(func.max(Message.id)))
+    if newest_id is None:
+        return result
+
+    last_id = 0
+    while True:
+        message_ids = list(db.scalars(
+            select(Message.id)
+            .where(Message.id > last_id, Message.id < newest_id, retention_condition(cutoff))
+            .order_by(Message.id)
+            .limit(batch_size)
+        ))
+        if not message_ids:
+            break
+        _archive_batch(db, message_ids)
+        db.commit()
+        result.archived += len(message_ids)
+        result.batches += 1
+        last_id = message_ids[-1]
+        logger.info(f"Retention: archived {result.archived} messages so far")
+
+    logger.info(f"Retention: archived {result.archived} messages older than {cutoff.isoformat()} or in archive")
+    return result
+
+def vacuum(engine: Engine):
+    """
+    Reclaim the space freed by archiving and refresh planner statistics.
+    VACUUM cannot run inside a transaction, so it gets an autocommit connection.
+    """
+    dialect = engine.dialect.name
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        if dialect == "sqlite":
+            connection.exec_driver_sql("VACUUM")
+            connection.exec_driver_sql("ANALYZE")
+        elif dialect == "postgresql":
+            for table in (Message, MessageTerm, MessageProject, MessageCounter, ArchivedMessage):
+                connection.exec_driver_sql(f"VACUUM ANALYZE {table.__tablename__}")
+
+def run_retention(
+    engine: Engine,
+    max_age_days: int = RETENTION_MAX_AGE_DAYS,
+    batch_size: int = RETENTION_BATCH_SIZE,
+    vacuum_after: bool = True
+) -> RetentionResult:
+    """Archive in batches with a session of its own, then vacuum if anything moved"""
+    db = Session(bind=engine, autoflush=False)
+    try:
+        result = archive_messages(db, max_age_days, batch_size)
+    finally:
+        db.close()
+    if vacuum_after and result.archived:
+        vacuum(engine)
+        result.vacuumed = True
+    return result
+
+def archived_messages_query(
+    category: Optional[MessageCategory] = None,
+    source=None,
+    audited_project: Optional[str] = None,
+    project: Optional[str] = None,
+    search_text: Optional[str] = None,
+    columns: Optional[List] = None
+):
+    """
+    select(ArchivedMessage), or the given columns of it, with the /api/messages filters. The cold tier has
+    no full-text or mention index, so text and project filters scan with
+    substring matching; mentions come from the stored matched_projects evidence.
+    """
+    query = select(*(columns or [ArchivedMessage]))
+    if category:
+        query = query.where(ArchivedMessage.category == category)
+    if source:
+        query = query.where(ArchivedMessage.source == source)
+    else:
+        query = query.where(ArchivedMessage.source.notin_(FEED_SOURCES))
+    if audited_project:
+        query = query.where(cast(ArchivedMessage.matched_projects, String).like(
+            f'%"{escape_like(audited_project)}"%', escape="\\"
+        ))
+    elif project:
+        query = query.where(ArchivedMessage.content.ilike(f"%{escape_like(project)}%", escape="\\"))
+    for token in (search_text or "").split():
+        query = query.where(ArchivedMessage.content.ilike(f"%{escape_like(token)}%", escape="\\"))
+    return query
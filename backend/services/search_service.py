@@ -0,0 +1,133 @@
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Select, func, literal_column, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import column, table
+
+from models import Message
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Postgres text search configuration used by the generated search_vector column
+POSTGRES_TS_CONFIG = "english"
+
+SQLITE_FTS_TABLE = "messages_fts"
+messages_fts = table(SQLITE_FTS_TABLE, column("rowid"), column("rank"))
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards in value; use the pattern with a backslash escape character"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _tokens(search_text: str) -> List[str]:
+    return [token.lower() for token in TOKEN_PATTERN.findall(search_text or "")]
+
+def create_search_index(db: Session):
+    """
+    Create the full-text index for messages and fill it from existing rows.
+    SQLite: external-content FTS5 table kept in sync by triggers.
+    Postgres: generated tsvector column with a GIN index.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        db.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5("
+            "content, sender, content='messages', content_rowid='id')"
+        ))
+        db.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN "
+            f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, content, sender) VALUES (new.id, new.content, new.sender); "
+            "END"
+        ))
+        db.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN "
+            f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, content, sender) "
+            "VALUES ('delete', old.id, old.content, old.sender); "
+            "END"
+        ))
+        db.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF content, sender ON messages BEGIN "
+            f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, content, sender) "
+            "VALUES ('delete', old.id, old.content, old.sender); "
+            f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, content, sender) VALUES (new.id, new.content, new.sender); "
+            "END"
+        ))
+        db.execute(text(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')"))
+    elif dialect == "postgresql":
+        db.execute(text(
+            "ALTER TABLE messages ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('{POSTGRES_TS_CONFIG}', "
+            "coalesce(sender, '') || ' ' || coalesce(content, ''))) STORED"
+        ))
+        db.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_messages_search_vector ON messages USING GIN (search_vector)"
+        ))
+    else:
+        raise ValueError(f"Full-text search is not supported on {dialect}")
+
+def apply_text_search(
+    dialect: str,
+    statement: Select,
+    search_text: Optional[str],
+    phrase: bool = False,
+    content_only: bool = False,
+    content_phrase: Optional[str] = None
+) -> Tuple[Select, Optional[object]]:
+    """
+    Restrict a select(Message) statement to rows matching search_text,
+    using the full-text index of the given dialect ("sqlite" or "postgresql").
+
+    Every word must match as a word prefix ("sushi" matches "SushiSwap").
+    With phrase=True the words must also be adjacent and in order, which is
+    how project names such as "Bored Ape" are matched.
+
+    content_phrase is a phrase the content must contain as well, searched in
+    the same index lookup; it filters without affecting the rank.
+
+    Returns the filtered statement and a rank expression to order by (best first),
+    or None when search_text has nothing to search for.
+    """
+    tokens = _tokens(search_text)
+    phrase_tokens = _tokens(content_phrase)
+    if not tokens and not phrase_tokens:
+        return statement, None
+
+    if dialect == "sqlite":
+        clauses = []
+        if tokens:
+            if phrase:
+                match = '"' + " ".join(tokens) + '"*'
+            else:
+                match = " ".join(f'"{token}"*' for token in tokens)
+            clauses.append(f"content : ({match})" if content_only else match)
+        if phrase_tokens:
+            clauses.append('content : ("' + " ".join(phrase_tokens) + '"*)')
+        # One MATCH per query: FTS5 cannot join the index twice
+        statement = statement.join(messages_fts, messages_fts.c.rowid == Message.id).where(
+            literal_column(SQLITE_FTS_TABLE).op("MATCH")(" AND ".join(f"({clause})" for clause in clauses))
+        )
+        # FTS5 rank is bm25, where lower is better
+        return statement, messages_fts.c.rank.asc() if tokens else None
+
+    if dialect == "postgresql":
+        # The vector also covers the sender; content-only matches are applied on the raw column
+        vector = literal_column("messages.search_vector")
+        content_vector = func.to_tsvector(POSTGRES_TS_CONFIG, Message.content)
+        if phrase_tokens:
+            phrase_query = func.to_tsquery(POSTGRES_TS_CONFIG, " <-> ".join(f"{token}:*" for token in phrase_tokens))
+            statement = statement.where(vector.op("@@")(phrase_query), content_vector.op("@@")(phrase_query))
+        if not tokens:
+            return statement, None
+        separator = " <-> " if phrase else " & "
+        tsquery = func.to_tsquery(POSTGRES_TS_CONFIG, separator.join(f"{token}:*" for token in tokens))
+        statement = statement.where(vector.op("@@")(tsquery))
+        if content_only:
+            statement = statement.where(content_vector.op("@@")(tsquery))
+        return statement, func.ts_rank(vector, tsquery).desc()
+
+    # No full-text index on other backends: fall back to substring matching
+    if phrase_tokens:
+        statement = statement.where(Message.content.ilike(f"%{escape_like(content_phrase)}%", escape="\\"))
+    for token in tokens:
+        statement = statement.where(Message.content.ilike(f"%{escape_like(token)}%", escape="\\"))
+    return statement, None
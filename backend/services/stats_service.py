@@ -0,0 +1,243 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from models import (
+    FEED_SOURCES, ActivityRollup, ArchivedMessage, Message, MessageCategory, MessageCounter, MessageSource, as_utc,
+    utc_isoformat, utc_now
+)
+
+CounterKey = Tuple[MessageSource, MessageCategory, bool]
+RollupKey = Tuple[datetime, MessageSource, MessageCategory, str]
+
+# Project value of the rollup rows that count every message
+ALL_PROJECTS = ""
+
+# Time series bucket sizes served from the hourly rollups
+BUCKETS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+def empty_counts() -> Dict[str, Any]:
+    """Zeroed counts for every source and category"""
+    return {
+        "total": 0,
+        "unread": 0,
+        "by_source": {source.value: 0 for source in MessageSource},
+        "by_category": {category.value: 0 for category in MessageCategory},
+        "by_source_category": {
+            source.value: {category.value: 0 for category in MessageCategory}
+            for source in MessageSource
+        },
+    }
+
+def _add_count(counts: Dict[str, Any], source: MessageSource, category: Optional[MessageCategory], count: int):
+    category = category or MessageCategory.ROUTINE
+    counts["total"] += count
+    counts["by_source"][source.value] += count
+    counts["by_category"][category.value] += count
+    counts["by_source_category"][source.value][category.value] += count
+
+def read_counters(db: Session) -> Dict[str, Any]:
+    """
+    Totals, per-source, per-category, category x source and unread counts,
+    read from message_counters
+    """
+    counts = empty_counts()
+    for counter in db.query(MessageCounter):
+        _add_count(counts, counter.source, counter.category, counter.count)
+        if not counter.is_read:
+            counts["unread"] += counter.count
+    return counts
+
+def is_counted(message) -> bool:
+    """Whether a message counts in the counters and rollups; project feed tweets do not"""
+    return message.source not in FEED_SOURCES
+
+def counter_key(message: Message) -> CounterKey:
+    return (message.source, message.category or MessageCategory.ROUTINE, bool(message.is_read))
+
+def _upsert_increments(db: Session, model, key_columns: List[str], rows: List[Dict[str, Any]]):
+    """Add each row's count to the row with the same key, inserting missing rows, in one atomic statement per row"""
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        for row in rows:
+            statement = insert(model).values(**row)
+            db.execute(statement.on_conflict_do_update(
+                index_elements=[getattr(model, column) for column in key_columns],
+                set_={"count": model.count + statement.excluded.count}
+            ))
+        return
+
+    for row in rows:
+        existing = db.get(model, tuple(row[column] for column in key_columns))
+        if existing is None:
+            db.add(model(**row))
+        else:
+            existing.count += row["count"]
+    db.flush()
+
+def adjust_counters(db: Session, deltas: Dict[CounterKey, int]):
+    """
+    Apply count deltas with an atomic upsert per key, inside the caller's
+    transaction so counters commit or roll back together with the messages.
+    """
+    _upsert_increments(db, MessageCounter, ["source", "category", "is_read"], [
+        {"source": source, "category": category, "is_read": is_read, "count": delta}
+        for (source, category, is_read), delta in deltas.items()
+        if delta
+    ])
+
+def hour_bucket(timestamp: datetime) -> datetime:
+    """Start of the UTC hour a timestamp falls in, as stored in activity_rollups (naive UTC)"""
+    return as_utc(timestamp).replace(minute=0, second=0, microsecond=0)
+
+def rollup_keys(message, category: Optional[MessageCategory] = None) -> List[RollupKey]:
+    """Rollup rows a message counts in: the all-projects row plus one per mentioned project"""
+    bucket = hour_bucket(message.timestamp or utc_now())
+    category = category or message.category or MessageCategory.ROUTINE
+    projects = [ALL_PROJECTS] + sorted(set(message.matched_projects or []))
+    return [(bucket, message.source, category, project) for project in projects]
+
+def adjust_rollups(db: Session, deltas: Dict[RollupKey, int]):
+    """Apply hourly rollup deltas inside the caller's transaction"""
+    _upsert_increments(db, ActivityRollup, ["bucket_start", "source", "category", "project"], [
+        {"bucket_start": bucket, "source": source, "category": category, "project": project, "count": delta}
+        for (bucket, source, category, project), delta in deltas.items()
+        if delta
+    ])
+
+def record_new_messages(db: Session, messages: Iterable[Message]):
+    """Count newly inserted messages in the counters and hourly rollups"""
+    messages = [message for message in messages if is_counted(message)]
+    adjust_counters(db, Counter(counter_key(message) for message in messages))
+    adjust_rollups(db, Counter(key for message in messages for key in rollup_keys(message)))
+
+def record_category_change(db: Session, message: Message, old_category: Optional[MessageCategory]):
+    """Move a message's count from its old category to its current one"""
+    if not is_counted(message):
+        return
+    old_key = (message.source, old_category or MessageCategory.ROUTINE, bool(message.is_read))
+    new_key = counter_key(message)
+    if old_key != new_key:
+        adjust_counters(db, {old_key: -1, new_key: 1})
+
+    if (old_category or MessageCategory.ROUTINE) != (message.category or MessageCategory.ROUTINE):
+        deltas = Counter()
+        for key in rollup_keys(message, old_category or MessageCategory.ROUTINE):
+            deltas[key] -= 1
+        for key in rollup_keys(message):
+            deltas[key] += 1
+        adjust_rollups(db, deltas)
+
+def reconcile_counters(db: Session) -> Dict[str, Any]:
+    """Rebuild message_counters from scratch with one grouped query over messages"""
+    db.query(MessageCounter).delete(synchronize_session=False)
+    grouped = db.query(
+        Message.source, Message.category, Message.is_read, func.count(Message.id)
+    ).filter(Message.source.notin_(FEED_SOURCES)).group_by(Message.source, Message.category, Message.is_read)
+
+    deltas: Dict[CounterKey, int] = Counter()
+    for source, category, is_read, count in grouped:
+        deltas[(source, category or MessageCategory.ROUTINE, bool(is_read))] += count
+    db.add_all(
+        MessageCounter(source=source, category=category, is_read=is_read, count=count)
+        for (source, category, is_read), count in deltas.items()
+    )
+    db.flush()
+    return read_counters(db)
+
+def rebuild_rollups(db: Session, batch_size: int = 1000) -> int:
+    """
+    Rebuild activity_rollups from both message tiers, so history moved to the
+    cold tier by retention keeps its place in the time series. Returns the
+    number of messages counted.
+    """
+    db.query(ActivityRollup).delete(synchronize_session=False)
+    deltas: Dict[RollupKey, int] = Counter()
+    counted = 0
+    for model in (Message, ArchivedMessage):
+        last_id = 0
+        while True:
+            batch = (
+                db.query(model.id, model.timestamp, model.source, model.category, model.matched_projects)
+                .filter(model.id > last_id)
+                .order_by(model.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not batch:
+                break
+            for row in batch:
+                if is_counted(row):
+                    deltas.update(rollup_keys(row))
+            counted += len(batch)
+            last_id = batch[-1].id
+    adjust_rollups(db, deltas)
+    db.flush()
+    return counted
+
+def count_recent_messages(db: Session, since: datetime) -> int:
+    """Messages since the start of the hour containing since, summed from the hourly rollups"""
+    return db.query(func.coalesce(func.sum(ActivityRollup.count), 0)).filter(
+        ActivityRollup.project == ALL_PROJECTS,
+        ActivityRollup.bucket_start >= hour_bucket(since)
+    ).scalar()
+
+def parse_window(value: str) -> timedelta:
+    """Parse a time series window such as "24h" or "30d" """
+    units = {"h": "hours", "d": "days"}
+    amount, unit = value[:-1], value[-1:].lower()
+    if unit not in units or not amount.isdigit() or int(amount) <= 0:
+        raise ValueError(f"Invalid window '{value}', expected hours or days such as 24h or 30d")
+    try:
+        return timedelta(**{units[unit]: int(amount)})
+    except OverflowError:
+        raise ValueError(f"Window '{value}' is too large")
+
+def activity_timeseries(db: Session, window: timedelta, bucket: str, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Message counts per bucket ("hour" or "day") over the trailing window, read
+    from the hourly rollups and zero-filled, oldest bucket first. Each point
+    has its bucket_start as UTC ISO 8601, the total and breakdowns by source, category and audited project.
+    """
+    step = BUCKETS[bucket]
+    now = now or utc_now()
+    # Buckets are aligned to whole hours or whole days
+    def align(timestamp: datetime) -> datetime:
+        timestamp = hour_bucket(timestamp)
+        return timestamp.replace(hour=0) if bucket == "day" else timestamp
+
+    first = align(now - window)
+    points: Dict[datetime, Dict[str, Any]] = {}
+    start = first
+    while start <= now:
+        points[start] = {
+            "bucket_start": utc_isoformat(start),
+            "total": 0,
+            "by_source": {source.value: 0 for source in MessageSource},
+            "by_category": {category.value: 0 for category in MessageCategory},
+            "by_project": {},
+        }
+        start += step
+
+    rows = (
+        db.query(ActivityRollup.bucket_start, ActivityRollup.source, ActivityRollup.category,
+                 ActivityRollup.project, ActivityRollup.count)
+        .filter(ActivityRollup.bucket_start >= first, ActivityRollup.bucket_start <= now)
+    )
+    for bucket_start, source, category, project, count in rows:
+        point = points.get(align(bucket_start))
+        if point is None or not count:
+            continue
+        if project == ALL_PROJECTS:
+            point["total"] += count
+            point["by_source"][source.value] += count
+            point["by_category"][category.value] += count
+        else:
+            point["by_project"][project] = point["by_project"].get(project, 0) + count
+    return list(points.values())
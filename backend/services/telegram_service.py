@@ -1,9 +1,19 @@
 import os
 import asyncio
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
 import random
 
+from config.config import FETCH_MAX_PAGES
+from services.api_clients import get_telegram_bot, telegram_limiter
+from services.rate_limiter import PRIORITY_HIGH
+
+logger = logging.getLogger(__name__)
+
+# Most updates getUpdates returns per call
+UPDATES_PAGE_SIZE = 100
+
 class TelegramService:
     def __init__(self):
         self.bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
@@ -15,72 +25,65 @@ class TelegramService:
                 "id": "tg_001",
                 "sender": "Alice Crypto",
                 "content": "Hey Krum! The new token launch is looking great. When can we expect the whitepaper?",
-                "timestamp": datetime.now() - timedelta(minutes=30)
+                "timestamp": datetime.now(timezone.utc) - timedelta(minutes=30)
             },
             {
                 "id": "tg_002", 
                 "sender": "Bob Investor",
                 "content": "URGENT: There's a critical bug in the smart contract. Need immediate attention!",
-                "timestamp": datetime.now() - timedelta(minutes=15)
+                "timestamp": datetime.now(timezone.utc) - timedelta(minutes=15)
             },
             {
                 "id": "tg_003",
                 "sender": "Charlie Dev",
                 "content": "The frontend is broken, users can't connect their wallets. This is urgent!",
-                "timestamp": datetime.now() - timedelta(minutes=5)
+                "timestamp": datetime.now(timezone.utc) - timedelta(minutes=5)
             },
             {
                 "id": "tg_004",
                 "sender": "Diana Community",
                 "content": "Thanks for the AMA yesterday! The community loved it.",
-                "timestamp": datetime.now() - timedelta(hours=2)
+                "timestamp": datetime.now(timezone.utc) - timedelta(hours=2)
             },
             {
                 "id": "tg_005",
                 "sender": "Eve Partner",
                 "content": "Important partnership discussion - can we schedule a call this week?",
-                "timestamp": datetime.now() - timedelta(hours=1)
+                "timestamp": datetime.now(timezone.utc) - timedelta(hours=1)
             },
             # Web3-specific messages
             {
                 "id": "tg_006",
                 "sender": "DeFi Founder",
                 "content": "Need urgent audit for my Uniswap fork! Can you help?",
-                "timestamp": datetime.now() - timedelta(minutes=45)
+                "timestamp": datetime.now(timezone.utc) - timedelta(minutes=45)
             },
             {
                 "id": "tg_007",
                 "sender": "NFT Creator",
                 "content": "How does Aave's lending protocol work? Looking to integrate similar features.",
-                "timestamp": datetime.now() - timedelta(minutes=20)
+                "timestamp": datetime.now(timezone.utc) - timedelta(minutes=20)
             },
             {
                 "id": "tg_008",
                 "sender": "LayerZero Dev",
                 "content": "Interested in cross-chain integration like LayerZero. Any advice?",
-                "timestamp": datetime.now() - timedelta(minutes=10)
+                "timestamp": datetime.now(timezone.utc) - timedelta(minutes=10)
             },
             {
                 "id": "tg_009",
                 "sender": "Sushi Chef",
                 "content": "Our Sushi fork needs security review. Can Pashov Audit Group help?",
-                "timestamp": datetime.now() - timedelta(minutes=35)
+                "timestamp": datetime.now(timezone.utc) - timedelta(minutes=35)
             },
             {
                 "id": "tg_010",
                 "sender": "Ethena Builder",
                 "content": "Building a stablecoin protocol similar to Ethena. Need audit recommendations.",
-                "timestamp": datetime.now() - timedelta(minutes=25)
+                "timestamp": datetime.now(timezone.utc) - timedelta(minutes=25)
             }
         ]
 
-    async def fetch_messages(self) -> List[Dict[str, Any]]:
-        """Fetch messages from Telegram or return mock data"""
-        if self.use_mock_data:
-            return self._get_mock_messages()
-        else:
-            return await self._fetch_real_messages()
-
     def _get_mock_messages(self) -> List[Dict[str, Any]]:
         """Return mock messages for demonstration"""
         # Randomly select 3-5 messages to simulate new incoming messages
@@ -89,21 +92,59 @@ class TelegramService:
         
         # Add some randomness to timestamps
         for msg in selected_messages:
-            msg["timestamp"] = datetime.now() - timedelta(
+            msg["timestamp"] = datetime.now(timezone.utc) - timedelta(
                 minutes=random.randint(1, 60)
             )
         
         return selected_messages
 
-    async def _fetch_real_messages(self) -> List[Dict[str, Any]]:
-        """Fetch real messages from Telegram Bot API"""
-        try:
-            # This would be implemented with python-telegram-bot library
-            # For now, return mock data as fallback
-            return self._get_mock_messages()
-        except Exception as e:
-            print(f"Error fetching Telegram messages: {e}")
-            return []
+    async def iter_message_pages(self, since_id: Optional[str] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Messages from updates after since_id one getUpdates page at a time,
+        oldest first, or the mock messages as a single page. API errors are raised.
+        """
+        if self.use_mock_data:
+            yield self._get_mock_messages()
+            return
+        async for page in self._iter_real_message_pages(since_id):
+            yield page
+
+    async def _iter_real_message_pages(self, since_id: Optional[str] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        bot = get_telegram_bot()
+        if bot is None:
+            # The bot client failed to start (e.g. the token was rejected)
+            yield self._get_mock_messages()
+            return
+        
+        # getUpdates returns updates from offset on, oldest first
+        offset = int(since_id) + 1 if since_id else None
+        for _ in range(FETCH_MAX_PAGES):
+            page = await telegram_limiter.call(
+                "get_updates",
+                lambda: bot.get_updates(
+                    offset=offset, limit=UPDATES_PAGE_SIZE, timeout=0, allowed_updates=["message"]
+                ),
+                PRIORITY_HIGH
+            )
+            yield [
+                {
+                    "id": str(update.update_id),
+                    "sender": self._sender_name(update.message.from_user),
+                    "content": update.message.text or "",
+                    "timestamp": update.message.date
+                }
+                for update in page
+                if update.message and update.message.text
+            ]
+            if len(page) < UPDATES_PAGE_SIZE:
+                break
+            offset = page[-1].update_id + 1
+
+    @staticmethod
+    def _sender_name(user) -> str:
+        if user is None:
+            return "Unknown"
+        return user.username or user.full_name
 
     async def send_message(self, chat_id: str, message: str) -> bool:
         """Send a message via Telegram Bot API"""
@@ -111,8 +152,15 @@ class TelegramService:
             print(f"[MOCK] Sending message to {chat_id}: {message}")
             return True
         
+        bot = get_telegram_bot()
+        if bot is None:
+            logger.warning("Telegram bot client is not available")
+            return False
+        
         try:
-            # Implement real Telegram sending logic here
+            await telegram_limiter.call(
+                "send_message", lambda: bot.send_message(chat_id=chat_id, text=message), PRIORITY_HIGH
+            )
             return True
         except Exception as e:
             print(f"Error sending Telegram message: {e}")
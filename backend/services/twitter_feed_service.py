@@ -1,50 +1,64 @@
-try:
-    import tweepy
-    TWITTER_AVAILABLE = True
-except ImportError:
-    TWITTER_AVAILABLE = False
-
-from config.config import TWITTER_BEARER_TOKEN, PROJECT_FEEDS, PASHOV_AUDIT_GROUP, USE_MOCK_DATA
+from config.config import PROJECT_FEEDS, PASHOV_AUDIT_GROUP, USE_MOCK_DATA
+from services.api_clients import get_twitter_client, iter_tweet_pages
+from services.rate_limiter import PRIORITY_LOW
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional
 
-logging.basicConfig(filename="logs/app.log", level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def fetch_twitter_feed(twitter_id):
-    """Fetch Twitter feed for a specific project or account"""
+def _mock_feed(twitter_id):
+    return [
+        {
+            "id": f"mock_{twitter_id}_1",
+            "source": "TWITTER_FEED",
+            "sender": twitter_id,
+            "content": f"Mock update from {twitter_id} - New protocol features released!",
+            "timestamp": datetime.now(timezone.utc),
+            "category": "routine"
+        },
+        {
+            "id": f"mock_{twitter_id}_2",
+            "source": "TWITTER_FEED",
+            "sender": twitter_id,
+            "content": f"{twitter_id} announces partnership with major DeFi protocol",
+            "timestamp": datetime.now(timezone.utc),
+            "category": "high_priority"
+        }
+    ]
+
+async def iter_feed_pages(
+    twitter_id,
+    since_id: Optional[str] = None,
+    until_id: Optional[str] = None
+) -> AsyncIterator[List[dict]]:
+    """
+    Twitter feed of a project or account one API page at a time. Without
+    since_id a single page of the latest tweets; with it, every newer tweet
+    (older than until_id, if given). API errors and ListingTruncated are raised.
+    """
     if USE_MOCK_DATA:
-        return [
-            {
-                "id": f"mock_{twitter_id}_1",
-                "source": "TWITTER_FEED",
-                "sender": twitter_id,
-                "content": f"Mock update from {twitter_id} - New protocol features released!",
-                "timestamp": datetime.now(),
-                "category": "routine"
-            },
-            {
-                "id": f"mock_{twitter_id}_2",
-                "source": "TWITTER_FEED",
-                "sender": twitter_id,
-                "content": f"{twitter_id} announces partnership with major DeFi protocol",
-                "timestamp": datetime.now(),
-                "category": "high_priority"
-            }
-        ]
+        yield _mock_feed(twitter_id)
+        return
     
-    if not TWITTER_AVAILABLE:
+    client = get_twitter_client()
+    if client is None:
         logger.warning("Twitter API not available - using mock data")
-        return []
-        
-    try:
-        client = tweepy.Client(bearer_token=TWITTER_BEARER_TOKEN)
-        tweets = client.get_users_tweets(id=twitter_id, max_results=10)
-        
-        if not tweets.data:
-            return []
-            
-        return [
+        return
+    
+    if since_id:
+        window = {"until_id": until_id} if until_id else {}
+        pages = iter_tweet_pages(
+            client.get_users_tweets, priority=PRIORITY_LOW, id=twitter_id, since_id=since_id,
+            max_results=100, tweet_fields=["created_at"], **window
+        )
+    else:
+        pages = iter_tweet_pages(
+            client.get_users_tweets, max_pages=1, priority=PRIORITY_LOW, id=twitter_id, max_results=10,
+            tweet_fields=["created_at"]
+        )
+    async for tweets, _ in pages:
+        yield [
             {
                 "id": str(tweet.id),
                 "source": "TWITTER_FEED",
@@ -53,36 +67,20 @@ async def fetch_twitter_feed(twitter_id):
                 "timestamp": tweet.created_at.isoformat(),
                 "category": "routine"  # Will be categorized by main service
             }
-            for tweet in tweets.data
+            for tweet in tweets
         ]
-    except Exception as e:
-        logger.error(f"Failed to fetch Twitter feed for {twitter_id}: {e}")
-        return []
-
-async def fetch_audited_project_feeds():
-    """Fetch Twitter feeds for all audited projects"""
-    feeds = {}
-    for project, details in PROJECT_FEEDS.items():
-        if details and project != 'none':
-            feeds[project] = await fetch_twitter_feed(details['twitter_id'])
-            logger.info(f"Fetched {len(feeds[project])} tweets for {project}")
-    return feeds
 
-async def fetch_pashov_audit_group_feed():
-    """Fetch Pashov Audit Group's Twitter feed"""
-    feed = await fetch_twitter_feed(PASHOV_AUDIT_GROUP['twitter_id'])
-    logger.info(f"Fetched {len(feed)} tweets for Pashov Audit Group")
-    return feed
+def audited_project_accounts() -> Dict[str, str]:
+    """Project name -> twitter_id for every audited project with a feed"""
+    return {
+        project: details['twitter_id']
+        for project, details in PROJECT_FEEDS.items()
+        if details and project != 'none'
+    }
 
-async def get_project_feed_summary():
-    """Get a summary of all project feeds"""
-    project_feeds = await fetch_audited_project_feeds()
-    pashov_feed = await fetch_pashov_audit_group_feed()
-    
-    summary = {
-        "total_tweets": sum(len(feed) for feed in project_feeds.values()) + len(pashov_feed),
-        "projects": {project: len(feed) for project, feed in project_feeds.items()},
-        "pashov_audit_group": len(pashov_feed)
+def all_feed_accounts() -> Dict[str, str]:
+    """Every audited project account plus Pashov Audit Group's, keyed by feed name"""
+    return {
+        **audited_project_accounts(),
+        PASHOV_AUDIT_GROUP['twitter_id']: PASHOV_AUDIT_GROUP['twitter_id']
     }
-    
-    return summary
@@ -1,9 +1,13 @@
 import os
 import asyncio
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
 import random
 
+from config.config import TWITTER_USER_ID
+from services.api_clients import get_twitter_client, iter_tweet_pages
+from services.rate_limiter import PRIORITY_HIGH
+
 class TwitterService:
     def __init__(self):
         self.bearer_token = os.getenv("TWITTER_BEARER_TOKEN")
@@ -15,84 +19,77 @@ class TwitterService:
                 "id": "tw_001",
                 "sender": "@crypto_enthusiast",
                 "content": "@krum_web3 Great project! When is the next token launch? 🚀",
-                "timestamp": datetime.now() - timedelta(minutes=25)
+                "timestamp": datetime.now(timezone.utc) - timedelta(minutes=25)
             },
             {
                 "id": "tw_002",
                 "sender": "@defi_analyst",
                 "content": "@krum_web3 URGENT: Found a potential security vulnerability in your smart contract. DM me ASAP!",
-                "timestamp": datetime.now() - timedelta(minutes=10)
+                "timestamp": datetime.now(timezone.utc) - timedelta(minutes=10)
             },
             {
                 "id": "tw_003",
                 "sender": "@blockchain_dev",
                 "content": "@krum_web3 The dApp is down! Users are complaining on Discord. Need immediate fix!",
-                "timestamp": datetime.now() - timedelta(minutes=3)
+                "timestamp": datetime.now(timezone.utc) - timedelta(minutes=3)
             },
             {
                 "id": "tw_004",
                 "sender": "@web3_investor",
                 "content": "@krum_web3 Love the new features! The UI is much better now. Keep up the great work! 👏",
-                "timestamp": datetime.now() - timedelta(hours=1)
+                "timestamp": datetime.now(timezone.utc) - timedelta(hours=1)
             },
             {
                 "id": "tw_005",
                 "sender": "@crypto_podcast",
                 "content": "@krum_web3 Would love to have you on our podcast to discuss the future of DeFi!",
-                "timestamp": datetime.now() - timedelta(hours=30)
+                "timestamp": datetime.now(timezone.utc) - timedelta(hours=30)
             },
             {
                 "id": "tw_006",
                 "sender": "@nft_collector",
                 "content": "@krum_web3 When are you launching the NFT collection? The community is excited! 🎨",
-                "timestamp": datetime.now() - timedelta(hours=2)
+                "timestamp": datetime.now(timezone.utc) - timedelta(hours=2)
             },
             # Web3-specific mentions
             {
                 "id": "tw_007",
                 "sender": "@defi_founder",
                 "content": "@krum_web3 Need audit for my Uniswap fork! Pashov Audit Group is the best! 🔥",
-                "timestamp": datetime.now() - timedelta(minutes=40)
+                "timestamp": datetime.now(timezone.utc) - timedelta(minutes=40)
             },
             {
                 "id": "tw_008",
                 "sender": "@aave_user",
                 "content": "@krum_web3 How does Aave's lending protocol compare to Compound? Looking for insights!",
-                "timestamp": datetime.now() - timedelta(minutes=15)
+                "timestamp": datetime.now(timezone.utc) - timedelta(minutes=15)
             },
             {
                 "id": "tw_009",
                 "sender": "@layerzero_builder",
                 "content": "@krum_web3 Building cross-chain bridges like LayerZero. Need security audit!",
-                "timestamp": datetime.now() - timedelta(minutes=8)
+                "timestamp": datetime.now(timezone.utc) - timedelta(minutes=8)
             },
             {
                 "id": "tw_010",
                 "sender": "@sushi_chef",
                 "content": "@krum_web3 Our Sushi fork needs review. Can you audit it like you did for the original?",
-                "timestamp": datetime.now() - timedelta(minutes=30)
+                "timestamp": datetime.now(timezone.utc) - timedelta(minutes=30)
             },
             {
                 "id": "tw_011",
                 "sender": "@ethena_builder",
                 "content": "@krum_web3 Building a stablecoin protocol similar to Ethena. Need your expertise!",
-                "timestamp": datetime.now() - timedelta(minutes=18)
+                "timestamp": datetime.now(timezone.utc) - timedelta(minutes=18)
             },
             {
                 "id": "tw_012",
                 "sender": "@karak_dev",
                 "content": "@krum_web3 Karak's restaking protocol is amazing! Can you audit our similar implementation?",
-                "timestamp": datetime.now() - timedelta(minutes=12)
+                "timestamp": datetime.now(timezone.utc) - timedelta(minutes=12)
             }
         ]
 
-    async def fetch_mentions(self) -> List[Dict[str, Any]]:
-        """Fetch mentions from Twitter or return mock data"""
-        if self.use_mock_data:
-            return self._get_mock_mentions()
-        else:
-            return await self._fetch_real_mentions()
-
     def _get_mock_mentions(self) -> List[Dict[str, Any]]:
         """Return mock mentions for demonstration"""
         # Randomly select 3-5 mentions to simulate new incoming mentions
@@ -101,21 +98,61 @@ class TwitterService:
         
         # Add some randomness to timestamps
         for mention in selected_mentions:
-            mention["timestamp"] = datetime.now() - timedelta(
+            mention["timestamp"] = datetime.now(timezone.utc) - timedelta(
                 minutes=random.randint(1, 60)
             )
         
         return selected_mentions
 
-    async def _fetch_real_mentions(self) -> List[Dict[str, Any]]:
-        """Fetch real mentions from Twitter API v2"""
-        try:
-            # This would be implemented with tweepy library
-            # For now, return mock data as fallback
-            return self._get_mock_mentions()
-        except Exception as e:
-            print(f"Error fetching Twitter mentions: {e}")
-            return []
+    async def iter_mention_pages(
+        self,
+        since_id: Optional[str] = None,
+        until_id: Optional[str] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Mentions newer than since_id (and older than until_id) one API page
+        at a time, newest first, or the mock mentions as a single page. API
+        errors and ListingTruncated are raised.
+        """
+        if self.use_mock_data:
+            yield self._get_mock_mentions()
+            return
+        async for page in self._iter_real_mention_pages(since_id, until_id):
+            yield page
+
+    async def _iter_real_mention_pages(
+        self,
+        since_id: Optional[str] = None,
+        until_id: Optional[str] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        client = get_twitter_client()
+        if client is None or not TWITTER_USER_ID:
+            # Mentions need the shared client and the account id
+            yield self._get_mock_mentions()
+            return
+        
+        params = {"since_id": since_id} if since_id else {}
+        if until_id:
+            params["until_id"] = until_id
+        async for tweets, users in iter_tweet_pages(
+            client.get_users_mentions,
+            priority=PRIORITY_HIGH,
+            id=TWITTER_USER_ID,
+            max_results=100,
+            tweet_fields=["created_at", "author_id"],
+            expansions=["author_id"],
+            user_fields=["username"],
+            **params
+        ):
+            yield [
+                {
+                    "id": str(tweet.id),
+                    "sender": f"@{users[tweet.author_id].username}" if tweet.author_id in users else str(tweet.author_id),
+                    "content": tweet.text or "",
+                    "timestamp": tweet.created_at or datetime.now(timezone.utc)
+                }
+                for tweet in tweets
+            ]
 
     async def reply_to_tweet(self, tweet_id: str, reply_text: str) -> bool:
         """Reply to a tweet via Twitter API"""
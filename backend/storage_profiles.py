@@ -0,0 +1,134 @@
+"""
+Named storage profiles for the database engines.
+
+A profile bundles the SQLite PRAGMAs applied to every new connection and the
+connection pool settings used for Postgres. Select one with the
+STORAGE_PROFILE environment variable:
+
+    compat      SQLite's own defaults (rollback journal, synchronous=FULL),
+                small Postgres pool without pre-ping
+    balanced    WAL so refresh writes do not block readers, synchronous=NORMAL,
+                larger page cache and mmap (default)
+    throughput  WAL with synchronous=OFF, bigger cache and mmap, larger pool;
+                fastest, but a power loss can drop the last transactions
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+DEFAULT_STORAGE_PROFILE = "balanced"
+
+@dataclass(frozen=True)
+class StorageProfile:
+    """Engine tuning for one profile; None leaves the driver default in place"""
+    name: str
+    # SQLite PRAGMAs
+    journal_mode: Optional[str] = None
+    synchronous: Optional[str] = None
+    cache_size: Optional[int] = None  # negative values are KiB, positive are pages
+    mmap_size: Optional[int] = None  # bytes
+    busy_timeout: Optional[int] = None  # milliseconds
+    # Postgres pool
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_pre_ping: bool = False
+
+    def sqlite_pragmas(self) -> Dict[str, Any]:
+        pragmas = {
+            "journal_mode": self.journal_mode,
+            "synchronous": self.synchronous,
+            "cache_size": self.cache_size,
+            "mmap_size": self.mmap_size,
+            "busy_timeout": self.busy_timeout,
+        }
+        return {pragma: value for pragma, value in pragmas.items() if value is not None}
+
+STORAGE_PROFILES = {
+    profile.name: profile for profile in [
+        StorageProfile(
+            name="compat",
+            journal_mode="DELETE",
+            synchronous="FULL",
+            busy_timeout=5000,
+        ),
+        StorageProfile(
+            name="balanced",
+            journal_mode="WAL",
+            synchronous="NORMAL",
+            cache_size=-64_000,
+            mmap_size=256 * 1024 * 1024,
+            busy_timeout=5000,
+            pool_size=10,
+            max_overflow=20,
+            pool_pre_ping=True,
+        ),
+        StorageProfile(
+            name="throughput",
+            journal_mode="WAL",
+            synchronous="OFF",
+            cache_size=-256_000,
+            mmap_size=1024 * 1024 * 1024,
+            busy_timeout=10000,
+            pool_size=20,
+            max_overflow=40,
+            pool_pre_ping=True,
+        ),
+    ]
+}
+
+def get_storage_profile(name: Optional[str]) -> StorageProfile:
+    """Look up a profile by name (case-insensitive); None selects the default"""
+    key = (name or DEFAULT_STORAGE_PROFILE).strip().lower()
+    if key not in STORAGE_PROFILES:
+        raise ValueError(
+            f"Unknown storage profile '{name}', expected one of: {', '.join(STORAGE_PROFILES)}"
+        )
+    return STORAGE_PROFILES[key]
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+def _engine_options(url: str, profile: StorageProfile) -> Dict[str, Any]:
+    if _is_sqlite(url):
+        return {"connect_args": {"check_same_thread": False}}
+    if url.startswith(("postgresql", "postgres")):
+        return {
+            "pool_size": profile.pool_size,
+            "max_overflow": profile.max_overflow,
+            "pool_pre_ping": profile.pool_pre_ping,
+        }
+    return {}
+
+def _install_sqlite_pragmas(engine: Engine, profile: StorageProfile):
+    """Apply the profile's PRAGMAs to every connection the pool opens"""
+    pragmas = profile.sqlite_pragmas()
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma, value in pragmas.items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+        cursor.close()
+
+def create_profiled_engine(url: str, profile: StorageProfile) -> Engine:
+    """Sync engine for url tuned by the profile"""
+    engine = create_engine(url, **_engine_options(url, profile))
+    if _is_sqlite(url):
+        _install_sqlite_pragmas(engine, profile)
+    return engine
+
+def create_profiled_async_engine(url: str, profile: StorageProfile) -> AsyncEngine:
+    """Async engine for url tuned by the profile"""
+    options = _engine_options(url, profile)
+    if _is_sqlite(url):
+        # aiosqlite runs each connection in its own thread already
+        options.pop("connect_args", None)
+    engine = create_async_engine(url, **options)
+    if _is_sqlite(url):
+        _install_sqlite_pragmas(engine.sync_engine, profile)
+    return engine
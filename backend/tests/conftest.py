@@ -0,0 +1,38 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+
+@pytest.fixture
+def engine():
+    """Isolated in-memory database"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def db(engine):
+    """Session on the isolated in-memory database"""
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+@pytest_asyncio.fixture
+async def session_factory():
+    """Isolated in-memory database behind an async session factory"""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    await engine.dispose()
+
+@pytest_asyncio.fixture
+async def async_db(session_factory):
+    """Async session on the isolated in-memory database"""
+    async with session_factory() as session:
+        yield session
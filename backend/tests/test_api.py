@@ -1,31 +1,48 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from unittest.mock import AsyncMock, patch, MagicMock
 import sqlite3
 import os
 from datetime import datetime
 
-from main import app
-from database import init_db, SessionLocal
-from models import Message, MessageCategory, MessageSource
+import database
+from config.config import MESSAGES_MAX_PAGE_SIZE
+from main import app, feed_cache
+from database import AsyncSessionLocal, SessionLocal
+from migrations import run_migrations
+from models import Message, MessageCategory, MessageSource, RecategorizationJob
 
 client = TestClient(app)
 
+TEST_DB_PATH = "./test_comms.db"
+
 @pytest.fixture(scope="function")
 def setup_database():
-    """Setup test database"""
-    # Use test database
-    test_db_url = "sqlite:///./test_comms.db"
-    os.environ["DATABASE_URL"] = test_db_url
+    """Setup test database: an empty test_comms.db behind every session the app opens"""
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+    test_engine = create_engine(f"sqlite:///{TEST_DB_PATH}")
+    # Each TestClient request runs on its own event loop, so async connections are not pooled
+    test_async_engine = create_async_engine(f"sqlite+aiosqlite:///{TEST_DB_PATH}", poolclass=NullPool)
+    run_migrations(test_engine)
     
-    # Initialize test database
-    init_db()
+    # Request handlers, ingest jobs and the feed cache all open sessions from these factories
+    SessionLocal.configure(bind=test_engine)
+    AsyncSessionLocal.configure(bind=test_async_engine)
+    feed_cache.invalidate()
     
     yield
     
     # Cleanup
-    if os.path.exists("./test_comms.db"):
-        os.remove("./test_comms.db")
+    SessionLocal.configure(bind=database.engine)
+    AsyncSessionLocal.configure(bind=database.async_engine)
+    feed_cache.invalidate()
+    test_engine.dispose()
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
 
 @pytest.mark.asyncio
 async def test_health_check():
@@ -45,6 +62,12 @@ async def test_get_messages_empty(setup_database):
     assert isinstance(data, list)
     assert len(data) == 0
 
+def test_get_messages_limit_bounds(setup_database):
+    """Test that page sizes outside 1..MESSAGES_MAX_PAGE_SIZE are rejected"""
+    for limit in (0, -1, MESSAGES_MAX_PAGE_SIZE + 1):
+        assert client.get(f"/api/messages?limit={limit}").status_code == 422
+    assert client.get(f"/api/messages?limit={MESSAGES_MAX_PAGE_SIZE}").status_code == 200
+
 @pytest.mark.asyncio
 async def test_get_messages_with_data(setup_database):
     """Test getting messages with sample data"""
@@ -159,13 +182,20 @@ async def test_get_templates():
     assert "content" in template
     assert "Pashov Audit Group" in template["content"]
 
+def _pages(*pages):
+    """side_effect for the iter_*_pages service methods, yielding the given pages"""
+    async def iterate(*args, **kwargs):
+        for page in pages:
+            yield page
+    return iterate
+
 @pytest.mark.asyncio
 async def test_refresh_messages_mock(setup_database):
     """Test refresh messages with mocked services"""
-    with patch('services.telegram_service.TelegramService.fetch_messages') as mock_telegram:
-        with patch('services.twitter_service.TwitterService.fetch_mentions') as mock_twitter:
+    with patch('services.telegram_service.TelegramService.iter_message_pages') as mock_telegram:
+        with patch('services.twitter_service.TwitterService.iter_mention_pages') as mock_twitter:
             # Mock return values
-            mock_telegram.return_value = [
+            mock_telegram.side_effect = _pages([
                 {
                     "id": "1",
                     "source": "telegram",
@@ -173,8 +203,8 @@ async def test_refresh_messages_mock(setup_database):
                     "content": "Test Telegram message",
                     "timestamp": "2025-08-13T10:00:00Z"
                 }
-            ]
-            mock_twitter.return_value = [
+            ])
+            mock_twitter.side_effect = _pages([
                 {
                     "id": "2",
                     "source": "twitter",
@@ -182,13 +212,19 @@ async def test_refresh_messages_mock(setup_database):
                     "content": "Test Twitter message",
                     "timestamp": "2025-08-13T10:05:00Z"
                 }
-            ]
+            ])
             
             response = client.post("/api/refresh")
+            assert response.status_code == 202
+            job = response.json()
+            assert job["sources"] == ["telegram", "twitter"]
+            
+            # The job runs after the response; the test client waits for it
+            response = client.get(f"/api/jobs/{job['id']}")
             assert response.status_code == 200
             data = response.json()
-            assert data["success"] == True
-            assert "Refreshed 2 messages" in data["message"]
+            assert data["status"] == "completed"
+            assert data["fetched"] == 2
             
             # Verify messages were added to database
             response = client.get("/api/messages")
@@ -198,88 +234,218 @@ async def test_refresh_messages_mock(setup_database):
 @pytest.mark.asyncio
 async def test_refresh_messages_fallback(setup_database):
     """Test refresh messages with fallback data when services fail"""
-    with patch('services.telegram_service.TelegramService.fetch_messages') as mock_telegram:
-        with patch('services.twitter_service.TwitterService.fetch_mentions') as mock_twitter:
+    with patch('services.telegram_service.TelegramService.iter_message_pages') as mock_telegram:
+        with patch('services.twitter_service.TwitterService.iter_mention_pages') as mock_twitter:
             # Mock empty returns
-            mock_telegram.return_value = []
-            mock_twitter.return_value = []
+            mock_telegram.side_effect = _pages()
+            mock_twitter.side_effect = _pages()
             
             response = client.post("/api/refresh")
-            assert response.status_code == 200
-            data = response.json()
-            assert data["success"] == True
-            assert "Refreshed 1 messages" in data["message"]  # Fallback message
+            assert response.status_code == 202
+            data = client.get(f"/api/jobs/{response.json()['id']}").json()
+            assert data["status"] == "completed"
+            assert data["fetched"] == 1  # Fallback message
 
 @pytest.mark.asyncio
-async def test_get_project_feeds_mock():
-    """Test getting project feeds with mocked service"""
-    with patch('services.twitter_feed_service.fetch_audited_project_feeds') as mock_project_feeds:
-        with patch('services.twitter_feed_service.fetch_pashov_audit_group_feed') as mock_pashov:
-            # Mock return values
-            mock_project_feeds.return_value = {
-                "Uniswap": [
-                    {
-                        "content": "New Uniswap V4 update",
-                        "timestamp": "2025-08-13T10:10:00Z"
-                    }
-                ]
-            }
-            mock_pashov.return_value = [
+async def test_refresh_records_match_evidence(setup_database):
+    """Test that refresh stores categorization evidence used by the explanation endpoint"""
+    with patch('services.telegram_service.TelegramService.iter_message_pages') as mock_telegram:
+        with patch('services.twitter_service.TwitterService.iter_mention_pages') as mock_twitter:
+            mock_telegram.side_effect = _pages([
                 {
-                    "content": "Pashov Audit Group completed security review",
-                    "timestamp": "2025-08-13T10:15:00Z"
+                    "id": "evidence1",
+                    "sender": "@EvidenceUser",
+                    "content": "Our Sushi fork on Arbitrum is ready for review",
+                    "timestamp": "2025-08-13T10:00:00Z"
                 }
-            ]
+            ])
+            mock_twitter.side_effect = _pages()
             
-            response = client.get("/api/project-feeds")
-            assert response.status_code == 200
-            data = response.json()
-            assert "Uniswap" in data
-            assert "PashovAuditGrp" in data
-            assert len(data["Uniswap"]) == 1
-            assert len(data["PashovAuditGrp"]) == 1
+            response = client.post("/api/refresh")
+            assert response.status_code == 202
+    
+    db = SessionLocal()
+    message = db.query(Message).filter(Message.sender == "@EvidenceUser").first()
+    db.close()
+    assert message.source == MessageSource.TELEGRAM
+    assert message.category == MessageCategory.HIGH_PRIORITY
+    assert message.category_rule == "audited_projects"
+    assert message.matched_projects == ["Sushi", "Arbitrum"]
+    
+    response = client.get(f"/api/messages/{message.id}/explanation")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["explanation"] == "Marked as HIGH PRIORITY due to audited project mentions: Sushi, Arbitrum"
 
 @pytest.mark.asyncio
-async def test_get_project_feeds_fallback():
-    """Test getting project feeds with fallback data when service fails"""
-    with patch('services.twitter_feed_service.fetch_audited_project_feeds') as mock_project_feeds:
-        with patch('services.twitter_feed_service.fetch_pashov_audit_group_feed') as mock_pashov:
-            # Mock exceptions
-            mock_project_feeds.side_effect = Exception("API Error")
-            mock_pashov.side_effect = Exception("API Error")
-            
-            response = client.get("/api/project-feeds")
-            assert response.status_code == 200
-            data = response.json()
-            assert "PashovAuditGrp" in data
-            assert "Fallback" in data["PashovAuditGrp"][0]["content"]
+async def test_unaudited_project_filter_with_search(setup_database):
+    """Test combining a project that is not audited with a text search"""
+    db = SessionLocal()
+    for sender, content in [
+        ("nft_dev", "Our OpenSea clone needs a security audit"),
+        ("nft_fan", "OpenSea listing went live today"),
+        ("dex_dev", "Security audit for our DEX"),
+    ]:
+        db.add(Message(
+            sender=sender, content=content, source=MessageSource.TELEGRAM,
+            category=MessageCategory.ROUTINE, timestamp=datetime.now()
+        ))
+    db.commit()
+    db.close()
+    
+    response = client.get("/api/messages?project=OpenSea&q=audit")
+    assert response.status_code == 200
+    assert [msg["sender"] for msg in response.json()] == ["nft_dev"]
+    
+    response = client.get("/api/messages?project=OpenSea")
+    assert sorted(msg["sender"] for msg in response.json()) == ["nft_dev", "nft_fan"]
 
 @pytest.mark.asyncio
-async def test_refresh_project_feeds_mock():
-    """Test refreshing project feeds with mocked service"""
-    with patch('services.twitter_feed_service.fetch_audited_project_feeds') as mock_project_feeds:
-        with patch('services.twitter_feed_service.fetch_pashov_audit_group_feed') as mock_pashov:
-            # Mock return values
-            mock_project_feeds.return_value = {
-                "Aave": [
-                    {
-                        "content": "Aave protocol update",
-                        "timestamp": "2025-08-13T10:20:00Z"
-                    }
-                ]
-            }
-            mock_pashov.return_value = [
-                {
-                    "content": "Pashov Audit Group news",
-                    "timestamp": "2025-08-13T10:25:00Z"
-                }
-            ]
-            
-            response = client.post("/api/refresh-feeds")
-            assert response.status_code == 200
-            data = response.json()
-            assert data["success"] == True
-            assert "Refreshed feeds for 2 sources" in data["message"]
+async def test_preview_list_and_full_message(setup_database):
+    """Test that the preview list omits full content and /api/messages/{id} serves it"""
+    db = SessionLocal()
+    db.add(Message(
+        sender="long_writer",
+        content="Audit request for our lending protocol. " * 20,
+        source=MessageSource.TELEGRAM,
+        category=MessageCategory.ROUTINE,
+        timestamp=datetime.now()
+    ))
+    db.commit()
+    db.close()
+    
+    response = client.get("/api/messages?view=preview&limit=5")
+    assert response.status_code == 200
+    previews = response.json()
+    assert previews
+    assert "content" not in previews[0]
+    assert "content_preview" in previews[0]
+    
+    response = client.get(f"/api/messages/{previews[0]['id']}")
+    assert response.status_code == 200
+    message = response.json()
+    assert message["content"].startswith(previews[0]["content_preview"])
+    assert len(message["content"]) > len(previews[0]["content_preview"]) or not previews[0]["content_truncated"]
+    
+    assert client.get("/api/messages/999999999").status_code == 404
+
+@pytest.mark.asyncio
+async def test_get_project_feeds_mock(setup_database):
+    """Test getting project feeds from the stored TWITTER_FEED messages"""
+    db = SessionLocal()
+    db.add_all([
+        Message(
+            external_id="1001",
+            sender="Uniswap",
+            content="New Uniswap V4 update",
+            source=MessageSource.TWITTER_FEED,
+            category=MessageCategory.ROUTINE,
+            timestamp=datetime(2025, 8, 13, 10, 10)
+        ),
+        Message(
+            external_id="1002",
+            sender="PashovAuditGrp",
+            content="Pashov Audit Group completed security review",
+            source=MessageSource.TWITTER_FEED,
+            category=MessageCategory.ROUTINE,
+            timestamp=datetime(2025, 8, 13, 10, 15)
+        )
+    ])
+    db.commit()
+    db.close()
+    
+    response = client.get("/api/project-feeds")
+    assert response.status_code == 200
+    data = response.json()
+    assert "Uniswap" in data
+    assert "PashovAuditGrp" in data
+    assert data["Aave"] == []
+    assert len(data["Uniswap"]) == 1
+    assert len(data["PashovAuditGrp"]) == 1
+    tweet = data["Uniswap"][0]
+    assert tweet["content"] == "New Uniswap V4 update"
+    assert tweet["sender"] == "Uniswap"
+    assert tweet["source"] == "TWITTER_FEED"
+    assert tweet["timestamp"] == "2025-08-13T10:10:00+00:00"
+
+@pytest.mark.asyncio
+async def test_get_project_feeds_fallback(setup_database):
+    """Test getting project feeds with fallback data when the stored feeds cannot be read"""
+    with patch.object(feed_cache, "_fetch", AsyncMock(side_effect=Exception("Database error"))):
+        response = client.get("/api/project-feeds")
+    assert response.status_code == 200
+    data = response.json()
+    assert "PashovAuditGrp" in data
+    assert "Fallback" in data["PashovAuditGrp"][0]["content"]
+
+@pytest.mark.asyncio
+async def test_refresh_project_feeds_mock(setup_database):
+    """Test refreshing project feeds with a mocked Twitter fetch"""
+    fetched = []
+    
+    async def feed_pages(twitter_id, since_id=None, until_id=None):
+        fetched.append(twitter_id)
+        yield [{
+            "id": str(2000 + len(fetched)),
+            "source": "TWITTER_FEED",
+            "sender": twitter_id,
+            "content": f"{twitter_id} protocol update",
+            "timestamp": "2025-08-13T10:20:00"
+        }]
+    
+    with patch('services.ingest_scheduler.iter_feed_pages', feed_pages):
+        response = client.post("/api/refresh-feeds")
+    assert response.status_code == 202
+    data = client.get(f"/api/jobs/{response.json()['id']}").json()
+    assert data["sources"] == ["project_feeds"]
+    assert data["status"] == "completed"
+    assert data["inserted"] == len(fetched)
+    
+    feeds = client.get("/api/project-feeds").json()
+    assert [tweet["content"] for tweet in feeds["Aave"]] == ["Aave protocol update"]
+    assert [tweet["content"] for tweet in feeds["PashovAuditGrp"]] == ["PashovAuditGrp protocol update"]
+
+@pytest.mark.asyncio
+async def test_feed_ingest_leaves_inbox_and_stats_unchanged(setup_database):
+    """Test that stored project feed tweets stay out of the inbox and the stats unless asked for by source"""
+    db = SessionLocal()
+    db.add(Message(
+        sender="inbox_user",
+        content="Inbox message",
+        source=MessageSource.TELEGRAM,
+        category=MessageCategory.ROUTINE,
+        timestamp=datetime.now()
+    ))
+    db.commit()
+    db.close()
+    messages = client.get("/api/messages").json()
+    stats = client.get("/api/stats").json()
+    
+    response = client.post("/api/refresh-feeds")
+    assert client.get(f"/api/jobs/{response.json()['id']}").json()["inserted"] > 0
+    
+    assert client.get("/api/messages").json() == messages
+    assert client.get("/api/stats").json() == stats
+    feed_tweets = client.get("/api/messages?source=TWITTER_FEED").json()
+    assert feed_tweets and all(msg["source"] == "TWITTER_FEED" for msg in feed_tweets)
+
+def test_resume_running_recategorization_job(setup_database):
+    """Test that a job already running is not resumed a second time"""
+    db = SessionLocal()
+    job = RecategorizationJob(terms=["rug pull"], status="running")
+    db.add(job)
+    db.commit()
+    job_id = job.id
+    db.close()
+    
+    response = client.post(f"/api/recategorization-jobs/{job_id}/resume")
+    assert response.status_code == 409
+    assert client.get(f"/api/recategorization-jobs/{job_id}").json()["status"] == "running"
+
+def test_get_unknown_job(setup_database):
+    """Test job status for an id that does not exist"""
+    response = client.get("/api/jobs/999999")
+    assert response.status_code == 404
 
 def test_error_handling():
     """Test error handling for invalid requests"""
@@ -0,0 +1,31 @@
+import pytest
+
+from services import api_clients
+
+@pytest.fixture
+def configured_twitter(monkeypatch):
+    monkeypatch.setattr(api_clients, "TWITTER_BEARER_TOKEN", "test-bearer-token")
+    monkeypatch.setattr(api_clients, "_twitter_client", None)
+    yield
+    api_clients._twitter_client = None
+
+@pytest.mark.asyncio
+async def test_twitter_client_shared_and_closed(configured_twitter):
+    """Test that every caller gets the same pooled client until shutdown"""
+    await api_clients.start_api_clients()
+    client = api_clients.get_twitter_client()
+    assert client is not None
+    assert api_clients.get_twitter_client() is client
+    adapter = client.session.get_adapter("https://api.twitter.com/2/tweets")
+    assert adapter._pool_maxsize == api_clients.API_CLIENT_POOL_SIZE
+    assert adapter.timeout == api_clients.API_CLIENT_TIMEOUT
+
+    await api_clients.close_api_clients()
+    assert api_clients._twitter_client is None
+
+def test_placeholder_tokens_create_no_clients(monkeypatch):
+    """Test that the default placeholder tokens leave the services on mock data"""
+    monkeypatch.setattr(api_clients, "_twitter_client", None)
+    monkeypatch.setattr(api_clients, "TWITTER_BEARER_TOKEN", "your_twitter_bearer_token_here")
+    assert api_clients.get_twitter_client() is None
+    assert api_clients.get_telegram_bot() is None
@@ -0,0 +1,100 @@
+import pytest
+
+import services.keyword_matcher as keyword_matcher
+from models import MessageCategory
+from services.categorization_service import CategorizationService
+from services.keyword_matcher import KeywordMatcher
+
+
+@pytest.fixture(params=[True, False], ids=["extension", "pure-python"])
+def matcher_backend(request, monkeypatch):
+    """Run matcher tests against both the C extension and the pure-Python automaton"""
+    if request.param and not keyword_matcher.AHOCORASICK_AVAILABLE:
+        pytest.skip("pyahocorasick not installed")
+    monkeypatch.setattr(keyword_matcher, "AHOCORASICK_AVAILABLE", request.param)
+
+
+def test_keyword_matcher_finds_overlapping_terms(matcher_backend):
+    """Test that the automaton reports overlapping and nested terms in one pass"""
+    matcher = KeywordMatcher([
+        ("a", "he"), ("a", "she"), ("b", "his"), ("b", "hers"), ("c", "smart contract")
+    ])
+    hits = matcher.match("USHERS audit a Smart Contract")
+    assert hits["a"] == ["he", "she"]
+    assert hits["b"] == ["hers"]
+    assert hits["c"] == ["smart contract"]
+
+
+def test_keyword_matcher_no_hits(matcher_backend):
+    """Test matching text without any registered terms"""
+    matcher = KeywordMatcher([("a", "uniswap")])
+    assert matcher.match("nothing to see here") == {}
+    assert KeywordMatcher().match("anything") == {}
+
+
+@pytest.mark.parametrize("content, sender, expected", [
+    ("URGENT: critical bug in the smart contract", "", MessageCategory.URGENT),
+    ("Thanks for the AMA yesterday!", "", MessageCategory.ARCHIVE),
+    ("Interested in cross-chain integration like LayerZero", "", MessageCategory.HIGH_PRIORITY),
+    ("Would love to chat sometime", "Eve Partner", MessageCategory.HIGH_PRIORITY),
+    ("Would love to chat sometime", "someone", MessageCategory.ROUTINE),
+])
+def test_categorize_message(content, sender, expected):
+    """Test categorization rules in priority order"""
+    service = CategorizationService()
+    assert service.categorize_message(content, sender) == expected
+
+
+def test_mentioned_projects_and_explanation():
+    """Test project extraction and the explanation built from the same matches"""
+    service = CategorizationService()
+    content = "How does Aave compare to Compound and The Graph?"
+    assert service.get_mentioned_projects(content) == ["Aave", "Compound", "The Graph"]
+    assert service.get_category_explanation(content) == (
+        "Marked as HIGH PRIORITY due to audited project mentions: Aave, Compound, The Graph"
+    )
+
+
+def test_update_keywords_recompiles_matcher():
+    """Test that keyword updates are reflected in categorization"""
+    service = CategorizationService()
+    service.update_keywords(MessageCategory.HIGH_PRIORITY, ["defi"], action="remove")
+    assert service.categorize_message("a defi question") == MessageCategory.ROUTINE
+
+
+def test_categorize_batch_in_process_and_pool():
+    """Test that pooled batch categorization matches per-message results"""
+    service = CategorizationService()
+    contents = [
+        "URGENT: critical bug", "Thanks for everything", "Uniswap fork", "hello", "", None
+    ] * 5
+    senders = ["", "", "", "Eve Partner", "", ""] * 5
+    expected = [service.categorize_message(c or "", s) for c, s in zip(contents, senders)]
+
+    assert service.categorize_batch(contents, senders) == expected
+    assert service.categorize_batch(contents, senders, workers=2, pool_threshold=1) == expected
+
+
+def test_categorize_batch_length_mismatch():
+    """Test that mismatched inputs are rejected"""
+    with pytest.raises(ValueError):
+        CategorizationService().categorize_batch(["a", "b"], ["a"])
+
+
+@pytest.mark.parametrize("content, sender, rule", [
+    ("URGENT: critical bug", "", "urgent_keywords"),
+    ("Thanks for the AMA", "", "archive_keywords"),
+    ("Our Sushi fork needs review", "", "audited_projects"),
+    ("Partnership discussion next week", "", "high_priority_keywords"),
+    ("Would love to chat", "Eve Partner", "important_sender"),
+    ("Would love to chat", "someone", "default"),
+])
+def test_analyze_message_evidence_explains_without_rescan(content, sender, rule):
+    """Test that stored evidence reproduces the content-based explanation"""
+    service = CategorizationService()
+    result = service.analyze_message(content, sender)
+    assert result.rule == rule
+    assert result.category == service.categorize_message(content, sender)
+    assert service.explain(result.rule, result.matched_keywords, result.matched_projects, sender) == (
+        service.get_category_explanation(content, sender)
+    )
@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from services.api_clients import ListingTruncated, iter_tweet_pages
+from services.cursor_service import (
+    TELEGRAM_UPDATES, TWITTER_FEED, TWITTER_MENTIONS, FetchWindow, highest_id, move_cursor, read_fetch_windows
+)
+from services.telegram_service import TelegramService
+
+def test_highest_id_compares_numerically():
+    items = [{"id": "99"}, {"id": "1000"}, {"id": "tg_001"}]
+    assert highest_id(items) == "1000"
+    assert highest_id(items, previous="5000") == "5000"
+    assert highest_id([{"id": "mock_1"}]) is None
+
+def test_cursor_only_moves_forward(db):
+    """Test that cursors persist per source and account and never move back"""
+    move_cursor(db, TWITTER_FEED, "Uniswap", highest_id([{"id": "200"}, {"id": "150"}]))
+    move_cursor(db, TWITTER_FEED, "Aave", "7")
+    db.commit()
+    move_cursor(db, TWITTER_FEED, "Uniswap", "120")
+    move_cursor(db, TELEGRAM_UPDATES, "", highest_id([{"id": "tg_001"}]))
+    db.commit()
+
+    assert read_fetch_windows(db) == {
+        (TWITTER_FEED, "Uniswap"): FetchWindow("200"), (TWITTER_FEED, "Aave"): FetchWindow("7")
+    }
+
+def _tweet(tweet_id):
+    return SimpleNamespace(id=tweet_id, author_id=1, text=f"tweet {tweet_id}", created_at=None)
+
+@pytest.mark.asyncio
+async def test_tweet_pages_followed_until_caught_up():
+    """Test that pagination tokens are followed and since_id is passed through"""
+    pages = {
+        None: SimpleNamespace(data=[_tweet(30), _tweet(29)], includes={}, meta={"next_token": "p2"}),
+        "p2": SimpleNamespace(data=[_tweet(28)], includes={}, meta={}),
+    }
+    calls = []
+
+    def get_users_mentions(**params):
+        calls.append(params)
+        return pages[params.get("pagination_token")]
+
+    pages = [tweets async for tweets, _ in iter_tweet_pages(get_users_mentions, id="me", since_id="27")]
+    assert [[tweet.id for tweet in tweets] for tweets in pages] == [[30, 29], [28]]
+    assert all(call["since_id"] == "27" for call in calls)
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_listing_cut_short_by_page_cap_is_truncated():
+    """Test that a since_id listing with pages left after max_pages ends with ListingTruncated"""
+    def get_users_mentions(**params):
+        page = int(params.get("pagination_token", 0))
+        return SimpleNamespace(data=[_tweet(30 - page)], includes={}, meta={"next_token": str(page + 1)})
+
+    pages = []
+    with pytest.raises(ListingTruncated):
+        async for tweets, _ in iter_tweet_pages(get_users_mentions, max_pages=2, id="me", since_id="10"):
+            pages.append([tweet.id for tweet in tweets])
+    assert pages == [[30], [29]]
+
+    # Without since_id only the newest pages were wanted
+    pages = [tweets async for tweets, _ in iter_tweet_pages(get_users_mentions, max_pages=2, id="me")]
+    assert len(pages) == 2
+
+def test_truncated_fetch_keeps_cursor_until_gap_is_filled(db):
+    """Test that a truncated listing leaves the cursor put and fetches the gap below its oldest id next"""
+    move_cursor(db, TWITTER_MENTIONS, "", "10")
+    move_cursor(db, TWITTER_MENTIONS, "", "40", "21", truncated=True)
+    assert read_fetch_windows(db)[(TWITTER_MENTIONS, "")] == FetchWindow("10", "21")
+
+    # The gap is still too large: the cut moves down, the newest id seen is kept
+    move_cursor(db, TWITTER_MENTIONS, "", "20", "16", truncated=True)
+    assert read_fetch_windows(db)[(TWITTER_MENTIONS, "")] == FetchWindow("10", "16")
+
+    move_cursor(db, TWITTER_MENTIONS, "", "15", "11")
+    assert read_fetch_windows(db)[(TWITTER_MENTIONS, "")] == FetchWindow("40", None)
+
+@pytest.mark.asyncio
+async def test_telegram_updates_fetched_from_offset():
+    """Test that getUpdates starts after the stored update id and pages until a short page"""
+    def update(update_id):
+        return SimpleNamespace(
+            update_id=update_id,
+            message=SimpleNamespace(text=f"hello {update_id}", date=None,
+                                    from_user=SimpleNamespace(username="dev", full_name="Dev"))
+        )
+
+    offsets = []
+
+    class FakeBot:
+        async def get_updates(self, offset=None, limit=100, **kwargs):
+            offsets.append(offset)
+            start = offset or 1
+            return [update(i) for i in range(start, min(start + limit, 151))]
+
+    service = TelegramService()
+    service.use_mock_data = False
+    with patch("services.telegram_service.get_telegram_bot", return_value=FakeBot()):
+        messages = [message async for page in service.iter_message_pages(since_id="10") for message in page]
+
+    assert offsets == [11, 111]
+    assert [message["id"] for message in messages] == [str(i) for i in range(11, 151)]
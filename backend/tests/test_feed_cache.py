@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from services.feed_cache import FeedCache
+
+class FakeFetch:
+    """load_stored_feeds stand-in returning a numbered tweet per account and call"""
+
+    def __init__(self, delay=0, empty=False):
+        self.calls = []
+        self.delay = delay
+        self.empty = empty
+        self.error = None
+
+    async def __call__(self, accounts):
+        self.calls.append(sorted(accounts))
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        if self.empty:
+            return {name: [] for name in accounts}
+        return {name: [{"content": f"{twitter_id} #{len(self.calls)}"}] for name, twitter_id in accounts.items()}
+
+ACCOUNTS = {"Uniswap": "Uniswap", "LayerZero": "LayerZero_Labs"}
+
+async def _settle(cache):
+    await asyncio.gather(*cache._tasks)
+
+@pytest.mark.asyncio
+async def test_fresh_feeds_are_served_from_cache():
+    fetch = FakeFetch()
+    cache = FeedCache(fetch, ttl=60)
+
+    first = await cache.get_feeds(ACCOUNTS)
+    second = await cache.get_feeds(ACCOUNTS)
+    assert first == second == {
+        "Uniswap": [{"content": "Uniswap #1"}],
+        "LayerZero": [{"content": "LayerZero_Labs #1"}],
+    }
+    assert fetch.calls == [["LayerZero_Labs", "Uniswap"]]
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_fetch():
+    fetch = FakeFetch(delay=0.05)
+    cache = FeedCache(fetch, ttl=60)
+
+    results = await asyncio.gather(*(cache.get_feeds(ACCOUNTS) for _ in range(5)))
+    assert all(result == results[0] for result in results)
+    assert len(fetch.calls) == 1
+
+@pytest.mark.asyncio
+async def test_stale_feed_served_while_revalidating():
+    """Test that an expired feed is returned at once and replaced by one background fetch"""
+    fetch = FakeFetch(delay=0.05)
+    cache = FeedCache(fetch, ttl=0)
+    await cache.get_feeds({"Uniswap": "Uniswap"})
+
+    stale = await asyncio.gather(*(cache.get_feeds({"Uniswap": "Uniswap"}) for _ in range(3)))
+    assert all(feeds["Uniswap"] == [{"content": "Uniswap #1"}] for feeds in stale)
+    assert len(fetch.calls) == 2
+
+    await _settle(cache)
+    cache.ttl = 60
+    assert (await cache.get_feeds({"Uniswap": "Uniswap"}))["Uniswap"] == [{"content": "Uniswap #2"}]
+
+@pytest.mark.asyncio
+async def test_invalidate_forces_a_fresh_fetch():
+    fetch = FakeFetch(delay=0.05)
+    cache = FeedCache(fetch, ttl=60)
+    await cache.get_feeds(ACCOUNTS)
+
+    # A fetch started before invalidation must not repopulate the cache
+    cache.ttl = 0
+    await cache.get_feeds(ACCOUNTS)
+    cache.invalidate()
+    cache.ttl = 60
+    feeds = await cache.get_feeds(ACCOUNTS)
+    await _settle(cache)
+
+    assert feeds["Uniswap"] == [{"content": "Uniswap #3"}]
+    assert (await cache.get_feeds(ACCOUNTS))["Uniswap"] == [{"content": "Uniswap #3"}]
+    assert len(fetch.calls) == 3
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_last_feed():
+    fetch = FakeFetch()
+    cache = FeedCache(fetch, ttl=0)
+    await cache.get_feeds(ACCOUNTS)
+
+    fetch.empty = True
+    await cache.get_feeds(ACCOUNTS)
+    await _settle(cache)
+    fetch.error = RuntimeError("rate limited")
+    await cache.get_feeds(ACCOUNTS)
+    await _settle(cache)
+
+    assert (await cache.get_feeds(ACCOUNTS))["Uniswap"] == [{"content": "Uniswap #1"}]
+
+@pytest.mark.asyncio
+async def test_first_fetch_error_reaches_caller():
+    fetch = FakeFetch()
+    fetch.error = RuntimeError("rate limited")
+    cache = FeedCache(fetch, ttl=60)
+
+    with pytest.raises(RuntimeError):
+        await cache.get_feeds(ACCOUNTS)
+    fetch.error = None
+    assert (await cache.get_feeds(ACCOUNTS))["Uniswap"] == [{"content": "Uniswap #2"}]
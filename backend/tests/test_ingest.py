@@ -0,0 +1,67 @@
+from models import Message, MessageProject, MessageSource
+from services.categorization_service import CategorizationService
+from services.ingest_service import index_stored_messages, ingest_messages
+from services.stats_service import read_counters
+
+def _store(db, contents):
+    service = CategorizationService()
+    messages = [
+        Message(sender="tester", content=content, source=MessageSource.TELEGRAM,
+                **service.analyze_message(content).as_columns())
+        for content in contents
+    ]
+    db.add_all(messages)
+    db.flush()
+    index_stored_messages(db, messages)
+    db.commit()
+    return messages
+
+def test_project_mentions_recorded_at_ingest(db):
+    """Test that audited project mentions land in the join table"""
+    messages = _store(db, [
+        "Comparing Aave and Compound, then Aave again",
+        "Nothing to see",
+        "Bridging from Arbitrum to Optimism via LayerZero",
+    ])
+    rows = sorted((row.message_id, row.project) for row in db.query(MessageProject))
+    assert rows == [
+        (messages[0].id, "Aave"), (messages[0].id, "Compound"),
+        (messages[2].id, "Arbitrum"), (messages[2].id, "LayerZero"), (messages[2].id, "Optimism"),
+    ]
+
+def _items(*ids):
+    return [
+        {"id": item_id, "source": "telegram", "sender": "@dev", "content": f"Uniswap question {item_id}",
+         "timestamp": "2025-08-13T10:00:00Z"}
+        for item_id in ids
+    ]
+
+def test_ingest_is_idempotent_on_external_id(db):
+    """Test that re-fetched items are skipped and only new rows update derived tables"""
+    service = CategorizationService()
+    items = _items("1", "2", "2")
+    results = service.analyze_batch([item["content"] for item in items])
+
+    first = ingest_messages(db, items, results)
+    db.commit()
+    assert (first.inserted, first.skipped) == (2, 1)
+    assert sorted(message.external_id for message in first.messages) == ["TELEGRAM:1", "TELEGRAM:2"]
+
+    items = _items("2", "3")
+    second = ingest_messages(db, items, service.analyze_batch([item["content"] for item in items]))
+    db.commit()
+    assert (second.inserted, second.skipped) == (1, 1)
+    assert db.query(Message).count() == 3
+    assert db.query(MessageProject).count() == 3
+    assert read_counters(db)["total"] == 3
+
+def test_ingest_items_without_id_and_bad_items(db):
+    """Test that items without ids are always stored and invalid items are counted as failed"""
+    service = CategorizationService()
+    items = [
+        {"sender": "a", "content": "no id", "source": "twitter"},
+        {"sender": "b", "content": "bad source", "source": "carrier_pigeon", "id": "x"},
+    ]
+    outcome = ingest_messages(db, items, service.analyze_batch([item["content"] for item in items]))
+    assert (outcome.inserted, outcome.skipped, outcome.failed) == (1, 0, 1)
+    assert outcome.messages[0].external_id is None
@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import select
+
+from models import Message, MessageSource
+from services.categorization_service import CategorizationService
+from services.cursor_service import TELEGRAM_UPDATES, TWITTER_FEED, TWITTER_MENTIONS, read_fetch_windows
+from services.ingest_pipeline import Producer, run_pipeline
+from services.ingest_scheduler import create_ingest_job
+
+class SlowCategorization(CategorizationService):
+    """Categorizes messages whose content starts with "slow" only after a delay"""
+
+    def analyze_batch(self, contents, senders=None, **kwargs):
+        if any(content.startswith("slow") for content in contents):
+            time.sleep(0.05)
+        return super().analyze_batch(contents, senders, **kwargs)
+
+def _message(message_id, content=None):
+    return {
+        "id": str(message_id), "sender": "@alice",
+        "content": content or f"message {message_id}", "timestamp": "2025-08-13T10:00:00Z"
+    }
+
+async def _pages(*pages, error=None):
+    for page in pages:
+        await asyncio.sleep(0)
+        yield page
+    if error:
+        raise error
+
+@pytest.mark.asyncio
+async def test_batches_are_written_in_fetch_order(async_db):
+    """Test that batches categorized out of order by several workers are still stored in order"""
+    job = await async_db.run_sync(create_ingest_job, ["telegram"])
+    pages = [[_message(1, "slow message 1"), _message(2)], [_message(3), _message(4)], [_message(5)]]
+
+    result = await run_pipeline(
+        async_db, job, [Producer("telegram", MessageSource.TELEGRAM, _pages(*pages), (TELEGRAM_UPDATES, ""))],
+        SlowCategorization(), batch_size=2, categorize_workers=3
+    )
+
+    assert (result.fetched, job.fetched, job.inserted) == (5, 5, 5)
+    stored = (await async_db.scalars(select(Message.external_id).order_by(Message.id))).all()
+    assert stored == [f"TELEGRAM:{message_id}" for message_id in range(1, 6)]
+    assert (await async_db.run_sync(read_fetch_windows))[(TELEGRAM_UPDATES, "")].since_id == "5"
+
+@pytest.mark.asyncio
+async def test_slow_categorization_holds_back_fetching(async_db):
+    """Test that the fetch stage stays a bounded number of items ahead of the writer"""
+    job = await async_db.run_sync(create_ingest_job, ["telegram"])
+    leads = []
+
+    async def pages():
+        for message_id in range(1, 41):
+            leads.append(message_id - job.fetched)
+            yield [_message(message_id, f"slow message {message_id}")]
+
+    await run_pipeline(
+        async_db, job, [Producer("telegram", MessageSource.TELEGRAM, pages())],
+        SlowCategorization(), batch_size=1, categorize_workers=1, queue_size=2
+    )
+
+    assert job.inserted == 40
+    # Two queued pages, three batches in flight and one in each stage's hands
+    assert max(leads) <= 8
+
+@pytest.mark.asyncio
+async def test_failed_producer_keeps_its_cursor(async_db):
+    """Test that a stream cut short stores what it fetched but leaves its cursor for the next run"""
+    job = await async_db.run_sync(create_ingest_job, ["telegram", "twitter"])
+    producers = [
+        Producer(
+            "telegram", MessageSource.TELEGRAM,
+            _pages([_message(11)], [_message(12)], error=RuntimeError("Telegram unavailable")),
+            (TELEGRAM_UPDATES, "")
+        ),
+        Producer("twitter", MessageSource.TWITTER, _pages([_message(30), _message(29)]), (TWITTER_MENTIONS, "")),
+    ]
+
+    result = await run_pipeline(async_db, job, producers, CategorizationService(), batch_size=1)
+
+    assert [(name, str(error)) for name, error in result.errors] == [("telegram", "Telegram unavailable")]
+    assert job.inserted == 4
+    cursors = await async_db.run_sync(read_fetch_windows)
+    assert (TELEGRAM_UPDATES, "") not in cursors
+    assert cursors[(TWITTER_MENTIONS, "")].since_id == "30"
+
+@pytest.mark.asyncio
+async def test_hung_producer_times_out(async_db):
+    """Test that a producer waiting longer than its page_timeout fails without holding up the others"""
+    job = await async_db.run_sync(create_ingest_job, ["project_feeds"])
+
+    async def hung_pages():
+        yield [_message(41)]
+        await asyncio.sleep(60)
+        yield [_message(40)]
+
+    producers = [
+        Producer("hung", MessageSource.TWITTER_FEED, hung_pages(), (TWITTER_FEED, "hung"), page_timeout=0.05),
+        Producer("live", MessageSource.TWITTER_FEED, _pages([_message(50)]), (TWITTER_FEED, "live"), page_timeout=0.05),
+    ]
+
+    result = await asyncio.wait_for(run_pipeline(async_db, job, producers, CategorizationService()), 5)
+
+    assert [(name, type(error)) for name, error in result.errors] == [("hung", TimeoutError)]
+    assert job.inserted == 2
+    cursors = await async_db.run_sync(read_fetch_windows)
+    assert (TWITTER_FEED, "hung") not in cursors
+    assert cursors[(TWITTER_FEED, "live")].since_id == "50"
+
+@pytest.mark.asyncio
+async def test_write_errors_abort_the_run(async_db):
+    job = await async_db.run_sync(create_ingest_job, ["telegram"])
+
+    class BrokenCategorization(CategorizationService):
+        def analyze_batch(self, contents, senders=None, **kwargs):
+            raise ValueError("categorizer crashed")
+
+    with pytest.raises(ValueError, match="categorizer crashed"):
+        await run_pipeline(
+            async_db, job, [Producer("telegram", MessageSource.TELEGRAM, _pages([_message(1)]), (TELEGRAM_UPDATES, ""))],
+            BrokenCategorization()
+        )
+    assert (TELEGRAM_UPDATES, "") not in await async_db.run_sync(read_fetch_windows)
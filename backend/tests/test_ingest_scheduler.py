@@ -0,0 +1,225 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select
+
+from models import IngestJob, Message
+from services.categorization_service import CategorizationService
+from services.cursor_service import TELEGRAM_UPDATES, TWITTER_FEED, TWITTER_MENTIONS, move_cursor, read_fetch_windows
+from services.feed_cache import FeedCache
+from services.feed_store import stored_feeds
+from services.ingest_scheduler import (
+    MESSAGE_SOURCES, SOURCE_FEEDS, SOURCE_TELEGRAM, SOURCE_TWITTER, IngestScheduler, create_ingest_job,
+    fail_unfinished_jobs, prune_ingest_jobs
+)
+from services.twitter_service import TwitterService
+
+class FakeTelegram:
+    def __init__(self, messages=(), error=None, delay=0):
+        self.messages = list(messages)
+        self.error = error
+        self.delay = delay
+        self.since_ids = []
+        self.active = 0
+        self.max_active = 0
+
+    async def iter_message_pages(self, since_id=None):
+        self.since_ids.append(since_id)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        if self.error:
+            raise self.error
+        if self.messages:
+            yield self.messages
+
+class FakeTwitter:
+    async def iter_mention_pages(self, since_id=None, until_id=None):
+        return
+        yield
+
+def _scheduler(session_factory, telegram):
+    return IngestScheduler(telegram, FakeTwitter(), CategorizationService(), session_factory=session_factory)
+
+async def _create_job(session_factory, sources, trigger="manual"):
+    async with session_factory() as db:
+        return await db.run_sync(create_ingest_job, sources, trigger)
+
+@pytest.mark.asyncio
+async def test_job_ingests_and_advances_cursor(session_factory):
+    """Test that a job stores new messages, records progress and moves the cursor"""
+    telegram = FakeTelegram([
+        {"id": "41", "sender": "@alice", "content": "Security issue in the vault", "timestamp": "2025-08-13T10:00:00Z"},
+        {"id": "42", "sender": "@bob", "content": "Hello there", "timestamp": "2025-08-13T10:01:00Z"},
+    ])
+    scheduler = _scheduler(session_factory, telegram)
+
+    job = await _create_job(session_factory, MESSAGE_SOURCES)
+    job = await scheduler.run_job(job.id)
+    assert (job.status, job.fetched, job.inserted, job.skipped) == ("completed", 2, 2, 0)
+    assert job.started_at is not None and job.finished_at is not None
+
+    async with session_factory() as db:
+        assert len((await db.scalars(select(Message))).all()) == 2
+        assert (await db.run_sync(read_fetch_windows))[(TELEGRAM_UPDATES, "")].since_id == "42"
+
+    # The next run asks only for updates past the stored cursor
+    job = await scheduler.run_job((await _create_job(session_factory, [SOURCE_TELEGRAM], "scheduled")).id)
+    assert telegram.since_ids == [None, "42"]
+    assert job.skipped == 2
+
+@pytest.mark.asyncio
+async def test_scheduled_job_stores_no_fallback(session_factory):
+    """Test that only a manual refresh stores the fallback message when nothing was fetched"""
+    scheduler = _scheduler(session_factory, FakeTelegram())
+
+    scheduled = await scheduler.run_job((await _create_job(session_factory, [SOURCE_TELEGRAM], "scheduled")).id)
+    assert (scheduled.fetched, scheduled.inserted) == (0, 0)
+
+    manual = await scheduler.run_job((await _create_job(session_factory, MESSAGE_SOURCES)).id)
+    assert (manual.fetched, manual.inserted) == (1, 1)
+
+@pytest.mark.asyncio
+async def test_failed_fetch_marks_job_failed(session_factory):
+    scheduler = _scheduler(session_factory, FakeTelegram(error=RuntimeError("Telegram unavailable")))
+
+    job = await scheduler.run_job((await _create_job(session_factory, [SOURCE_TELEGRAM])).id)
+    assert job.status == "failed"
+    assert job.error == "Telegram unavailable"
+
+    async with session_factory() as db:
+        stored = await db.get(IngestJob, job.id)
+        assert stored.status == "failed"
+        assert stored.finished_at is not None
+
+@pytest.mark.asyncio
+async def test_jobs_for_the_same_source_run_one_at_a_time(session_factory):
+    telegram = FakeTelegram(delay=0.05)
+    scheduler = _scheduler(session_factory, telegram)
+
+    first = await _create_job(session_factory, [SOURCE_TELEGRAM], "scheduled")
+    second = await _create_job(session_factory, MESSAGE_SOURCES, "scheduled")
+    jobs = await asyncio.gather(scheduler.run_job(first.id), scheduler.run_job(second.id))
+
+    assert [job.status for job in jobs] == ["completed", "completed"]
+    assert telegram.max_active == 1
+
+@pytest.mark.asyncio
+async def test_finished_jobs_are_pruned(session_factory):
+    for _ in range(5):
+        await _create_job(session_factory, [SOURCE_TELEGRAM], "scheduled")
+    async with session_factory() as db:
+        for job in (await db.scalars(select(IngestJob).where(IngestJob.id <= 3))).all():
+            job.status = "completed"
+        await db.commit()
+
+        assert await db.run_sync(prune_ingest_jobs, 3) == 2
+        assert (await db.scalars(select(IngestJob.id).order_by(IngestJob.id))).all() == [3, 4, 5]
+
+@pytest.mark.asyncio
+async def test_jobs_left_unfinished_by_a_restart_are_failed(session_factory):
+    for _ in range(3):
+        await _create_job(session_factory, [SOURCE_TELEGRAM])
+    async with session_factory() as db:
+        running, completed = await db.get(IngestJob, 2), await db.get(IngestJob, 3)
+        running.status, completed.status = "running", "completed"
+        await db.commit()
+
+        assert await db.run_sync(fail_unfinished_jobs) == 2
+        jobs = (await db.scalars(select(IngestJob).order_by(IngestJob.id).execution_options(populate_existing=True))).all()
+        assert [job.status for job in jobs] == ["failed", "failed", "completed"]
+        assert jobs[0].error == "Interrupted by a server restart"
+        assert jobs[1].finished_at is not None and jobs[2].finished_at is None
+
+def _tweet(tweet_id, account, minute):
+    return {
+        "id": str(tweet_id), "source": "TWITTER_FEED", "sender": account,
+        "content": f"{account} update {tweet_id}", "timestamp": f"2025-08-13T10:{minute:02d}:00Z"
+    }
+
+@pytest.mark.asyncio
+async def test_feed_job_stores_tweets_and_advances_account_cursors(session_factory):
+    """Test that fetched feed tweets are stored once as TWITTER_FEED messages, per-account cursors included"""
+    accounts = {"Uniswap": "Uniswap", "LayerZero": "LayerZero_Labs"}
+    feeds = [
+        {"Uniswap": [_tweet(11, "Uniswap", 1), _tweet(12, "Uniswap", 2)], "LayerZero_Labs": [_tweet(20, "LayerZero_Labs", 3)]},
+        {"Uniswap": [_tweet(13, "Uniswap", 4), _tweet(12, "Uniswap", 2)], "LayerZero_Labs": []},
+    ]
+    since_ids = []
+
+    async def iter_feed_pages(twitter_id, since_id=None, until_id=None):
+        since_ids.append((twitter_id, since_id))
+        if feeds[(len(since_ids) - 1) // len(accounts)][twitter_id]:
+            yield feeds[(len(since_ids) - 1) // len(accounts)][twitter_id]
+
+    feed_cache = FeedCache(ttl=60)
+    feed_cache._entries["Uniswap"] = (0, [])
+    scheduler = IngestScheduler(
+        FakeTelegram(), FakeTwitter(), CategorizationService(),
+        session_factory=session_factory, feed_cache=feed_cache
+    )
+    with patch("services.ingest_scheduler.all_feed_accounts", return_value=accounts), \
+         patch("services.ingest_scheduler.iter_feed_pages", iter_feed_pages):
+        first = await scheduler.run_job((await _create_job(session_factory, [SOURCE_FEEDS])).id)
+        second = await scheduler.run_job((await _create_job(session_factory, [SOURCE_FEEDS], "scheduled")).id)
+
+    assert (first.fetched, first.inserted) == (3, 3)
+    assert (second.fetched, second.inserted, second.skipped) == (2, 1, 1)
+    assert since_ids[:2] == [("Uniswap", None), ("LayerZero_Labs", None)]
+    assert since_ids[2:] == [("Uniswap", "12"), ("LayerZero_Labs", "20")]
+    assert feed_cache._entries == {}
+
+    async with session_factory() as db:
+        assert (await db.run_sync(read_fetch_windows))[(TWITTER_FEED, "Uniswap")].since_id == "13"
+        feeds = await db.run_sync(stored_feeds, accounts, 2)
+    assert [item["content"] for item in feeds["Uniswap"]] == ["Uniswap update 13", "Uniswap update 12"]
+    assert feeds["LayerZero"][0]["source"] == "TWITTER_FEED"
+
+@pytest.mark.asyncio
+async def test_mentions_past_the_page_cap_are_fetched_on_later_runs(session_factory):
+    """Test that mentions left unread by the page cap are fetched next time instead of being skipped"""
+    tweet_ids = list(range(40, 10, -1))
+
+    def get_users_mentions(since_id=None, until_id=None, pagination_token=None, **params):
+        # Two mentions per page, newest first
+        window = [i for i in tweet_ids if i > int(since_id or 0) and i < int(until_id or 10**9)]
+        start = int(pagination_token or 0)
+        next_token = {"next_token": str(start + 2)} if start + 2 < len(window) else {}
+        return SimpleNamespace(
+            data=[SimpleNamespace(id=i, author_id=1, text=f"mention {i}", created_at=None) for i in window[start:start + 2]],
+            includes={}, meta=next_token
+        )
+
+    twitter = TwitterService()
+    twitter.use_mock_data = False
+    scheduler = IngestScheduler(FakeTelegram(), twitter, CategorizationService(), session_factory=session_factory)
+    async with session_factory() as db:
+        await db.run_sync(move_cursor, TWITTER_MENTIONS, "", "10")
+        await db.commit()
+
+    async def run():
+        return await scheduler.run_job((await _create_job(session_factory, [SOURCE_TWITTER], "scheduled")).id)
+
+    with patch("services.twitter_service.get_twitter_client", return_value=SimpleNamespace(get_users_mentions=get_users_mentions)), \
+         patch("services.twitter_service.TWITTER_USER_ID", "me"):
+        # 30 new mentions are 15 pages, over the 10 page cap
+        first = await run()
+        async with session_factory() as db:
+            assert (await db.run_sync(read_fetch_windows))[(TWITTER_MENTIONS, "")].since_id == "10"
+        tweet_ids[:0] = [42, 41]
+        second = await run()
+        third = await run()
+
+    assert (first.inserted, second.inserted, third.inserted) == (20, 10, 2)
+    async with session_factory() as db:
+        assert (await db.run_sync(read_fetch_windows))[(TWITTER_MENTIONS, "")].since_id == "42"
+        assert len((await db.scalars(select(Message))).all()) == 32
+
+def test_poll_delay_stays_within_jitter():
+    scheduler = IngestScheduler(None, None, None, jitter=0.1)
+    delays = [scheduler.next_delay(60) for _ in range(200)]
+    assert all(54 <= delay <= 66 for delay in delays)
+    assert len(set(delays)) > 1
@@ -0,0 +1,24 @@
+from sqlalchemy import select
+
+from models import Message, MessageSource
+from schemas import MessagePreview
+from services.message_preview import preview_columns, preview_mappings
+
+def test_preview_truncates_in_sql(db):
+    """Test that previews carry cut content and match the MessagePreview model"""
+    db.add_all([
+        Message(sender="a", content="x" * 500, source=MessageSource.TELEGRAM),
+        Message(sender="b", content="short", source=MessageSource.TWITTER),
+    ])
+    db.commit()
+
+    rows = db.execute(select(*preview_columns(Message, length=10)).order_by(Message.id)).all()
+    previews = [MessagePreview.model_validate(row).model_dump(mode="json") for row in preview_mappings(rows)]
+
+    assert previews[0]["content_preview"] == "x" * 10
+    assert previews[0]["content_truncated"] is True
+    assert previews[1]["content_preview"] == "short"
+    assert previews[1]["content_truncated"] is False
+    assert previews[1]["source"] == "TWITTER"
+    assert previews[1]["timestamp"].endswith("+00:00")
+    assert "content" not in previews[0]
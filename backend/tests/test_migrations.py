@@ -0,0 +1,55 @@
+from sqlalchemy import create_engine, inspect, text
+
+from database import Base
+from migrations import MIGRATIONS, run_migrations
+
+LEGACY_MESSAGES_TABLE = """
+CREATE TABLE messages (
+    id INTEGER NOT NULL PRIMARY KEY,
+    external_id VARCHAR,
+    source VARCHAR(12) NOT NULL,
+    sender VARCHAR NOT NULL,
+    content TEXT NOT NULL,
+    category VARCHAR(13),
+    timestamp DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    is_read BOOLEAN,
+    created_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    updated_at DATETIME
+)
+"""
+
+def test_migrations_upgrade_legacy_database(tmp_path):
+    """Test that a database created before migrations gets columns, backfills and indexes"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(LEGACY_MESSAGES_TABLE))
+        connection.execute(text(
+            "INSERT INTO messages (source, sender, content, category, is_read) "
+            "VALUES ('TELEGRAM', 'dev', 'Need audit for our Uniswap fork', 'URGENT', 0)"
+        ))
+    Base.metadata.create_all(bind=engine)
+
+    applied = run_migrations(engine)
+    assert applied == sorted(version for version, _, _ in MIGRATIONS)
+
+    inspector = inspect(engine)
+    columns = {column["name"] for column in inspector.get_columns("messages")}
+    assert {"matched_keywords", "matched_projects", "category_rule"} <= columns
+    indexes = {index["name"] for index in inspector.get_indexes("messages")}
+    assert {"ix_messages_category_timestamp", "ix_messages_source_timestamp"} <= indexes
+
+    with engine.connect() as connection:
+        rule, projects = connection.execute(text("SELECT category_rule, matched_projects FROM messages")).one()
+        assert rule == "urgent_keywords"
+        assert projects == '["Uniswap"]'
+        assert connection.execute(text("SELECT COUNT(*) FROM message_terms")).scalar() > 0
+        assert connection.execute(text("SELECT project FROM message_projects")).scalars().all() == ["Uniswap"]
+
+    # Already applied migrations are not run again
+    assert run_migrations(engine) == []
+
+def test_migrations_on_fresh_database(tmp_path):
+    """Test that migrations are no-ops on a database create_all just built"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    Base.metadata.create_all(bind=engine)
+    assert len(run_migrations(engine)) == len(MIGRATIONS)
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from models import Message, MessageCategory, MessageSource
+from services.pagination import InvalidCursor, apply_keyset, decode_cursor, split_page
+
+def fetch_page(db, cursor, limit):
+    rows = db.scalars(apply_keyset(select(Message), cursor).limit(limit + 1)).all()
+    return split_page(rows, limit)
+
+def test_keyset_pages_cover_every_message_once(db):
+    """Test paging newest first, including messages that share a timestamp"""
+    now = datetime(2025, 8, 13, 10, 0)
+    for i in range(10):
+        db.add(Message(sender="tester", content=f"message {i}", source=MessageSource.TELEGRAM,
+                       category=MessageCategory.ROUTINE, timestamp=now - timedelta(minutes=i // 3)))
+    db.commit()
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page, cursor = fetch_page(db, cursor, limit=4)
+        seen.extend(page)
+        pages += 1
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert len({message.id for message in seen}) == 10
+    keys = [(message.timestamp, message.id) for message in seen]
+    assert keys == sorted(keys, reverse=True)
+
+def test_last_page_has_no_cursor(db):
+    """Test that an exact final page does not hand out a cursor"""
+    for i in range(2):
+        db.add(Message(sender="tester", content="hi", source=MessageSource.TWITTER))
+    db.commit()
+    page, cursor = fetch_page(db, None, limit=2)
+    assert len(page) == 2
+    assert cursor is None
+
+def test_limit_below_one_is_an_empty_page():
+    """Test that split_page does not index into an empty page"""
+    assert split_page([], 0) == ([], None)
+    assert split_page([], -1) == ([], None)
+
+def test_invalid_cursor():
+    """Test that tampered cursors are rejected"""
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor")
@@ -0,0 +1,132 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from telegram.error import BadRequest, RetryAfter, TimedOut
+
+from services.api_clients import _telegram_throttle
+from services.rate_limiter import (
+    PRIORITY_HIGH, PRIORITY_LOW, RateLimiter, RateLimitExceeded, Throttle, capture_rate_limit_headers
+)
+
+class Throttled(Exception):
+    def __init__(self, retry_after=None, headers=None):
+        super().__init__("throttled")
+        self.throttle = Throttle(retry_after=retry_after, headers=headers)
+
+def _limiter(limits=None, concurrency=4, max_wait=5, max_retries=3):
+    return RateLimiter(
+        "test", limits or {}, (100, 1), lambda e: getattr(e, "throttle", None),
+        concurrency=concurrency, max_wait=max_wait, max_retries=max_retries
+    )
+
+@pytest.mark.asyncio
+async def test_higher_priority_requests_are_served_first():
+    limiter = _limiter(concurrency=1)
+    await limiter.acquire("feeds")
+    order = []
+
+    async def request(family, priority, label):
+        await limiter.acquire(family, priority)
+        order.append(label)
+        limiter.release()
+
+    waiting = [
+        asyncio.create_task(request("feeds", PRIORITY_LOW, "feed 1")),
+        asyncio.create_task(request("feeds", PRIORITY_LOW, "feed 2")),
+        asyncio.create_task(request("mentions", PRIORITY_HIGH, "mentions")),
+    ]
+    await asyncio.sleep(0)
+    limiter.release()
+    await asyncio.gather(*waiting)
+    assert order == ["mentions", "feed 1", "feed 2"]
+
+@pytest.mark.asyncio
+async def test_token_bucket_paces_a_family():
+    limiter = _limiter({"mentions": (2, 0.2)})
+    started = time.monotonic()
+    for _ in range(3):
+        await limiter.acquire("mentions")
+        limiter.release()
+    # Two tokens up front, the third refills after 0.1s
+    assert time.monotonic() - started >= 0.09
+
+@pytest.mark.asyncio
+async def test_exhausted_window_waits_for_reset_or_fails_fast():
+    limiter = _limiter()
+
+    async def request():
+        capture_rate_limit_headers(SimpleNamespace(headers={
+            "x-rate-limit-limit": "450", "x-rate-limit-remaining": "0", "x-rate-limit-reset": str(time.time() + 0.1)
+        }))
+        return "ok"
+
+    assert await limiter.call("mentions", request) == "ok"
+    started = time.monotonic()
+    await limiter.acquire("mentions")
+    limiter.release()
+    assert time.monotonic() - started >= 0.05
+
+    limiter.family("mentions").observe({"x-rate-limit-remaining": "0", "x-rate-limit-reset": str(time.time() + 900)})
+    calls = []
+    with pytest.raises(RateLimitExceeded):
+        await limiter.call("mentions", lambda: calls.append(1))
+    assert calls == []
+
+@pytest.mark.asyncio
+async def test_headers_captured_from_worker_threads():
+    limiter = _limiter()
+
+    def blocking_request():
+        capture_rate_limit_headers(SimpleNamespace(headers={"X-Rate-Limit-Remaining": "7", "Content-Type": "json"}))
+        return "ok"
+
+    await limiter.call("tweets", lambda: asyncio.to_thread(blocking_request))
+    assert limiter.family("tweets").remaining == 7
+
+@pytest.mark.asyncio
+async def test_throttled_requests_retry_with_backoff():
+    limiter = _limiter()
+    attempts = []
+
+    async def flaky():
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            raise Throttled(retry_after=0.02 if len(attempts) == 1 else None)
+        return "ok"
+
+    assert await limiter.call("updates", flaky) == "ok"
+    assert len(attempts) == 3
+    assert attempts[1] - attempts[0] >= 0.015
+    # Success resets the adaptive backoff
+    assert limiter.family("updates").backoff == 0
+
+@pytest.mark.asyncio
+async def test_other_errors_are_not_retried():
+    limiter = _limiter()
+    attempts = []
+
+    async def broken():
+        attempts.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        await limiter.call("updates", broken)
+    assert attempts == [1]
+
+@pytest.mark.asyncio
+async def test_retries_stop_after_max_retries():
+    limiter = _limiter(max_retries=1)
+
+    async def always_throttled():
+        raise Throttled(retry_after=0.01)
+
+    with pytest.raises(Throttled):
+        await limiter.call("updates", always_throttled)
+
+def test_telegram_errors_classified():
+    assert _telegram_throttle(RetryAfter(5)).retry_after == 5.0
+    assert _telegram_throttle(TimedOut()).retry_after is None
+    assert _telegram_throttle(BadRequest("chat not found")) is None
+    assert _telegram_throttle(ValueError()) is None
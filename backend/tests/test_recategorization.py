@@ -0,0 +1,98 @@
+from models import Message, MessageCategory, MessageSource, MessageTerm
+from services.categorization_service import CategorizationService, RULE_MANUAL
+from services.recategorization_service import (
+    index_message_terms, rebuild_term_index, find_candidate_message_ids,
+    create_recategorization_job, fail_interrupted_recategorization_jobs, run_recategorization_job
+)
+
+def _store(db, service, contents):
+    messages = []
+    for content in contents:
+        result = service.analyze_message(content)
+        message = Message(sender="tester", content=content, source=MessageSource.TELEGRAM, **result.as_columns())
+        db.add(message)
+        messages.append(message)
+    db.flush()
+    index_message_terms(db, messages)
+    db.commit()
+    return messages
+
+def test_candidates_cover_substring_and_phrase_matches(db):
+    """Test that index lookups find every message a keyword could match"""
+    service = CategorizationService()
+    messages = _store(db, service, [
+        "Want to whitelist our contract",
+        "White paper is out",
+        "Need a rug pull check",
+        "Nothing relevant here",
+    ])
+    assert find_candidate_message_ids(db, ["whitelist"]) == [messages[0].id]
+    assert find_candidate_message_ids(db, ["white"]) == [messages[0].id, messages[1].id]
+    assert find_candidate_message_ids(db, ["rug pull"]) == [messages[2].id]
+    # Inner pieces are whole tokens, the last one a token prefix
+    assert find_candidate_message_ids(db, ["ed a rug pu"]) == [messages[2].id]
+    assert find_candidate_message_ids(db, ["need a ru pull"]) == []
+    assert find_candidate_message_ids(db, ["🚨"]) is None
+
+def test_job_rescores_only_affected_messages(db):
+    """Test that adding a keyword re-categorizes the messages containing it"""
+    service = CategorizationService()
+    messages = _store(db, service, [
+        "Possible rug pull on our pool",
+        "Would love to chat sometime",
+        "Another rug pull rumour",
+    ])
+    messages[2].category = MessageCategory.ARCHIVE
+    messages[2].category_rule = RULE_MANUAL
+    db.commit()
+
+    service.update_keywords(MessageCategory.URGENT, ["rug pull"])
+    job = create_recategorization_job(db, ["rug pull"])
+    job = run_recategorization_job(db, job.id, service, chunk_size=1)
+
+    assert job.status == "completed"
+    assert (job.total, job.processed, job.changed) == (2, 2, 1)
+    db.refresh(messages[0])
+    db.refresh(messages[2])
+    assert messages[0].category == MessageCategory.URGENT
+    assert messages[0].matched_keywords["urgent"] == ["rug pull"]
+    assert messages[2].category == MessageCategory.ARCHIVE
+
+def test_job_resumes_from_checkpoint(db):
+    """Test that a job interrupted by a restart continues after its last processed message"""
+    service = CategorizationService()
+    messages = _store(db, service, ["rug pull one", "rug pull two"])
+    service.update_keywords(MessageCategory.URGENT, ["rug pull"])
+    job = create_recategorization_job(db, ["rug pull"])
+    job.status = "running"
+    job.total = 2
+    job.processed = 1
+    job.last_message_id = messages[0].id
+    db.commit()
+
+    # A job still marked running is left to its runner
+    assert run_recategorization_job(db, job.id, service).processed == 1
+    assert fail_interrupted_recategorization_jobs(db) == 1
+
+    job = run_recategorization_job(db, job.id, service)
+    assert job.status == "completed"
+    assert job.processed == 2
+    assert job.changed == 1
+    db.refresh(messages[0])
+    assert messages[0].category == MessageCategory.ROUTINE
+
+def test_rebuild_term_index(db):
+    """Test rebuilding postings for messages stored without the index"""
+    db.add(Message(sender="tester", content="Hello Uniswap", source=MessageSource.TWITTER))
+    db.commit()
+    assert rebuild_term_index(db) == 1
+    assert db.query(MessageTerm).count() == 2
+
+def test_rebuild_term_index_without_committing(db):
+    """Test that a rebuild inside a caller's transaction is undone by its rollback"""
+    db.add_all([Message(sender="tester", content=f"Hello Uniswap {i}", source=MessageSource.TWITTER) for i in range(3)])
+    db.commit()
+    assert rebuild_term_index(db, batch_size=2, commit=False) == 3
+    assert db.query(MessageTerm).count() == 9
+    db.rollback()
+    assert db.query(MessageTerm).count() == 0
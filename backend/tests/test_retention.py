@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import ArchivedMessage, Message, MessageCategory, MessageProject, MessageTerm
+from services.categorization_service import CategorizationService
+from services.ingest_service import ingest_messages
+from services.retention_service import archive_messages, archived_messages_query, run_retention
+from services.stats_service import read_counters
+
+NOW = datetime(2025, 8, 13, 10, 0)
+
+def _ingest(db, items):
+    service = CategorizationService()
+    results = service.analyze_batch([item["content"] for item in items])
+    outcome = ingest_messages(db, items, results)
+    db.commit()
+    return outcome
+
+def _item(item_id, content, age_days):
+    return {"id": item_id, "source": "telegram", "sender": "@dev", "content": content,
+            "timestamp": NOW - timedelta(days=age_days)}
+
+def test_old_and_archive_messages_move_to_cold_tier(db):
+    """Test that old and archive-category messages leave the hot table with their derived rows"""
+    _ingest(db, [
+        _item("1", "Uniswap audit report from last quarter", 45),
+        _item("2", "Thanks, all done", 1),
+        _item("3", "Aave integration question", 2),
+        _item("4", "Newest message about Uniswap", 0),
+    ])
+
+    result = archive_messages(db, max_age_days=30, batch_size=1, now=NOW)
+
+    assert result.archived == 2
+    assert result.batches == 2
+    assert sorted(db.scalars(select(Message.external_id))) == ["TELEGRAM:3", "TELEGRAM:4"]
+    archived = {message.external_id: message for message in db.scalars(select(ArchivedMessage))}
+    assert sorted(archived) == ["TELEGRAM:1", "TELEGRAM:2"]
+    assert archived["TELEGRAM:1"].matched_projects == ["Uniswap"]
+    assert archived["TELEGRAM:2"].category == MessageCategory.ARCHIVE
+
+    hot_ids = set(db.scalars(select(Message.id)))
+    assert set(db.scalars(select(MessageTerm.message_id))) <= hot_ids
+    assert set(db.scalars(select(MessageProject.message_id))) <= hot_ids
+    assert read_counters(db)["total"] == 2
+
+def test_newest_message_stays_hot(db):
+    """Test that the highest id is never archived, so SQLite cannot reuse it"""
+    _ingest(db, [_item("1", "Old news", 60), _item("2", "Also old", 50)])
+    archive_messages(db, max_age_days=30, now=NOW)
+    assert list(db.scalars(select(Message.external_id))) == ["TELEGRAM:2"]
+
+def test_ingest_skips_archived_items(db):
+    """Test that re-fetching an archived item does not store it again"""
+    _ingest(db, [_item("1", "Old Uniswap thread", 60), _item("2", "Current", 0)])
+    archive_messages(db, max_age_days=30, now=NOW)
+
+    outcome = _ingest(db, [_item("1", "Old Uniswap thread", 60), _item("3", "New", 0)])
+    assert outcome.inserted == 1
+    assert outcome.skipped == 1
+
+def test_archived_query_filters(db):
+    """Test project and text filters over the cold tier"""
+    _ingest(db, [
+        _item("1", "Old Uniswap thread", 60),
+        _item("2", "Old Aave thread", 60),
+        _item("3", "Current", 0),
+    ])
+    archive_messages(db, max_age_days=30, now=NOW)
+
+    by_project = db.scalars(archived_messages_query(audited_project="Uniswap")).all()
+    assert [message.external_id for message in by_project] == ["TELEGRAM:1"]
+    by_text = db.scalars(archived_messages_query(search_text="aave")).all()
+    assert [message.external_id for message in by_text] == ["TELEGRAM:2"]
+
+def test_run_retention_vacuums(tmp_path):
+    """Test a full run against a file database, including VACUUM"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'retention.db'}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    _ingest(db, [_item("1", "Old news", 400), _item("2", "Current", 0)])
+    db.close()
+
+    result = run_retention(engine, max_age_days=30)
+    assert result.archived == 1
+    assert result.vacuumed
+
+def test_archived_query_treats_wildcards_literally(db):
+    """Test that % and _ in cold-tier filters match only themselves"""
+    _ingest(db, [
+        _item("1", "Old fee_rate thread at 5%", 60),
+        _item("2", "Old feeXrate thread", 60),
+        _item("3", "Current", 0),
+    ])
+    archive_messages(db, max_age_days=30, now=NOW)
+
+    by_text = db.scalars(archived_messages_query(search_text="fee_rate")).all()
+    assert [message.external_id for message in by_text] == ["TELEGRAM:1"]
+    by_percent = db.scalars(archived_messages_query(search_text="%")).all()
+    assert [message.external_id for message in by_percent] == ["TELEGRAM:1"]
+    by_project = db.scalars(archived_messages_query(project="%")).all()
+    assert [message.external_id for message in by_project] == ["TELEGRAM:1"]
+    assert db.scalars(archived_messages_query(audited_project="%")).all() == []
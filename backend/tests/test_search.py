@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from migrations import run_migrations
+from models import Message, MessageSource
+from services.search_service import apply_text_search
+
+@pytest.fixture
+def db(tmp_path):
+    """Migrated SQLite database with the FTS5 index"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+def _search(db, search_text, **kwargs):
+    query, rank = apply_text_search("sqlite", select(Message), search_text, **kwargs)
+    if rank is not None:
+        query = query.order_by(rank)
+    return [message.content for message in db.scalars(query)]
+
+def _add(db, content, sender="tester"):
+    message = Message(sender=sender, content=content, source=MessageSource.TELEGRAM)
+    db.add(message)
+    db.commit()
+    return message
+
+def test_search_matches_word_prefixes_and_ranks(db):
+    """Test prefix matching and bm25 ordering"""
+    _add(db, "Our SushiSwap fork needs an audit")
+    _add(db, "Sushi sushi sushi everywhere")
+    _add(db, "Nothing relevant")
+    assert _search(db, "sushi") == ["Sushi sushi sushi everywhere", "Our SushiSwap fork needs an audit"]
+    assert _search(db, "sushi audit") == ["Our SushiSwap fork needs an audit"]
+    assert _search(db, "  ") == ["Our SushiSwap fork needs an audit", "Sushi sushi sushi everywhere", "Nothing relevant"]
+
+def test_project_phrase_search_uses_content_only(db):
+    """Test phrase matching for multi-word project names"""
+    _add(db, "Minting a Bored Ape derivative")
+    _add(db, "Bored of apes")
+    _add(db, "gm", sender="bored ape fan")
+    assert _search(db, "Bored Ape", phrase=True, content_only=True) == ["Minting a Bored Ape derivative"]
+
+def test_content_phrase_and_terms_share_one_match(db):
+    """Test that a content phrase combines with search terms in a single index lookup"""
+    _add(db, "Forking Bored Ape for an audit")
+    _add(db, "Bored Ape floor is down")
+    _add(db, "Audit of a bored token", sender="ape")
+    assert _search(db, "audit", content_phrase="Bored Ape") == ["Forking Bored Ape for an audit"]
+    assert _search(db, None, content_phrase="Bored Ape") == [
+        "Forking Bored Ape for an audit", "Bored Ape floor is down"
+    ]
+
+def test_search_index_follows_updates_and_deletes(db):
+    """Test that triggers keep the FTS index in sync with the messages table"""
+    message = _add(db, "Aave integration question")
+    message.content = "Compound integration question"
+    db.commit()
+    assert _search(db, "aave") == []
+    assert _search(db, "compound") == ["Compound integration question"]
+
+    db.delete(message)
+    db.commit()
+    assert _search(db, "compound") == []
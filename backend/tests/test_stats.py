@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from models import ActivityRollup, Message, MessageCategory, MessageSource, utc_now
+from services.categorization_service import CategorizationService
+from services.ingest_service import ingest_messages
+from services.stats_service import (
+    activity_timeseries, count_recent_messages, hour_bucket, parse_window, read_counters,
+    rebuild_rollups, reconcile_counters, record_category_change, record_new_messages
+)
+
+def _add(db, source, category, age=timedelta(0)):
+    db.add(Message(sender="tester", content="hi", source=source, category=category,
+                   timestamp=datetime.now() - age))
+
+def test_counters_follow_inserts_and_category_changes(engine):
+    """Test that counters track writes and agree with a full reconcile"""
+    db = sessionmaker(bind=engine)()
+    messages = [
+        Message(sender="a", content="hi", source=MessageSource.TELEGRAM, category=MessageCategory.URGENT),
+        Message(sender="b", content="hi", source=MessageSource.TELEGRAM, category=MessageCategory.URGENT),
+        Message(sender="c", content="hi", source=MessageSource.TWITTER, category=MessageCategory.ROUTINE, is_read=True),
+    ]
+    db.add_all(messages)
+    db.flush()
+    record_new_messages(db, messages)
+    db.commit()
+
+    old_category = messages[0].category
+    messages[0].category = MessageCategory.ARCHIVE
+    record_category_change(db, messages[0], old_category)
+    db.commit()
+
+    counts = read_counters(db)
+    assert counts["total"] == 3
+    assert counts["unread"] == 2
+    assert counts["by_category"] == {"urgent": 1, "high_priority": 0, "routine": 1, "archive": 1}
+    assert counts["by_source"]["TELEGRAM"] == 2
+
+    # A write that bypassed the counters is fixed by reconciling
+    db.add(Message(sender="d", content="hi", source=MessageSource.TWITTER, category=MessageCategory.URGENT))
+    db.commit()
+    reconciled = reconcile_counters(db)
+    db.commit()
+    assert reconciled["total"] == 4
+    assert reconciled["by_category"] == {"urgent": 2, "high_priority": 0, "routine": 1, "archive": 1}
+    db.close()
+
+def _rollups(db):
+    return sorted(
+        (row.bucket_start, row.source.value, row.category.value, row.project, row.count)
+        for row in db.query(ActivityRollup) if row.count
+    )
+
+def test_rollups_follow_inserts_and_category_changes(engine):
+    """Test hourly rollups per project, and that they agree with a full rebuild"""
+    db = sessionmaker(bind=engine)()
+    hour = datetime(2025, 8, 13, 10)
+    messages = [
+        Message(sender="a", content="Aave and Uniswap", source=MessageSource.TELEGRAM,
+                category=MessageCategory.URGENT, matched_projects=["Aave", "Uniswap"],
+                timestamp=hour + timedelta(minutes=5)),
+        Message(sender="b", content="Aave", source=MessageSource.TELEGRAM,
+                category=MessageCategory.URGENT, matched_projects=["Aave"],
+                timestamp=hour + timedelta(minutes=55)),
+        Message(sender="c", content="hi", source=MessageSource.TWITTER,
+                category=MessageCategory.ROUTINE, timestamp=hour + timedelta(hours=1)),
+    ]
+    db.add_all(messages)
+    db.flush()
+    record_new_messages(db, messages)
+    messages[1].category = MessageCategory.ARCHIVE
+    record_category_change(db, messages[1], MessageCategory.URGENT)
+    db.commit()
+
+    assert _rollups(db) == [
+        (hour, "TELEGRAM", "archive", "", 1),
+        (hour, "TELEGRAM", "archive", "Aave", 1),
+        (hour, "TELEGRAM", "urgent", "", 1),
+        (hour, "TELEGRAM", "urgent", "Aave", 1),
+        (hour, "TELEGRAM", "urgent", "Uniswap", 1),
+        (hour + timedelta(hours=1), "TWITTER", "routine", "", 1),
+    ]
+    maintained = _rollups(db)
+    assert rebuild_rollups(db) == 3
+    assert _rollups(db) == maintained
+
+    now = hour + timedelta(hours=1, minutes=30)
+    assert count_recent_messages(db, hour + timedelta(minutes=30)) == 3
+
+    hourly = activity_timeseries(db, timedelta(hours=3), "hour", now=now)
+    assert [point["total"] for point in hourly] == [0, 0, 2, 1]
+    assert hourly[2]["bucket_start"] == "2025-08-13T10:00:00+00:00"
+    assert hourly[2]["by_project"] == {"Aave": 2, "Uniswap": 1}
+    assert hourly[2]["by_category"]["archive"] == 1
+
+    daily = activity_timeseries(db, timedelta(days=2), "day", now=now)
+    assert [point["total"] for point in daily] == [0, 0, 3]
+    assert daily[-1]["by_source"]["TWITTER"] == 1
+    db.close()
+
+def test_parse_window():
+    assert parse_window("24h") == timedelta(hours=24)
+    assert parse_window("30d") == timedelta(days=30)
+    for value in ("", "d", "0h", "-1d", "3w", "99999999999d", "9" * 30 + "h"):
+        with pytest.raises(ValueError):
+            parse_window(value)
+
+def test_hour_bucket_converts_aware_timestamps_to_utc():
+    aware = datetime(2025, 8, 13, 1, 30, tzinfo=timezone(timedelta(hours=2)))
+    assert hour_bucket(aware) == datetime(2025, 8, 12, 23)
+    assert hour_bucket(datetime(2025, 8, 13, 1, 30)) == datetime(2025, 8, 13, 1)
+
+def test_aware_timestamps_ingested_as_utc(db):
+    """Test that a non-UTC timestamp is stored, bucketed and windowed by its UTC time"""
+    plus_two = timezone(timedelta(hours=2))
+    now = utc_now()
+    items = [
+        # 30 minutes ago, and 25 hours ago but within 24h on a +02:00 wall clock
+        {"id": "1", "source": "telegram", "sender": "@dev", "content": "hi",
+         "timestamp": (now - timedelta(minutes=30)).replace(tzinfo=timezone.utc).astimezone(plus_two).isoformat()},
+        {"id": "2", "source": "telegram", "sender": "@dev", "content": "hi",
+         "timestamp": (now - timedelta(hours=25)).replace(tzinfo=timezone.utc).astimezone(plus_two)},
+    ]
+    service = CategorizationService()
+    ingest_messages(db, items, service.analyze_batch([item["content"] for item in items]))
+    db.commit()
+
+    stored = sorted(message.timestamp for message in db.query(Message))
+    assert stored == [now - timedelta(hours=25), now - timedelta(minutes=30)]
+    assert {row[0] for row in _rollups(db)} == {hour_bucket(timestamp) for timestamp in stored}
+    assert count_recent_messages(db, now - timedelta(days=1)) == 1
+
+    rebuild_rollups(db)
+    assert count_recent_messages(db, now - timedelta(days=1)) == 1
@@ -0,0 +1,33 @@
+import pytest
+from sqlalchemy import text
+
+from storage_profiles import STORAGE_PROFILES, _engine_options, create_profiled_engine, get_storage_profile
+
+def test_sqlite_pragmas_applied_per_connection(tmp_path):
+    """Test that every pooled SQLite connection gets the profile's PRAGMAs"""
+    profile = get_storage_profile("balanced")
+    engine = create_profiled_engine(f"sqlite:///{tmp_path / 'profile.db'}", profile)
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert connection.execute(text("PRAGMA cache_size")).scalar() == profile.cache_size
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == profile.busy_timeout
+    engine.dispose()
+
+def test_compat_profile_keeps_rollback_journal(tmp_path):
+    engine = create_profiled_engine(f"sqlite:///{tmp_path / 'compat.db'}", get_storage_profile("compat"))
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+    engine.dispose()
+
+def test_postgres_pool_options():
+    """Test that Postgres URLs get the profile's pool settings"""
+    profile = STORAGE_PROFILES["throughput"]
+    options = _engine_options("postgresql://user@localhost/comms", profile)
+    assert options == {"pool_size": 20, "max_overflow": 40, "pool_pre_ping": True}
+
+def test_profile_lookup():
+    assert get_storage_profile(None).name == "balanced"
+    assert get_storage_profile("Throughput").name == "throughput"
+    with pytest.raises(ValueError):
+        get_storage_profile("turbo")
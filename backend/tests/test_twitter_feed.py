@@ -0,0 +1,17 @@
+import pytest
+
+from services.twitter_feed_service import all_feed_accounts, iter_feed_pages
+
+def test_all_feed_accounts_include_pashov():
+    """Test that the feed accounts cover audited projects and Pashov Audit Group"""
+    accounts = all_feed_accounts()
+    assert accounts["PashovAuditGrp"] == "PashovAuditGrp"
+    assert accounts["LayerZero"] == "LayerZero_Labs"
+    assert "none" not in accounts
+
+@pytest.mark.asyncio
+async def test_mock_feed_is_a_single_page():
+    """Test that mock data yields one page of the account's tweets"""
+    pages = [page async for page in iter_feed_pages("Uniswap")]
+    assert len(pages) == 1
+    assert all(tweet["sender"] == "Uniswap" and tweet["source"] == "TWITTER_FEED" for tweet in pages[0])
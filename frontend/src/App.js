@@ -20,6 +20,10 @@ import {
 } from '@dnd-kit/sortable';
 import { CSS } from '@dnd-kit/utilities';
 
+// Ingest job polling: how often to check, and how long to wait before giving up
+const JOB_POLL_INTERVAL_MS = 1000;
+const JOB_MAX_WAIT_MS = 5 * 60 * 1000;
+
 // Sortable Template Item Component
 function SortableTemplateItem({ template, index, onDelete, onCopy }) {
   const {
@@ -182,6 +186,18 @@ function App() {
 
 
 
+  // Refreshes run as background ingest jobs; wait until one finishes
+  const waitForJob = async (jobId) => {
+    const deadline = Date.now() + JOB_MAX_WAIT_MS;
+    while (Date.now() < deadline) {
+      const { data: job } = await axios.get(`http://localhost:8000/api/jobs/${jobId}`);
+      if (job.status === 'completed') return job;
+      if (job.status === 'failed') throw new Error(job.error || `Ingest job ${jobId} failed`);
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    }
+    throw new Error(`Ingest job ${jobId} did not finish within ${JOB_MAX_WAIT_MS / 60000} minutes`);
+  };
+
   const refreshMessages = async () => {
     try {
       console.log("Starting refresh process...");
@@ -190,11 +206,13 @@ function App() {
 
       // Refresh messages
       console.log("Refreshing messages...");
-      await axios.post('http://localhost:8000/api/refresh');
+      const { data: messagesJob } = await axios.post('http://localhost:8000/api/refresh');
 
       // Refresh project feeds
       console.log("Refreshing project feeds...");
-      await axios.post('http://localhost:8000/api/refresh-feeds');
+      const { data: feedsJob } = await axios.post('http://localhost:8000/api/refresh-feeds');
+
+      await Promise.all([waitForJob(messagesJob.id), waitForJob(feedsJob.id)]);
 
       // Fetch updated data
       await fetchMessages();
@@ -37,6 +37,9 @@ export const fetchMessages = async (filters = {}) => {
         if (filters.category) params.append('category', filters.category);
         if (filters.source) params.append('source', filters.source);
         if (filters.project) params.append('project', filters.project);
+        if (filters.q) params.append('q', filters.q);
+        if (filters.includeArchived) params.append('include_archived', 'true');
+        if (filters.view) params.append('view', filters.view);
 
         const response = await api.get(`/api/messages?${params.toString()}`);
         return response;
@@ -46,6 +49,16 @@ export const fetchMessages = async (filters = {}) => {
     }
 };
 
+export const fetchMessage = async (id) => {
+    try {
+        const response = await api.get(`/api/messages/${id}`);
+        return response;
+    } catch (error) {
+        console.error('Error fetching message:', error);
+        return null;
+    }
+};
+
 export const fetchTemplates = async () => {
     try {
         const response = await api.get('/api/templates');
@@ -121,6 +134,16 @@ export const refreshMessages = async () => {
     }
 };
 
+export const fetchJob = async (jobId) => {
+    try {
+        const response = await api.get(`/api/jobs/${jobId}`);
+        return response;
+    } catch (error) {
+        console.error('Error fetching job:', error);
+        throw error;
+    }
+};
+
 export const updateMessageCategory = async (messageId, category) => {
     try {
         const response = await api.post(`/api/messages/${messageId}/category`, {